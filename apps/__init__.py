@@ -1,14 +1,26 @@
 # apps/__init__.py
-import logging
+import logging, time
 from logging.handlers import RotatingFileHandler   # logging 추가
 from flask import Flask
 from werkzeug.security import generate_password_hash
-from .extensions import db, migrate, login_manager, csrf
+from .extensions import db, migrate, login_manager, csrf, enable_sqlite_wal
 from .config import Config
+from .usage_writer import usage_writer
+from .api_key_cache import api_key_cache
+from .quota import quota_manager
+from .count_cache import count_cache
+from .expert_scope import expert_scope
+from .log_search import log_search
+from .user_search import user_search
+from .usage_rollup import usage_rollup
+from .dashboard_metrics import dashboard_metrics
+from .expert_directory import expert_directory
+from .auto_match import auto_matcher
 from apps.dbmodels import UsageType, UserType, User
 
 # 전역 변수/인스턴스 초기화 (extensions.py에서 정의)
 def create_app():   # factory 함수
+    started_at = time.perf_counter()   # create_app() 소요 시간 측정
     app = Flask(__name__)
     app.config.from_object(Config)
     # 로깅 설정
@@ -25,6 +37,17 @@ def create_app():   # factory 함수
     migrate.init_app(app,db)              # 없으면, flask db 명령어를 사용불가
     login_manager.init_app(app)  # flask 앱에 로그인 관리 연결
     csrf.init_app(app)                    # flask 앱에 CSRF 보호 연결 
+    usage_writer.init_app(app)            # UsageLog 비동기 일괄 기록기
+    api_key_cache.init_app(app)           # API Key 인증 캐시
+    quota_manager.init_app(app)           # API 일/월 사용량 쿼터
+    count_cache.init_app(app)             # 목록 화면 건수 캐시
+    expert_scope.init_app(app)            # 전문가 조회 범위 캐시
+    log_search.init_app(app)              # 관리자 로그 FTS5 검색
+    user_search.init_app(app)             # 사용자/매칭 FTS5 검색
+    usage_rollup.init_app(app)            # 사용량 일별 집계 (usage_writer flush 리스너)
+    dashboard_metrics.init_app(app)       # 관리자 대시보드 지표 캐시
+    expert_directory.init_app(app)        # 전문가 디렉터리/진행 중 매칭 수 캐시
+    auto_matcher.init_app(app)            # 자동 매칭 (전문가별 최소 부하 배정)
 
     # Flask-Login: 사용자 로더 설정 (auth 블루프린트에서 import하여 사용)
     # create_app() 정의 또는 auth/__init__.py 정의하여 login_manager.user_loader 데코레이터와 함께 사용
@@ -67,9 +90,17 @@ def create_app():   # factory 함수
     app.register_blueprint(match, url_prefix="/match")
     app.register_blueprint(mypage, url_prefix="/mypage")
     app.register_blueprint(iris, url_prefix="/iris")
+    from .iris.views import prediction_cache
+    prediction_cache.init_app(app)        # 중복 추론 확인 캐시 (워커 간 무효화 신호)
+
+    # CLI 명령어 등록 (flask check-indexes 등)
+    from .commands import register_commands
+    register_commands(app)
 
     # db 테이블 생성 및 관리자 초기계정 생성
     with app.app_context():
+        if app.config.get('SQLITE_WAL'):
+            enable_sqlite_wal(db.engine)
         #db.drop_all()         # 운영시에는 커멘트 처리 필요
         db.create_all()       # 테이블 생성
         # 최초 관리자 계정 생성
@@ -89,4 +120,5 @@ def create_app():   # factory 함수
                 print(f"관리자 계정 '{admin_username}'이(가) 이미 존재합니다.")
         else:
             print("ADMIN_USERNAME 또는 ADMIN_PASSWORD 환경 변수가 설정되지 않았습니다.")
+        app.logger.info("create_app() 완료: %.1f ms", (time.perf_counter() - started_at) * 1000)
         return app
@@ -1,10 +1,11 @@
 # apps/admin/views.py
-import csv, logging
+import logging
 from datetime import datetime, time
-from io import BytesIO, StringIO
-from flask import Response, current_app, flash, redirect, render_template, request, url_for
+from io import BytesIO
+from flask import current_app, flash, redirect, render_template, request, url_for
 from flask_login import current_user
-from sqlalchemy import func, or_, cast, String
+from collections import Counter
+from sqlalchemy import func, insert, or_, select, update
 from sqlalchemy.orm import joinedload
 # --- WTForms Imports ---
 from flask_wtf import FlaskForm
@@ -13,8 +14,18 @@ from wtforms.validators import DataRequired, Email, EqualTo, ValidationError
 from apps.admin.forms import CreateUserForm, EditUserForm
 from . import admin
 from apps.dbmodels import Log, Match, MatchLog, MatchLogType, MatchStatus, User, UserLogType, UserType
+from apps.api_key_cache import api_key_cache
+from apps.count_cache import count_cache
+from apps.dashboard_metrics import dashboard_metrics
 from apps.decorators import admin_required
+from apps.expert_directory import expert_directory
+from apps.expert_scope import expert_scope
 from apps.extensions import db
+from apps.exports import stream_csv
+from apps.log_search import log_search
+from apps.match_counts import invalidate_match_counts
+from apps.user_search import user_search
+from apps.pagination import keyset_paginate
 from werkzeug.security import generate_password_hash # 비밀번호 해싱을 위해 사용
 from .forms import AdminLogSearchForm
 
@@ -77,6 +88,65 @@ def cancel_active_matches(user, admin_user, reason_title, reason_summary):
                 summary=f"전문가({user.username})의 {reason_summary}으로 매치 취소"
             )
 
+class BulkUserConflict(Exception):
+    """일괄 작업 대상 사용자 중 일부가 조회 이후 다른 요청에서 먼저 변경됨 (트랜잭션 전체 롤백 대상)"""
+
+# [추가] 일괄 작업용: 여러 사용자의 진행 중인 매치를 set 단위로 취소하고 로그를 기록하는 헬퍼 함수
+def cancel_active_matches_bulk(users, admin_user, reason_title, reason_summary, now):
+    """users({user_id: username})가 일반 사용자 또는 전문가로 참여한 IN_PROGRESS 매치를 한 번에 취소합니다.
+
+    cancel_active_matches()와 같은 결과(매치 취소, 전문가 매치의 상대 사용자 match_status 복구, 매치마다 MatchLog)를
+    조회 1회 + UPDATE 2회 + MatchLog executemany 1회로 처리합니다. 대상 사용자 본인의 match_status는 호출한 쪽에서 바꿉니다.
+    취소한 매치의 전문가 ID 집합을 반환합니다."""
+    user_ids = list(users)
+    matches = db.session.execute(
+        select(Match.id, Match.user_id, Match.expert_id).where(
+            Match.status == MatchStatus.IN_PROGRESS,
+            or_(Match.user_id.in_(user_ids), Match.expert_id.in_(user_ids))
+        )
+    ).all()
+    if not matches:
+        return set()
+    result = db.session.execute(
+        update(Match)
+        .where(Match.id.in_([m.id for m in matches]), Match.status == MatchStatus.IN_PROGRESS)
+        .values(status=MatchStatus.CANCELLED, closed_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != len(matches):
+        raise BulkUserConflict()
+    # 전문가가 대상인 매치의 상대 사용자는 다시 매칭 대기 상태로
+    counterpart_ids = {m.user_id for m in matches if m.user_id not in users}
+    if counterpart_ids:
+        db.session.execute(
+            update(User)
+            .where(User.id.in_(counterpart_ids))
+            .values(match_status=MatchStatus.UNASSIGNED)
+            .execution_options(synchronize_session=False)
+        )
+    match_logs = []
+    for m in matches:
+        if m.user_id in users:
+            summary = f"일반사용자({users[m.user_id]})의 {reason_summary}으로 매치 취소: {reason_summary}"
+        else:
+            summary = f"전문가({users[m.expert_id]})의 {reason_summary}으로 매치 취소"
+        match_logs.append(dict(
+            admin_id=admin_user.id,
+            match_id=m.id,
+            user_id=m.user_id,
+            expert_id=m.expert_id,
+            match_status=MatchStatus.CANCELLED,
+            log_title=reason_title,
+            log_summary=summary,
+            timestamp=now,
+            remote_addr=request.remote_addr,
+        ))
+    db.session.execute(insert(MatchLog), match_logs)   # executemany
+    load_deltas = Counter()   # 전문가별 진행 중 매칭 수 (apps/expert_directory.py)
+    load_deltas.subtract(m.expert_id for m in matches)
+    expert_directory.record_bulk_loads(load_deltas)
+    return {m.expert_id for m in matches}
+
 def log_action(title, summary, target_user_id=None, status_code=200):
     """관리자 행동을 로그로 기록하는 헬퍼 함수"""
     try:
@@ -97,52 +167,32 @@ def log_action(title, summary, target_user_id=None, status_code=200):
 @admin.route('/dashboard')
 @admin_required
 def dashboard():
-    #total_users = User.query.count()
-    total_users = User.query.filter(User.is_deleted == False).count()
-    total_services = 3  # AIService.query.count()
-    pending_subscriptions = 4 # Subscription.query.filter_by(status='pending').count()
-    
-    # 최근 7일간 서비스 사용량 (로그인 제외)
-    #seven_days_ago = datetime.now() - datetime.timedelta(days=7)
-    recent_service_usage = 0
-
-    #recent_service_usage = db.session.query(func.sum(UsageLog.usage_count))\
-    #                            .filter(UsageLog.timestamp >= seven_days_ago)\
-    #                            .filter(UsageLog.usage_type.notin_([UsageLog.UsageType.LOGIN]))\
-    #                            .scalar() or 0
-
+    # 건수는 count_cache 전체 건수, 최근 7일 사용량은 usage_rollups 일별 집계에서 계산 (DASHBOARD_CACHE_TTL초 캐시)
+    metrics = dashboard_metrics.snapshot()
     return render_template('admin/dashboard.html',
                            title='관리자 대시보드',
-                           total_users=total_users,
-                           total_services=total_services,
-                           pending_subscriptions=pending_subscriptions,
-                           recent_service_usage=recent_service_usage)
-@admin.route('/users', methods=['GET'])
-@admin_required
-def users():
-    PER_PAGE = 10
-    page = request.args.get('page', 1, type=int)
-    search_query = request.args.get('search', '', type=str)
+                           **metrics)
+def _filtered_users_query(args, strict=False):
+    """사용자 관리 목록의 검색 조건(args: search/user_type/is_active/created_at)을 적용한 쿼리.
+
+    (쿼리, search, user_type, is_active, created_at)을 반환합니다. 목록 화면과 일괄 작업(검색 결과 전체)이 함께 사용합니다.
+    목록 화면은 잘못된 조건을 경고 후 무시하지만, strict=True(일괄 작업)이면 대상이 넓어지지 않도록 ValueError를 발생시킵니다."""
+    search_query = args.get('search', '', type=str)
     # logging
     current_app.logger.debug("search_query: %s", search_query)
     # --- New search parameters ---
-    user_type_query = request.args.get('user_type', '', type=str) # 'admin', 'expert', or 'user'
-    is_active_query = request.args.get('is_active', '', type=str) # 'true', 'false', or ''
-    created_at_query = request.args.get('created_at', '', type=str) # YYYY-MM-DD format
+    user_type_query = args.get('user_type', '', type=str) # 'admin', 'expert', or 'user'
+    is_active_query = args.get('is_active', '', type=str) # 'true', 'false', or ''
+    created_at_query = args.get('created_at', '', type=str) # YYYY-MM-DD format
     # ---------------------------
     # [수정] users_query = User.query 기본 쿼리에 is_deleted == False 조건을 추가합니다.
     users_query = User.query.filter(User.is_deleted == False)
     # logging
     current_app.logger.debug("users_query: %s", users_query)
 
-    # 검색 기능 (사용자 이름 또는 이메일)
+    # 검색 기능 (사용자 이름 또는 이메일): users_fts 인덱스, 없으면 ilike (apps/user_search.py)
     if search_query:
-        users_query = users_query.filter(
-            or_(
-                User.username.ilike(f'%{search_query}%'),
-                User.email.ilike(f'%{search_query}%')
-            )
-        )
+        users_query = users_query.filter(user_search.user_filter(search_query, fields=('username', 'email')))
     # 사용자 타입(관리자, 전문가, 사용자) 여부 필터링
 #    if user_type_query :
 #        if user_type_query == 'admin': 
@@ -154,6 +204,8 @@ def users():
 # 동일 코드
     if user_type_query and user_type_query in [e.value for e in UserType]:
         users_query = users_query.filter(User.user_type == UserType(user_type_query))
+    elif user_type_query and strict:
+        raise ValueError('유효하지 않은 사용자 유형입니다.')
 
     # 활성 상태 필터링
 #    if is_active_query:
@@ -162,6 +214,8 @@ def users():
 #        elif is_active_query == 'false':
 #            users_query = users_query.filter(User.is_active == False)
 # 동일 코드
+    if is_active_query and strict and is_active_query.lower() not in ('true', 'false'):
+        raise ValueError('유효하지 않은 활성 상태 조건입니다.')
     if is_active_query:
         is_active_bool = is_active_query.lower()=='true'
         users_query = users_query.filter(User.is_active == is_active_bool)
@@ -176,14 +230,25 @@ def users():
             users_query = users_query.filter(User.created_at >= start_of_day, User.created_at <= end_of_day)
             #users_query = users_query.filter(User.created_at.between(start_of_day, end_of_day))
         except ValueError:
+            if strict:
+                raise ValueError('유효하지 않은 가입일 형식입니다. YYYY-MM-DD 형식으로 입력해주세요.')
             flash('유효하지 않은 가입일 형식입니다. YYYY-MM-DD 형식으로 입력해주세요.', 'warning')
             created_at_query = ""
-    # 페이지네이션 적용
-    users_pagination = users_query.order_by(User.created_at.desc()).paginate(page=page, per_page=PER_PAGE, error_out=False)
-    users = users_pagination.items
-    # request.args에서 'page'만 뺀 딕셔너리 준비해서 템플릿에 넘긴다
+    return users_query, search_query, user_type_query, is_active_query, created_at_query
+
+@admin.route('/users', methods=['GET'])
+@admin_required
+def users():
+    PER_PAGE = 10
+    users_query, search_query, user_type_query, is_active_query, created_at_query = _filtered_users_query(request.args)
+    # 페이지네이션 적용 ((created_at, id) 키셋: after/before 커서)
+    users_pagination = keyset_paginate(users_query, User.created_at, User.id,
+                                       after=request.args.get('after'), before=request.args.get('before'),
+                                       per_page=PER_PAGE)
+    # request.args에서 페이지 커서만 뺀 딕셔너리 준비해서 템플릿에 넘긴다
     filtered_args = request.args.to_dict(flat=True)
-    filtered_args.pop('page', None)
+    for cursor_arg in ('page', 'after', 'before'):
+        filtered_args.pop(cursor_arg, None)
     return render_template(
         'admin/users.html',
         title='사용자 관리',
@@ -233,6 +298,8 @@ def toggle_user_active(user_id):
 
         log_action(title="계정상태변경", summary=summary, target_user_id=user.id)
         db.session.commit()
+        api_key_cache.invalidate_user(user.id)
+        expert_scope.invalidate_user(user.id)
         flash(f'{user.username} 계정 상태가 {action}으로 변경되었습니다.', 'success')
         
     except Exception as e:
@@ -279,6 +346,7 @@ def user_type_change(user_id):
                 target_user_id=user.id
             )
             db.session.commit()
+            expert_scope.invalidate_user(user.id)
             flash('사용자역할변경이 성공적으로 처리되었습니다.', 'success')
         except Exception as e:
             db.session.rollback()
@@ -335,6 +403,8 @@ def delete_user(user_id):
         summary = f"'{user.username}' 계정을 삭제 처리."
         log_action(title="사용자삭제", summary=summary, target_user_id=user.id)
         db.session.commit()
+        api_key_cache.invalidate_user(user.id)
+        expert_scope.invalidate_user(user.id)
         flash(f'{user.username} 계정이 성공적으로 삭제 처리되었습니다.', 'success')
         
     except AttributeError:
@@ -346,6 +416,94 @@ def delete_user(user_id):
         
     return redirect(url_for('admin.users', **request.args))
 
+# 일괄 작업: action -> (매치 취소 사유, 로그 제목, 로그 요약 형식, 표시 이름)
+BULK_USER_ACTIONS = {
+    'deactivate': (MatchLogType.MATCH_USER_ACCOUNT_INACTIVE.value, UserLogType.ACCOUNT_STATUS_CHANGE.value,
+                   "'{}' 계정을 비활성 상태로 변경.", "비활성"),
+    'delete': (MatchLogType.MATCH_USER_ACCOUNT_DELETE.value, UserLogType.USER_ERASE.value,
+               "'{}' 계정을 삭제 처리.", "삭제"),
+}
+
+@admin.route('/users/bulk_action', methods=['POST'])
+@admin_required
+def bulk_user_action():
+    """선택한 사용자(scope=selected) 또는 검색 결과 전체(scope=filtered)를 한 번에 비활성/삭제 처리합니다."""
+    filter_args = {key: request.form.get(key, '') for key in ('search', 'user_type', 'is_active', 'created_at')}
+    redirect_url = url_for('admin.users', **{key: value for key, value in filter_args.items() if value})
+    action = request.form.get('action', '')
+    if action not in BULK_USER_ACTIONS:
+        flash('유효하지 않은 일괄 작업입니다.', 'danger')
+        return redirect(redirect_url)
+
+    if request.form.get('scope') == 'filtered':
+        try:   # 해석할 수 없는 조건을 무시하면 대상이 넓어지므로 작업을 중단
+            users_query = _filtered_users_query(request.form, strict=True)[0]
+        except ValueError as e:
+            flash(f'{e} 일괄 작업을 취소했습니다.', 'danger')
+            return redirect(redirect_url)
+    else:
+        user_ids = list(dict.fromkeys(int(id_str) for id_str in request.form.getlist('user_ids') if id_str.isdigit()))
+        if not user_ids:
+            flash('사용자를 하나 이상 선택해야 합니다.', 'danger')
+            return redirect(redirect_url)
+        if current_user.id in user_ids:
+            flash('자신의 계정은 일괄 작업에서 제외했습니다.', 'warning')
+        users_query = User.query.filter(User.id.in_(user_ids), User.is_deleted == False)
+    users_query = users_query.filter(User.id != current_user.id)
+    if action == 'deactivate':
+        users_query = users_query.filter(User.is_active == True)
+    targets = dict(users_query.with_entities(User.id, User.username).order_by(None).all())
+    if not targets:
+        flash('처리할 사용자가 없습니다.', 'info')
+        return redirect(redirect_url)
+
+    reason, log_title, summary_format, label = BULK_USER_ACTIONS[action]
+    try:
+        now = datetime.now()
+        # 계정 상태 변경은 UPDATE 한 번 (삭제는 User.soft_delete()와 같이 is_deleted + 비활성)
+        values = dict(is_active=False, match_status=MatchStatus.UNASSIGNED)
+        if action == 'delete':
+            values['is_deleted'] = True
+        result = db.session.execute(
+            update(User)
+            .where(User.id.in_(list(targets)), User.is_deleted == False)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount != len(targets):
+            raise BulkUserConflict()
+        affected_expert_ids = cancel_active_matches_bulk(targets, current_user, reason, reason, now)
+        db.session.execute(insert(Log), [dict(   # executemany
+            user_id=current_user.id,
+            target_user_id=user_id,
+            endpoint=request.path,
+            log_title=log_title,
+            log_summary=summary_format.format(username),
+            timestamp=now,
+            remote_addr=request.remote_addr,
+            response_status_code=200,
+        ) for user_id, username in targets.items()])
+        db.session.commit()
+    except BulkUserConflict:
+        db.session.rollback()
+        flash('처리 중 다른 작업이 일부 사용자 또는 매칭을 변경했습니다. 다시 시도해 주세요.', 'warning')
+        return redirect(redirect_url)
+    except Exception as e:
+        db.session.rollback()
+        flash(f'일괄 작업 중 오류가 발생했습니다: {e}', 'danger')
+        return redirect(redirect_url)
+
+    # bulk update()/insert는 ORM 이벤트를 거치지 않으므로 캐시를 직접 무효화
+    api_key_cache.invalidate_user(*targets)
+    expert_scope.invalidate_user(*targets)
+    expert_scope.invalidate_expert(*affected_expert_ids)
+    expert_directory.invalidate()
+    invalidate_match_counts()
+    count_cache.invalidate('users:all')
+    count_cache.invalidate('users:active')
+    flash(f'총 {len(targets)}명의 계정을 {label} 처리했습니다.', 'success')
+    return redirect(redirect_url)
+
 @admin.route('/users/create', methods=['GET', 'POST'])
 @admin_required
 def create_user():
@@ -398,17 +556,8 @@ def log_list():
     # GET 또는 POST 리디렉션 후 필터링 로직
     # 폼 데이터가 유효한 경우에만 필터링을 적용
     if form.keyword.data:
-        keyword = f"%{form.keyword.data}%"
-        logs_query = logs_query.join(User, Log.user_id == User.id, isouter=True).filter(
-            or_(
-                cast(Log.id, String).ilike(keyword),
-                cast(Log.target_user_id, String).ilike(keyword),
-                Log.endpoint.ilike(keyword),
-                Log.log_title.ilike(keyword),
-                Log.log_summary.ilike(keyword),
-                User.username.ilike(keyword)
-            )
-        )
+        # logs_fts(FTS5) 인덱스 검색, 없으면 ilike (apps/log_search.py)
+        logs_query = log_search.filter(logs_query, form.keyword.data)
         filtered_args['keyword'] = form.keyword.data
 
     if form.log_title.data:
@@ -425,12 +574,9 @@ def log_list():
         logs_query = logs_query.filter(Log.timestamp <= end_of_day)
         filtered_args['end_date'] = form.end_date.data.isoformat()
 
-    page = request.args.get('page', 1, type=int)
-    logs_pagination = logs_query.order_by(Log.timestamp.desc()).paginate(
-        page=page, 
-        per_page=PER_PAGE, 
-        error_out=False
-    )
+    # 최신순: 키워드 검색(logs_fts)은 logs.id 역순, 그 외는 (timestamp, id) 역순
+    logs_pagination = keyset_paginate(logs_query, after=request.args.get('after'), before=request.args.get('before'),
+                                      per_page=PER_PAGE, **log_search.keyset_options(form.keyword.data))
     
     return render_template(
         'admin/logs.html',
@@ -518,26 +664,17 @@ def log_list():
 def logs_download_csv():
     # logging
     current_app.logger.debug("Starting: %s", "download")
-    # 1. 검색 쿼리 패러미터
-    search_query = request.args.get('search_query', '', type=str)
-    log_title_query = request.args.get('log_title_query', '', type=str)
+    # 1. 검색 쿼리 패러미터 (로그 조회 화면의 keyword/log_title, 이전 이름 search_query/log_title_query도 허용)
+    search_query = request.args.get('keyword', '', type=str) or request.args.get('search_query', '', type=str)
+    log_title_query = request.args.get('log_title', '', type=str) or request.args.get('log_title_query', '', type=str)
     start_date = request.args.get('start_date', '', type=str)
     end_date = request.args.get('end_date', '', type=str)
-    # 2. [수정] N+1 문제 방지 및 안정성 확보를 위해 joinedload와 join을 분리
-    logs_query = Log.query.options(joinedload(Log.actor))
+    # 2. CSV 행은 actor 관계를 사용하지 않으므로 joinedload 없이 조회
+    logs_query = Log.query
     # 3. 검색 기능
-    # 3.1 일반 검색어 필터링
+    # 3.1 일반 검색어 필터링 (log_list()와 동일: logs_fts 인덱스, 없으면 ilike)
     if search_query:
-        search_filter = or_(
-            cast(Log.user_id, String).ilike(f'%{search_query}%'),
-            cast(Log.target_user_id, String).ilike(f'%{search_query}%'),
-            Log.endpoint.ilike(f'%{search_query}%'),
-            Log.log_title.ilike(f'%{search_query}%'),
-            Log.log_summary.ilike(f'%{search_query}%'),
-            User.username.ilike(f'%{search_query}%')
-        )
-        # join은 search_query에 사용자 이름이 포함된 경우에만 추가합니다.
-        logs_query = logs_query.join(Log.actor).filter(search_filter)
+        logs_query = log_search.filter(logs_query, search_query)
     # 3.2 로그 제목 필터링
     if log_title_query:
         logs_query = logs_query.filter(Log.log_title == log_title_query)
@@ -561,18 +698,12 @@ def logs_download_csv():
     # 현재 URL에서 쿼리 파라미터(필터링 조건) 추출
     search_params = request.args.to_dict()
     current_app.logger.debug("CSV 다운로드 필터링 조건: %s", search_params)
-    # 4. 쿼리 실행(검색한 모든 결과 가져오기)
-    logs_results = logs_query.order_by(Log.timestamp.desc()).all()
-    # 5. CSV 데이터 생성
-    si = StringIO()
-    cw = csv.writer(si)
-    # 6. CSV 헤더(컬럼이름)
+    # 4. CSV 헤더(컬럼이름)
     headers = ['ID', '사용자(ID)', '대상(ID)', '엔드포인트', '로그제목', '내용요약', '타임스탬프']
-    cw.writerow(headers)
-    # 7. 데이터 행 추가
-    for logs_result in logs_results:
+    # 5. 데이터 행
+    def row(logs_result):
         timestamp_str = f"'{logs_result.timestamp.strftime('%Y-%m-%d %H:%M:%S.%f')}"
-        row = [
+        return [
             logs_result.id,
             logs_result.user_id,
             logs_result.target_user_id,
@@ -581,12 +712,5 @@ def logs_download_csv():
             logs_result.log_summary,
             timestamp_str
         ]
-        cw.writerow(row)
-    # StringIO의 내용을 가져와서 utf-8-sig로 인코딩합니다.
-    output_str = si.getvalue()
-    output_bytes = output_str.encode('utf-8-sig')
-    si.close()
-    # csv 파일을 응답으로 반환
-    response = Response(output_bytes, mimetype='text/csv; charset=utf-8-sig')
-    response.headers['Content-Disposition'] = f'attachment; filename=userlog_results_{datetime.now().strftime("%Y%m%d%H%M%S")}.csv'
-    return response
\ No newline at end of file
+    # 6. 검색한 모든 결과를 나누어 읽으며 CSV 스트리밍 반환
+    return stream_csv(logs_query.order_by(*log_search.order_by(search_query)), headers, row, 'userlog_results')
\ No newline at end of file
@@ -0,0 +1,129 @@
+# apps/api_key_cache.py
+# API Key 인증 캐시 (api_predict 경로에서 매 요청 APIKey 조회 제거)
+import threading, time
+from collections import OrderedDict, namedtuple
+from apps.invalidation import SignalFile
+
+# 뷰에서 사용하는 api_key_entry.id / .user_id 와 동일한 속성 이름 유지
+APIKeyIdentity = namedtuple('APIKeyIdentity', ['id', 'user_id', 'daily_limit', 'monthly_limit',
+                                               'user_daily_limit', 'user_monthly_limit'])
+
+class APIKeyCache:
+    """key_string -> APIKeyIdentity를 API_KEY_CACHE_TTL초 동안 보관하는 LRU 캐시입니다.
+
+    - 활성 키 + 활성/미삭제 사용자만 캐시합니다 (유효하지 않은 키는 캐시하지 않음).
+    - 키 토글/삭제, 사용자 비활성화/삭제 시 invalidate_key()/invalidate_user()를 커밋 후 호출합니다.
+    - 무효화 시 instance/api_key_cache.signal 파일의 mtime을 갱신하며, 다른 워커 프로세스는
+      조회 때마다 mtime(stat 1회)을 비교해 변경되었으면 자신의 캐시를 비웁니다 (DB 조회 없음)."""
+
+    def __init__(self, app=None):
+        self.ttl = 60
+        self.maxsize = 10000
+        self.signal = SignalFile('api_key_cache')
+        self._entries = OrderedDict()   # key_string -> (만료시각, APIKeyIdentity)
+        self._keys_by_id = {}           # api_key id -> key_string
+        self._keys_by_user = {}         # user_id -> {key_string}
+        self._lock = threading.Lock()
+        self._generation = 0            # 무효화마다 증가: DB 조회 중 무효화된 결과는 캐시하지 않음
+        self.hits = 0
+        self.misses = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.ttl = app.config.get('API_KEY_CACHE_TTL', 60)
+        self.maxsize = app.config.get('API_KEY_CACHE_SIZE', 10000)
+        self.signal.init_app(app)
+        app.extensions['api_key_cache'] = self
+
+    # ---------- 조회 ----------
+    def lookup(self, key_string):
+        """유효한 API Key이면 APIKeyIdentity, 아니면 None을 반환합니다."""
+        if self.signal.changed():
+            self.clear()
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key_string)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key_string)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            generation = self._generation
+        identity = self._load(key_string)
+        if identity is not None:
+            self._put(key_string, identity, now + self.ttl, generation)
+        return identity
+
+    @staticmethod
+    def _load(key_string):
+        from apps.dbmodels import APIKey, User
+        row = (APIKey.query
+               .join(User, User.id == APIKey.user_id)
+               .filter(APIKey.key_string == key_string, APIKey.is_active == True,
+                       User.is_active == True, User.is_deleted == False)
+               .with_entities(APIKey.id, APIKey.user_id, APIKey.daily_limit, APIKey.monthly_limit,
+                              User.daily_limit, User.monthly_limit)
+               .first())
+        return APIKeyIdentity(*row) if row else None
+
+    def _put(self, key_string, identity, expires_at, generation):
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._discard(key_string)
+            self._entries[key_string] = (expires_at, identity)
+            self._keys_by_id[identity.id] = key_string
+            self._keys_by_user.setdefault(identity.user_id, set()).add(key_string)
+            while len(self._entries) > self.maxsize:
+                self._discard(next(iter(self._entries)))
+
+    def _discard(self, key_string):
+        entry = self._entries.pop(key_string, None)
+        if entry is None:
+            return
+        identity = entry[1]
+        self._keys_by_id.pop(identity.id, None)
+        user_keys = self._keys_by_user.get(identity.user_id)
+        if user_keys is not None:
+            user_keys.discard(key_string)
+            if not user_keys:
+                del self._keys_by_user[identity.user_id]
+
+    # ---------- 무효화 ----------
+    def invalidate_key(self, key_id):
+        with self._lock:
+            self._generation += 1
+            key_string = self._keys_by_id.get(key_id)
+            if key_string is not None:
+                self._discard(key_string)
+        self.signal.touch()
+
+    def invalidate_user(self, *user_ids):
+        with self._lock:
+            self._generation += 1
+            for user_id in user_ids:
+                for key_string in list(self._keys_by_user.get(user_id, ())):
+                    self._discard(key_string)
+        self.signal.touch()
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._keys_by_id.clear()
+            self._keys_by_user.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / total, 4) if total else 0.0,
+            }
+
+api_key_cache = APIKeyCache()   # create_app()에서 init_app
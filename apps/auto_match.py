@@ -0,0 +1,194 @@
+# apps/auto_match.py
+# 자동 매칭: 미배정 사용자를 진행 중 매칭이 가장 적은 전문가부터 배정 (힙 기반 최소 부하 스케줄러, 전문가별 상한)
+import hashlib, heapq
+from collections import Counter, namedtuple
+from datetime import datetime
+from sqlalchemy import func, insert, select, update
+
+ExpertLoad = namedtuple('ExpertLoad', ['id', 'username', 'expertise_field', 'career_years', 'load', 'assigned'])
+AutoMatchPlan = namedtuple('AutoMatchPlan', ['assignments', 'experts', 'waiting', 'capacity', 'expertise_field', 'fingerprint'])
+
+class MatchConflict(Exception):
+    """배정하려던 사용자 중 일부가 조회 이후 다른 요청에서 먼저 매칭되었거나,
+    전문가의 진행 중 매칭 수가 상한을 넘게 됨 (트랜잭션 전체 롤백 대상)"""
+
+class AutoMatcher:
+    """매칭 대기(UNASSIGNED) 사용자를 활성 전문가에게 부하가 고르게 배정합니다.
+
+    - plan(): 전문가별 현재 IN_PROGRESS 매칭 수(load)를 (load, -career_years, id) 최소 힙에 넣고,
+      오래 기다린 사용자부터 힙 맨 앞(가장 한가하고 같은 부하면 경력이 긴) 전문가에게 배정한 뒤 load + 1로 다시 넣습니다.
+      전문가 목록과 load는 expert_directory 캐시에서 읽습니다.
+      load가 capacity(AUTO_MATCH_CAPACITY)에 이르면 힙에서 빠지므로 사용자 U명, 전문가 E명에 O(U log E)입니다.
+      expertise_field를 주면 그 분야 전문가(ExpertProfile)만 대상으로 합니다. DB는 읽기만 하므로 dry-run 결과로 씁니다.
+      plan.fingerprint는 배정 목록의 해시로, 미리보기한 계획과 실행할 계획이 같은지 확인하는 데 씁니다.
+    - apply(): plan의 배정을 create_matches()로 한 트랜잭션에 만들고 커밋합니다. load 캐시는 워커별이므로
+      커밋 전에 계획에 포함된 전문가의 진행 중 매칭 수를 DB에서 다시 세어(GROUP BY 1회) capacity를 넘으면
+      MatchConflict로 롤백합니다.
+    - create_matches(): (user_id, expert_id) 목록을 사용자 상태 UPDATE 1회 + Match/MatchLog 일괄 insert로 생성합니다.
+      관리자 화면의 수동 매칭 생성(match.create_new_match)도 같은 함수를 사용합니다."""
+
+    def __init__(self, app=None):
+        self.capacity = 10
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.capacity = app.config.get('AUTO_MATCH_CAPACITY', 10)
+        app.extensions['auto_matcher'] = self
+
+    # ---------- 배정 계획 ----------
+    @staticmethod
+    def expertise_fields():
+        """활성 전문가 프로필에 등록된 전문 분야 목록"""
+        from apps.expert_directory import expert_directory
+        return expert_directory.expertise_fields()
+
+    def plan(self, expertise_field=None, capacity=None, limit=None):
+        """배정 계획 (DB 변경 없음). limit를 주면 오래 기다린 사용자 limit명까지만 배정합니다."""
+        from apps.extensions import db
+        from apps.dbmodels import MatchStatus, User, UserType
+        from apps.expert_directory import expert_directory
+        capacity = capacity or self.capacity
+
+        # 활성 전문가와 전문가별 진행 중 매칭 수 (apps/expert_directory.py 캐시)
+        experts = expert_directory.experts(expertise_field)
+        loads = expert_directory.loads()
+
+        user_query = select(User.id).where(
+            User.user_type == UserType.USER, User.match_status == MatchStatus.UNASSIGNED,
+            User.is_active == True, User.is_deleted == False
+        ).order_by(User.created_at, User.id)
+        if limit:
+            user_query = user_query.limit(limit)
+        user_ids = db.session.execute(user_query).scalars().all()
+
+        heap = [(loads.get(expert.id, 0), -(expert.career_years or 0), expert.id)
+                for expert in experts if loads.get(expert.id, 0) < capacity]
+        heapq.heapify(heap)
+        assignments = []
+        for user_id in user_ids:
+            if not heap:
+                break
+            load, seniority, expert_id = heap[0]
+            assignments.append((user_id, expert_id))
+            if load + 1 < capacity:
+                heapq.heapreplace(heap, (load + 1, seniority, expert_id))
+            else:
+                heapq.heappop(heap)
+
+        assigned = Counter(expert_id for _, expert_id in assignments)
+        expert_loads = [ExpertLoad(expert.id, expert.username, expert.expertise_field, expert.career_years,
+                                   loads.get(expert.id, 0), assigned[expert.id]) for expert in experts]
+        return AutoMatchPlan(assignments, expert_loads, len(user_ids) - len(assignments), capacity, expertise_field,
+                             self.fingerprint(assignments))
+
+    @staticmethod
+    def fingerprint(assignments):
+        """배정 목록 [(user_id, expert_id)]의 해시 (미리보기한 계획과 실행할 계획 비교용)"""
+        return hashlib.sha256(','.join(f'{user_id}:{expert_id}' for user_id, expert_id in assignments).encode()).hexdigest()
+
+    # ---------- 매칭 생성 ----------
+    def apply(self, plan, admin_id=None):
+        """plan의 배정으로 매칭을 생성하고 커밋합니다. 생성 건수를 반환합니다 (MatchConflict 시 롤백 후 전파)."""
+        from apps.extensions import db
+        from apps.expert_directory import expert_directory
+        from apps.expert_scope import expert_scope
+        from apps.match_counts import invalidate_match_counts
+        if not plan.assignments:
+            return 0
+        try:
+            expert_ids = self._lock_experts(plan.assignments)
+            self.create_matches(plan.assignments, admin_id, summary_title="자동 매칭 생성")
+            self._check_capacity(expert_ids, plan.capacity)
+            db.session.commit()
+        except MatchConflict:
+            db.session.rollback()
+            expert_directory.invalidate()   # 다시 계획할 때 DB의 현재 load를 읽도록
+            raise
+        except Exception:
+            db.session.rollback()
+            raise
+        invalidate_match_counts()
+        expert_scope.invalidate_expert(*{expert_id for _, expert_id in plan.assignments})
+        return len(plan.assignments)
+
+    @staticmethod
+    def _lock_experts(assignments):
+        """계획에 포함된 전문가 행을 잠가(SELECT ... FOR UPDATE) 같은 전문가에 대한 동시 배정을 직렬화합니다.
+        SQLite는 FOR UPDATE가 없지만 create_matches()의 UPDATE부터 커밋까지 쓰기 잠금을 잡으므로 같은 효과입니다."""
+        from apps.extensions import db
+        from apps.dbmodels import User
+        expert_ids = sorted({expert_id for _, expert_id in assignments})
+        db.session.execute(select(User.id).where(User.id.in_(expert_ids)).with_for_update()).all()
+        return expert_ids
+
+    @staticmethod
+    def _check_capacity(expert_ids, capacity):
+        """이번 배정을 포함한 전문가별 진행 중 매칭 수를 다시 세어 capacity를 넘으면 MatchConflict"""
+        from apps.extensions import db
+        from apps.dbmodels import Match, MatchStatus
+        over = db.session.execute(
+            select(Match.expert_id).where(Match.expert_id.in_(expert_ids), Match.status == MatchStatus.IN_PROGRESS)
+            .group_by(Match.expert_id).having(func.count() > capacity)
+        ).scalars().all()
+        if over:
+            raise MatchConflict()
+
+    @staticmethod
+    def _insert_matches(rows):
+        """Match 행들(사용자별 1건)을 insert하고 {user_id: match_id}를 반환합니다.
+
+        INSERT ... RETURNING을 지원하는 DB(SQLite 3.35+, PostgreSQL)는 insertmanyvalues로 묶어 실행하고
+        반환 행을 user_id로 대응시킵니다 (반환 순서 보장을 요구하면 SQLite는 행마다 insert로 바뀜).
+        그 외 DB는 ORM flush로 id를 얻습니다."""
+        from apps.extensions import db
+        from apps.dbmodels import Match
+        if db.engine.dialect.insert_returning:
+            result = db.session.execute(insert(Match).returning(Match.user_id, Match.id), rows)
+            return dict(result.tuples().all())
+        matches = [Match(**row) for row in rows]
+        db.session.add_all(matches)
+        db.session.flush()
+        return {m.user_id: m.id for m in matches}
+
+    def create_matches(self, assignments, admin_id=None, summary_title="신규 매칭 생성"):
+        """(user_id, expert_id) 목록(사용자 중복 없음)으로 매칭과 MatchLog를 만듭니다. 커밋은 호출한 쪽에서 합니다.
+
+        사용자 상태를 UNASSIGNED -> IN_PROGRESS로 한 번에 바꾸며, 그 사이 다른 요청이 먼저 매칭한 사용자가 있으면
+        MatchConflict를 발생시킵니다."""
+        from apps.extensions import db
+        from apps.dbmodels import MatchLog, MatchLogType, MatchStatus, User
+        from apps.expert_directory import expert_directory
+        user_ids = [user_id for user_id, _ in assignments]
+        result = db.session.execute(
+            update(User)
+            .where(User.id.in_(user_ids), User.match_status == MatchStatus.UNASSIGNED)
+            .values(match_status=MatchStatus.IN_PROGRESS)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount != len(user_ids):
+            raise MatchConflict()
+
+        now = datetime.now()
+        match_ids = self._insert_matches([
+            dict(user_id=user_id, expert_id=expert_id, status=MatchStatus.IN_PROGRESS, created_at=now)
+            for user_id, expert_id in assignments
+        ])
+        usernames = dict(db.session.execute(
+            select(User.id, User.username).where(User.id.in_(set(user_ids) | {e for _, e in assignments}))
+        ).all())
+        db.session.execute(insert(MatchLog), [dict(   # executemany
+            admin_id=admin_id,
+            user_id=user_id,
+            expert_id=expert_id,
+            match_id=match_ids[user_id],
+            match_status=MatchStatus.IN_PROGRESS,
+            log_title=MatchLogType.MATCH_CREATE.value,
+            log_summary=f"{summary_title}: 사용자({usernames.get(user_id)})({user_id}) - "
+                        f"전문가({usernames.get(expert_id, '알 수 없는 전문가')})({expert_id})",
+            timestamp=now,
+        ) for user_id, expert_id in assignments])
+        expert_directory.record_bulk_loads(Counter(expert_id for _, expert_id in assignments))
+        return match_ids
+
+auto_matcher = AutoMatcher()   # create_app()에서 init_app
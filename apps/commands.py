@@ -0,0 +1,158 @@
+# apps/commands.py
+# flask CLI 명령어 (create_app()에서 register_commands로 등록)
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import desc, text
+from apps.extensions import db
+from apps.dbmodels import Match, MatchStatus, UsageLog
+from apps.iris.dbmodels import IrisResult
+
+def _index_check_queries():
+    """(설명, ORM 쿼리, 사용되어야 하는 인덱스) 목록. 뷰에서 사용하는 쿼리와 동일한 형태로 구성합니다."""
+    return [
+        ("iris.results (일반 사용자 목록)",
+         IrisResult.query.filter_by(user_id=1).filter(IrisResult.is_deleted == False)
+         .order_by(IrisResult.created_at.desc()).limit(10),
+         'ix_prediction_results_user_id_is_deleted_created_at'),
+        ("iris.results (일반 사용자 목록, 확인 여부 필터)",
+         IrisResult.query.filter_by(user_id=1).filter(IrisResult.confirm == True, IrisResult.is_deleted == False)
+         .order_by(IrisResult.created_at.desc()).limit(10),
+         'ix_prediction_results_user_id_is_deleted_created_at'),
+        ("iris.results (관리자 전체 목록)",
+         IrisResult.query.filter(IrisResult.is_deleted == False).order_by(IrisResult.created_at.desc()).limit(10),
+         'ix_prediction_results_is_deleted_created_at'),
+        ("confirm/edit/delete 최신 UsageLog",
+         UsageLog.query.filter_by(prediction_result_id=1).order_by(desc(UsageLog.timestamp)).limit(1),
+         'ix_usage_logs_prediction_result_id_timestamp'),
+        ("iris.logs (일반 사용자 목록)",
+         UsageLog.query.filter_by(user_id=1).order_by(UsageLog.timestamp.desc()).limit(10),
+         'ix_usage_logs_user_id_timestamp'),
+        ("전문가 매칭 범위 (expert_id, status)",
+         Match.query.filter_by(expert_id=1, status=MatchStatus.IN_PROGRESS),
+         'ix_matches_expert_id_status'),
+    ]
+
+@click.command('check-indexes')
+@with_appcontext
+def check_indexes():
+    """주요 조회 쿼리에 EXPLAIN QUERY PLAN을 실행하여 복합 인덱스 사용 여부를 확인합니다."""
+    if db.engine.dialect.name != 'sqlite':
+        click.echo("EXPLAIN QUERY PLAN 확인은 SQLite에서만 지원합니다.")
+        return
+    failed = 0
+    for title, query, index_name in _index_check_queries():
+        sql = str(query.statement.compile(db.engine, compile_kwargs={'literal_binds': True}))
+        plan = [row[3] for row in db.session.execute(text('EXPLAIN QUERY PLAN ' + sql))]
+        used = any(index_name in detail for detail in plan)
+        failed += 0 if used else 1
+        click.echo(f"[{'OK' if used else 'FAIL'}] {title}: {index_name}")
+        for detail in plan:
+            click.echo(f"       {detail}")
+    if failed:
+        raise click.ClickException(f"{failed}개 쿼리가 기대한 인덱스를 사용하지 않습니다. 'flask db upgrade' 적용 여부를 확인하세요.")
+    click.echo("모든 쿼리가 기대한 인덱스를 사용합니다.")
+
+@click.command('verify-model')
+@click.option('--samples', default=10000, show_default=True, help='무작위 검증 입력 개수')
+@with_appcontext
+def verify_model(samples):
+    """NumPy 추론 엔진(LinearModelInference)의 predict/predict_proba가 sklearn 결과와 정확히 일치하는지 확인합니다."""
+    import pickle
+    import numpy as np
+    from sklearn.datasets import load_iris
+    from apps.iris.inference import LinearModelInference
+    from apps.iris.views import MODEL_PATH
+
+    with open(MODEL_PATH, 'rb') as f:
+        estimator = pickle.load(f)
+    engine = LinearModelInference.from_estimator(estimator)
+
+    # iris 학습 데이터 + 특성 범위를 넓힌 무작위 입력
+    rng = np.random.default_rng(0)
+    inputs = np.vstack([load_iris().data, rng.uniform(0.0, 10.0, size=(samples, engine.n_features_in_))])
+
+    failed = 0
+    checks = [
+        ("predict (배치)", estimator.predict(inputs), engine.predict(inputs)),
+        ("predict_proba (배치)", estimator.predict_proba(inputs), engine.predict_proba(inputs)),
+        ("predict (1행 단위)", np.array([estimator.predict(row.reshape(1, -1))[0] for row in inputs[:500]]),
+         np.array([engine.predict(row.reshape(1, -1))[0] for row in inputs[:500]])),
+        ("predict_proba (1행 단위)", np.vstack([estimator.predict_proba(row.reshape(1, -1)) for row in inputs[:500]]),
+         np.vstack([engine.predict_proba(row.reshape(1, -1)) for row in inputs[:500]])),
+    ]
+    for title, expected, actual in checks:
+        equal = np.array_equal(expected, actual)
+        failed += 0 if equal else 1
+        max_diff = float(np.max(np.abs(np.asarray(expected, dtype=float) - np.asarray(actual, dtype=float))))
+        click.echo(f"[{'OK' if equal else 'FAIL'}] {title}: {len(expected)}건, 최대 오차 {max_diff:.3g}")
+    if failed:
+        raise click.ClickException("NumPy 추론 결과가 sklearn과 일치하지 않습니다.")
+    click.echo("NumPy 추론 결과가 sklearn과 정확히 일치합니다.")
+
+@click.command('rebuild-log-search')
+@with_appcontext
+def rebuild_log_search():
+    """관리자 로그 검색 인덱스(logs_fts)를 logs/users 내용으로 다시 채웁니다."""
+    from apps.log_search import log_search
+    if not log_search.available():
+        raise click.ClickException("logs_fts 테이블이 없습니다. SQLite에서 'flask db upgrade'를 먼저 적용하세요.")
+    with db.engine.begin() as connection:
+        count = log_search.rebuild(connection)
+    click.echo(f"logs_fts: {count}건 색인 완료")
+
+@click.command('rebuild-user-search')
+@with_appcontext
+def rebuild_user_search():
+    """사용자 검색 인덱스(users_fts)를 users 내용으로 다시 채웁니다."""
+    from apps.user_search import user_search
+    if not user_search.available():
+        raise click.ClickException("users_fts 테이블이 없습니다. SQLite에서 'flask db upgrade'를 먼저 적용하세요.")
+    with db.engine.begin() as connection:
+        count = user_search.rebuild(connection)
+    click.echo(f"users_fts: {count}건 색인 완료")
+
+@click.command('rebuild-usage-rollups')
+@click.option('--since', type=click.DateTime(formats=['%Y-%m-%d']), default=None,
+              help='이 날짜(YYYY-MM-DD) 이후만 다시 집계 (기본: 전체)')
+@with_appcontext
+def rebuild_usage_rollups(since):
+    """사용량 일별 집계(usage_rollups)를 usage_logs에서 다시 계산합니다 (백필/보정용)."""
+    from apps.usage_rollup import usage_rollup
+    from apps.usage_writer import usage_writer
+    usage_writer.flush()   # 대기 중인 UsageLog를 먼저 기록
+    with db.engine.begin() as connection:
+        count = usage_rollup.rebuild(connection, since.date() if since else None)
+    click.echo(f"usage_rollups: {count}개 집계 행 생성" + (f" ({since.date()} 이후)" if since else ""))
+
+@click.command('auto-match')
+@click.option('--field', 'expertise_field', default=None, help='이 전문 분야(ExpertProfile.expertise_field) 전문가에게만 배정')
+@click.option('--capacity', type=click.IntRange(min=1), default=None, help='전문가별 최대 진행 매칭 수 (기본: AUTO_MATCH_CAPACITY)')
+@click.option('--limit', type=click.IntRange(min=1), default=None, help='오래 기다린 사용자부터 최대 N명만 배정')
+@click.option('--dry-run', is_flag=True, help='배정 계획만 출력하고 매칭을 생성하지 않음')
+@with_appcontext
+def auto_match(expertise_field, capacity, limit, dry_run):
+    """매칭 대기 사용자를 진행 중 매칭이 적은 전문가부터 자동 배정합니다."""
+    from flask import current_app
+    from apps.auto_match import MatchConflict, auto_matcher
+    from apps.dbmodels import User
+    plan = auto_matcher.plan(expertise_field, capacity, limit)
+    for expert in plan.experts:
+        click.echo(f"  전문가 {expert.username}({expert.id}) [{expert.expertise_field or '-'}, {expert.career_years or 0}년]: "
+                   f"진행 중 {expert.load} + 배정 {expert.assigned} -> {expert.load + expert.assigned}")
+    click.echo(f"배정 {len(plan.assignments)}명, 상한({plan.capacity}건) 도달로 대기 {plan.waiting}명")
+    if dry_run or not plan.assignments:
+        return
+    admin = User.query.filter_by(email=current_app.config.get('ADMIN_EMAIL')).first()
+    try:
+        created = auto_matcher.apply(plan, admin.id if admin else None)
+    except MatchConflict:
+        raise click.ClickException("처리 중 다른 작업이 일부 사용자를 먼저 매칭했거나 전문가의 진행 중 매칭 수가 상한을 넘게 됩니다. 다시 실행하세요.")
+    click.echo(f"매칭 {created}건 생성 완료")
+
+def register_commands(app):
+    app.cli.add_command(check_indexes)
+    app.cli.add_command(verify_model)
+    app.cli.add_command(rebuild_log_search)
+    app.cli.add_command(rebuild_user_search)
+    app.cli.add_command(rebuild_usage_rollups)
+    app.cli.add_command(auto_match)
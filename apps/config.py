@@ -24,3 +24,44 @@ class Config:
     ADMIN_USERNAME = os.getenv('ADMIN_USERNAME')    
     ADMIN_EMAIL = os.getenv('ADMIN_EMAIL')    
     ADMIN_PASSWORD = os.getenv('ADMIN_PASSWORD')
+# IRIS API
+    IRIS_BATCH_MAX_ROWS = int(os.getenv('IRIS_BATCH_MAX_ROWS', 1000))   # 일괄 추론 1회 요청당 최대 행 수
+    IRIS_RESULT_CACHE_SIZE = int(os.getenv('IRIS_RESULT_CACHE_SIZE', 10000))   # 중복 추론 확인 LRU 캐시 크기
+    # 동시 추론 요청 마이크로 배치 (window_ms 동안 또는 max_rows행까지 모아 1회 predict)
+    # /iris/inference_metrics 의 batched/direct 지표를 비교하여 활성화 여부 결정
+    IRIS_MICROBATCH_ENABLED = os.getenv('IRIS_MICROBATCH_ENABLED', 'false').lower() == 'true'
+    IRIS_MICROBATCH_WINDOW_MS = float(os.getenv('IRIS_MICROBATCH_WINDOW_MS', 2))
+    IRIS_MICROBATCH_MAX_ROWS = int(os.getenv('IRIS_MICROBATCH_MAX_ROWS', 64))
+# UsageLog 비동기 일괄 기록 (apps/usage_writer.py)
+    USAGE_LOG_ASYNC = os.getenv('USAGE_LOG_ASYNC', 'true').lower() == 'true'
+    USAGE_LOG_FLUSH_ROWS = int(os.getenv('USAGE_LOG_FLUSH_ROWS', 100))     # N건마다 기록
+    USAGE_LOG_FLUSH_MS = int(os.getenv('USAGE_LOG_FLUSH_MS', 200))         # 또는 T 밀리초마다 기록
+    USAGE_LOG_QUEUE_SIZE = int(os.getenv('USAGE_LOG_QUEUE_SIZE', 10000))   # 대기열 최대 크기
+    USAGE_LOG_JOURNAL_DIR = os.getenv('USAGE_LOG_JOURNAL_DIR')             # 지정 시 디스크 저널 사용 (예: instance/usage_journal)
+    USAGE_LOG_RETRY_MAX_MS = int(os.getenv('USAGE_LOG_RETRY_MAX_MS', 30000))   # 기록 실패 시 재시도 간격 상한 (지수 백오프)
+    USAGE_LOG_RETRY_ROWS = int(os.getenv('USAGE_LOG_RETRY_ROWS', 10000))       # 기록 실패 묶음 보관 한도 (초과분은 오래된 것부터 버림)
+# API Key 인증 캐시 (apps/api_key_cache.py)
+    API_KEY_CACHE_TTL = int(os.getenv('API_KEY_CACHE_TTL', 60))        # 초
+    API_KEY_CACHE_SIZE = int(os.getenv('API_KEY_CACHE_SIZE', 10000))
+# API 일/월 사용량 쿼터 (apps/quota.py, APIKey/User의 daily_limit·monthly_limit 적용)
+    QUOTA_ENABLED = os.getenv('QUOTA_ENABLED', 'true').lower() == 'true'
+    QUOTA_CHECKPOINT_SECONDS = int(os.getenv('QUOTA_CHECKPOINT_SECONDS', 30))   # quota_counters 기록 주기
+# 결과/로그 Parquet·Arrow 다운로드 (apps/exports.py, pyarrow 필요)
+    EXPORT_ROW_GROUP_SIZE = int(os.getenv('EXPORT_ROW_GROUP_SIZE', 65536))   # 행 그룹(record batch)당 행 수
+    SQLITE_WAL = os.getenv('SQLITE_WAL', 'true').lower() == 'true'   # 긴 다운로드(읽기) 중에도 쓰기가 막히지 않도록 WAL 사용
+# 목록 화면 건수 캐시 (apps/count_cache.py)
+    COUNT_CACHE_TTL = int(os.getenv('COUNT_CACHE_TTL', 30))                     # 검색 조건별 건수 보관 시간(초)
+    COUNT_CACHE_APPROX_LIMIT = int(os.getenv('COUNT_CACHE_APPROX_LIMIT', 1000))  # 키워드 검색 건수는 이 값까지만 셈 ('N+' 표시)
+    COUNT_CACHE_SIZE = int(os.getenv('COUNT_CACHE_SIZE', 1000))
+# 전문가 조회 범위 캐시 (apps/expert_scope.py, 단건 결과 권한 확인용)
+    EXPERT_SCOPE_CACHE_TTL = int(os.getenv('EXPERT_SCOPE_CACHE_TTL', 60))     # 초
+    EXPERT_SCOPE_CACHE_SIZE = int(os.getenv('EXPERT_SCOPE_CACHE_SIZE', 10000))
+# 관리자 대시보드 지표 (apps/dashboard_metrics.py)
+    DASHBOARD_CACHE_TTL = int(os.getenv('DASHBOARD_CACHE_TTL', 30))     # 지표 보관 시간(초)
+    DASHBOARD_USAGE_DAYS = int(os.getenv('DASHBOARD_USAGE_DAYS', 7))    # 사용량 집계 기간(일, 오늘 포함)
+# 사용자 검색 (apps/user_search.py)
+    USER_SEARCH_BROAD_LIMIT = int(os.getenv('USER_SEARCH_BROAD_LIMIT', 1000))  # 인덱스 일치 ID가 이보다 많으면 목록은 ilike로 훑음
+# 전문가 디렉터리 캐시 (apps/expert_directory.py, 전문가 자동완성/진행 중 매칭 수)
+    EXPERT_DIRECTORY_TTL = int(os.getenv('EXPERT_DIRECTORY_TTL', 300))   # 전체 다시 읽기 주기(초, 보정용)
+# 자동 매칭 (apps/auto_match.py)
+    AUTO_MATCH_CAPACITY = int(os.getenv('AUTO_MATCH_CAPACITY', 10))   # 전문가별 최대 진행 중(IN_PROGRESS) 매칭 수
@@ -0,0 +1,200 @@
+# apps/count_cache.py
+# 목록 화면 건수 캐시 (페이지마다 COUNT(*) 재계산 제거)
+import threading, time
+from collections import OrderedDict
+from sqlalchemy import event, func, inspect as sa_inspect, select
+from apps.invalidation import SignalFile
+
+class CountCache:
+    """목록 건수를 캐시합니다.
+
+    - 조건 없는 전체 건수(register_total()로 등록)는 DB에서 한 번 계산한 뒤 세션 커밋 시
+      INSERT/삭제/조건 컬럼 변경(소프트 삭제, 상태 변경 등)에 맞춰 증감하여 항상 정확하게 유지합니다.
+    - 검색 조건이 있는 건수는 (이름, 정규화된 조건) 키로 COUNT_CACHE_TTL초 동안 보관합니다.
+      키워드 검색처럼 비싼 조건은 approximate=True로 COUNT_CACHE_APPROX_LIMIT건까지만 세어 'N+'로 표시합니다.
+    - 등록된 모델이 변경되면 해당 이름의 조건별 캐시를 비우고 instance/count_cache.signal의 mtime을 갱신합니다.
+      다른 워커 프로세스는 조회 때마다 mtime을 비교해 변경되었으면 자신의 캐시를 비웁니다.
+    - bulk update()/delete()처럼 ORM 이벤트를 거치지 않는 변경 후에는 invalidate()를 호출해야 합니다."""
+
+    def __init__(self, app=None):
+        self.ttl = 30
+        self.approx_limit = 1000
+        self.maxsize = 1000
+        self.signal = SignalFile('count_cache')
+        self._specs = {}                # name -> (model, criteria dict)
+        self._totals = {}               # name -> 정확한 전체 건수
+        self._counts = OrderedDict()    # (name, signature) -> (만료시각, count, approximate)
+        self._lock = threading.Lock()
+        self._generation = 0            # flush/증감/무효화마다 증가: 계산 중 변경된 전체 건수는 저장하지 않음
+        self._inflight = 0              # 증감을 기록했지만 아직 끝나지 않은 트랜잭션 수 (DB 커밋 ~ after_commit 사이 포함)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        from apps.extensions import db
+        self.ttl = app.config.get('COUNT_CACHE_TTL', 30)
+        self.approx_limit = app.config.get('COUNT_CACHE_APPROX_LIMIT', 1000)
+        self.maxsize = app.config.get('COUNT_CACHE_SIZE', 1000)
+        self.signal.init_app(app)
+        if not event.contains(db.session, 'after_flush', self._after_flush):
+            event.listen(db.session, 'after_flush', self._after_flush)
+            event.listen(db.session, 'after_commit', self._after_commit)
+            event.listen(db.session, 'after_soft_rollback', self._after_rollback)
+            event.listen(db.session, 'after_transaction_end', self._after_transaction_end)
+        app.extensions['count_cache'] = self
+
+    def register_total(self, name, model, **criteria):
+        """model.query.filter_by(**criteria).count()를 name으로 등록합니다 (criteria는 컬럼 == 값 조건)."""
+        self._specs[name] = (model, criteria)
+
+    # ---------- 조회 ----------
+    def total(self, name):
+        """등록된 전체 건수 (정확한 값)
+
+        COUNT(*)는 다른 세션이 DB에 커밋한 뒤 after_commit 증감을 반영하기 전의 행을 이미 셀 수 있으므로,
+        조회 중 세대가 바뀌었거나 증감을 기록한 트랜잭션이 진행 중이면 결과를 저장하지 않습니다 (이중 반영 방지)."""
+        if self.signal.changed():
+            self.clear()
+        with self._lock:
+            if name in self._totals:
+                return self._totals[name]
+            generation = self._generation
+        model, criteria = self._specs[name]
+        count = model.query.filter_by(**criteria).order_by(None).count()
+        with self._lock:
+            if generation == self._generation and not self._inflight:
+                self._totals[name] = count
+        return count
+
+    def count(self, name, query, filters=None, approximate=False):
+        """(count, approximate) 반환. filters가 모두 비어 있으면 등록된 전체 건수를 사용합니다.
+
+        filters는 화면의 검색 조건 dict이며 빈 값을 제외하고 정렬하여 캐시 키로 사용합니다."""
+        signature = tuple(sorted((key, str(value)) for key, value in (filters or {}).items()
+                                 if value not in (None, '')))
+        if not signature and name in self._specs:
+            return self.total(name), False
+        if self.signal.changed():
+            self.clear()
+        key = (name, signature)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._counts.get(key)
+            if entry is not None and entry[0] > now:
+                self._counts.move_to_end(key)
+                return entry[1], entry[2]
+        count, is_approximate = self._count_query(query, self.approx_limit if approximate else None)
+        with self._lock:
+            self._counts[key] = (now + self.ttl, count, is_approximate)
+            while len(self._counts) > self.maxsize:
+                self._counts.popitem(last=False)
+        return count, is_approximate
+
+    @staticmethod
+    def _count_query(query, limit):
+        from apps.extensions import db
+        query = query.order_by(None)
+        if limit is None:
+            return query.count(), False
+        subquery = query.limit(limit + 1).subquery()
+        count = db.session.execute(select(func.count()).select_from(subquery)).scalar()
+        return (limit, True) if count > limit else (count, False)
+
+    def paginate(self, query, name, filters=None, approximate=False, page=1, per_page=10):
+        """Flask-SQLAlchemy paginate()와 같은 Pagination을 반환하되 total은 캐시에서 가져옵니다.
+
+        pagination.approximate가 True이면 total은 하한값입니다 (템플릿에서 'N+'로 표시)."""
+        total, is_approximate = self.count(name, query, filters, approximate)
+        pagination = query.paginate(page=page, per_page=per_page, error_out=False, count=False)
+        pagination.total = total
+        pagination.approximate = is_approximate
+        return pagination
+
+    # ---------- 커밋 시 증감 ----------
+    def _after_flush(self, session, flush_context):
+        if not self._specs:
+            return
+        deltas = session.info.setdefault('count_cache_deltas', {})
+        for name, (model, criteria) in self._specs.items():
+            touched, delta = False, 0
+            for obj in session.new:
+                if isinstance(obj, model):
+                    touched = True
+                    delta += self._matches(obj, criteria, previous=False)
+            for obj in session.deleted:
+                if isinstance(obj, model):
+                    touched = True
+                    delta -= self._matches(obj, criteria, previous=True)
+            for obj in session.dirty:
+                if isinstance(obj, model) and session.is_modified(obj):
+                    touched = True
+                    delta += (self._matches(obj, criteria, previous=False)
+                              - self._matches(obj, criteria, previous=True))
+            if touched:   # delta가 0이어도 조건별 캐시는 무효화
+                deltas[name] = deltas.get(name, 0) + delta
+        if deltas and not session.info.get('count_cache_inflight'):
+            session.info['count_cache_inflight'] = True
+            with self._lock:
+                self._generation += 1
+                self._inflight += 1
+
+    @staticmethod
+    def _matches(obj, criteria, previous):
+        state = sa_inspect(obj)
+        for key, expected in criteria.items():
+            value = getattr(obj, key)
+            if previous:
+                history = state.attrs[key].history
+                if history.deleted:
+                    value = history.deleted[0]
+            if value != expected:
+                return False
+        return True
+
+    def _after_commit(self, session):
+        deltas = session.info.pop('count_cache_deltas', None)
+        if not deltas:
+            return
+        with self._lock:
+            self._generation += 1
+            for name, delta in deltas.items():
+                if name in self._totals:
+                    self._totals[name] += delta
+                for key in [key for key in self._counts if key[0] == name]:
+                    del self._counts[key]
+        self.signal.touch()
+
+    def _after_rollback(self, session, previous_transaction):
+        session.info.pop('count_cache_deltas', None)
+
+    def _after_transaction_end(self, session, transaction):
+        if transaction.parent is None and session.info.pop('count_cache_inflight', None):
+            with self._lock:
+                self._generation += 1
+                self._inflight -= 1
+
+    def invalidate(self, name=None):
+        """전체(또는 name의) 건수를 다시 계산하도록 비웁니다."""
+        with self._lock:
+            self._generation += 1
+            if name is None:
+                self._totals.clear()
+                self._counts.clear()
+            else:
+                self._totals.pop(name, None)
+                for key in [key for key in self._counts if key[0] == name]:
+                    del self._counts[key]
+        self.signal.touch()
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._totals.clear()
+            self._counts.clear()
+
+    def stats(self):
+        with self._lock:
+            return {'totals': dict(self._totals), 'filtered_entries': len(self._counts),
+                    'ttl_seconds': self.ttl, 'approx_limit': self.approx_limit}
+
+count_cache = CountCache()   # create_app()에서 init_app
@@ -0,0 +1,76 @@
+# apps/dashboard_metrics.py
+# 관리자 대시보드 지표: 건수 캐시(count_cache) + 사용량 일별 집계(usage_rollups)로 계산하여 짧은 TTL로 보관
+import threading, time
+from datetime import date, timedelta
+
+class DashboardMetrics:
+    """관리자 대시보드에 표시할 지표를 계산합니다.
+
+    - 사용자/서비스/구독 대기 건수는 count_cache에 등록한 전체 건수로, 커밋 시 증감되어 COUNT(*)를 실행하지 않습니다.
+    - 최근 N일 사용량(서비스별, API/웹 구분)은 usage_rollups의 일별 집계 행만 읽으므로 usage_logs 크기와 무관합니다.
+    - 계산한 결과는 DASHBOARD_CACHE_TTL초 동안 보관하여 같은 기간의 요청은 DB를 조회하지 않습니다."""
+
+    def __init__(self, app=None):
+        self.ttl = 30
+        self.usage_days = 7
+        self._snapshot = None    # (만료시각, dict)
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        from apps.count_cache import count_cache
+        from apps.dbmodels import Service, Subscription, User
+        self.ttl = app.config.get('DASHBOARD_CACHE_TTL', 30)
+        self.usage_days = app.config.get('DASHBOARD_USAGE_DAYS', 7)
+        self._snapshot = None
+        count_cache.register_total('users:all', User, is_deleted=False)
+        count_cache.register_total('users:active', User, is_active=True, is_deleted=False)
+        count_cache.register_total('services:active', Service, is_active=True)
+        count_cache.register_total('subscriptions:pending', Subscription, status='pending')
+        app.extensions['dashboard_metrics'] = self
+
+    def snapshot(self):
+        """대시보드 지표 dict (TTL 동안 같은 객체 반환)"""
+        now = time.monotonic()
+        with self._lock:
+            if self._snapshot is not None and self._snapshot[0] > now:
+                return self._snapshot[1]
+        metrics = self._compute()
+        with self._lock:
+            self._snapshot = (now + self.ttl, metrics)
+        return metrics
+
+    def invalidate(self):
+        with self._lock:
+            self._snapshot = None
+
+    def _compute(self):
+        from apps.count_cache import count_cache
+        from apps.dbmodels import Service, UsageType
+        from apps.extensions import db
+        from apps.usage_rollup import usage_rollup
+        start = date.today() - timedelta(days=self.usage_days - 1)
+        service_names = dict(db.session.execute(db.select(Service.id, Service.servicename)).all())
+        usage_by_service = [
+            {'service_id': row.service_id, 'servicename': service_names.get(row.service_id, f'#{row.service_id}'),
+             'usage_count': row.usage_count}
+            for row in usage_rollup.summary(start=start, group_by=('service_id',))
+        ]
+        usage_by_service.sort(key=lambda item: item['usage_count'], reverse=True)
+        usage_by_type = {usage_type: 0 for usage_type in UsageType}
+        for row in usage_rollup.summary(start=start, group_by=('usage_type',)):
+            usage_by_type[row.usage_type] = row.usage_count
+        return {
+            'total_users': count_cache.total('users:all'),
+            'active_users': count_cache.total('users:active'),
+            'total_services': count_cache.total('services:active'),
+            'pending_subscriptions': count_cache.total('subscriptions:pending'),
+            'usage_days': self.usage_days,
+            'usage_start': start,
+            'recent_service_usage': sum(usage_by_type.values()),
+            'usage_by_service': usage_by_service,
+            'usage_by_type': usage_by_type,
+        }
+
+dashboard_metrics = DashboardMetrics()   # create_app()에서 init_app
@@ -73,7 +73,7 @@ class User(db.Model, UserMixin):
     daily_limit = db.Column(db.Integer, default=1000)
     monthly_limit = db.Column(db.Integer, default=5000)
     #created_at = db.Column(db.DateTime, default=func.now())
-    created_at = db.Column(db.DateTime, default=datetime.now())
+    created_at = db.Column(db.DateTime, default=datetime.now(), index=True)  # 사용자 목록 키셋 페이지네이션
     #updated_at = db.Column(db.DateTime, default=func.now(), onupdate=func.now())
     updated_at = db.Column(db.DateTime, default=datetime.now(), onupdate=datetime.now())
     # [새로 추가된 필드]
@@ -175,7 +175,7 @@ class Log(db.Model):
 class Match(db.Model):
     __tablename__ = "matches"
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)  # 매칭 검색 (apps/user_search.py)
     expert_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     status = db.Column(db.Enum(MatchStatus), nullable=False, default=MatchStatus.IN_PROGRESS)
     #created_at = db.Column(db.DateTime, default=func.now())
@@ -189,6 +189,8 @@ class Match(db.Model):
     expert = db.relationship('User', foreign_keys=[expert_id], back_populates='matches_as_expert')
     # [추가] back_populates 추가
     match_logs = db.relationship('MatchLog', back_populates='match', lazy=True)    
+    # 전문가별 진행 중 매치 조회 (expert_id, status)
+    __table_args__ = (db.Index('ix_matches_expert_id_status', 'expert_id', 'status'),)
     def __repr__(self):
         return f'<Match {self.user_id} - {self.expert_id}>'
 
@@ -210,7 +212,7 @@ class MatchLog(db.Model):
     #details = db.Column(db.Text, nullable=True)
 
     #timestamp = db.Column(db.DateTime, default=func.now())
-    timestamp = db.Column(db.DateTime, default=datetime.now())
+    timestamp = db.Column(db.DateTime, default=datetime.now(), index=True)  # 매칭 로그 목록 키셋 페이지네이션
     remote_addr = db.Column(db.String(45), nullable=True)
     response_code = db.Column(db.Integer, nullable=True)
     
@@ -318,10 +320,54 @@ class UsageLog(db.Model):
     user = db.relationship('User', back_populates='usage_logs')
     api_key = db.relationship('APIKey', back_populates='usage_logs')
     service = db.relationship('Service', back_populates='usage_logs')
+    # 추론 결과별 최신 로그 조회 (prediction_result_id ORDER BY timestamp DESC), 사용자별 로그 목록
+    __table_args__ = (
+        db.Index('ix_usage_logs_prediction_result_id_timestamp', 'prediction_result_id', 'timestamp'),
+        db.Index('ix_usage_logs_user_id_timestamp', 'user_id', 'timestamp'),
+    )
 
     def __repr__(self) -> str:
         return f"<UsageLog(service_id={self.service_id}, usage_type='{self.usage_type}', timestamp={self.timestamp})>"
 
+# ----------- 사용량 일별 집계 (apps/usage_rollup.py) -----------
+class UsageRollup(db.Model):
+    __tablename__ = "usage_rollups"
+    id = db.Column(db.Integer, primary_key=True)
+    day = db.Column(db.Date, nullable=False)                            # UsageLog.timestamp의 날짜
+    user_id = db.Column(db.Integer, nullable=False, default=0)          # 0: 사용자 없음
+    service_id = db.Column(db.Integer, nullable=False)
+    api_key_id = db.Column(db.Integer, nullable=False, default=0)       # 0: API Key 없음 (웹 UI 등)
+    usage_type = db.Column(db.Enum(UsageType), nullable=False)
+    log_status = db.Column(db.String(10), nullable=False)
+    log_count = db.Column(db.Integer, nullable=False, default=0)        # usage_logs 행 수
+    usage_count = db.Column(db.Integer, nullable=False, default=0)      # usage_logs.usage_count 합계
+    updated_at = db.Column(db.DateTime)
+    __table_args__ = (
+        db.UniqueConstraint('day', 'user_id', 'service_id', 'api_key_id', 'usage_type', 'log_status', name='uq_usage_rollups_key'),
+        db.Index('ix_usage_rollups_user_id_day', 'user_id', 'day'),
+        db.Index('ix_usage_rollups_api_key_id_day', 'api_key_id', 'day'),
+    )
+
+    def __repr__(self) -> str:
+        return f"<UsageRollup({self.day} user={self.user_id} service={self.service_id} key={self.api_key_id} {self.usage_type} {self.log_status}={self.log_count})>"
+
+# ----------- API 사용량 쿼터 카운터 체크포인트 (apps/quota.py) -----------
+class QuotaCounter(db.Model):
+    __tablename__ = "quota_counters"
+    id = db.Column(db.Integer, primary_key=True)
+    subject_type = db.Column(db.String(10), nullable=False)   # 'api_key' 또는 'user'
+    subject_id = db.Column(db.Integer, nullable=False)
+    period = db.Column(db.String(10), nullable=False)         # 'day' 또는 'month'
+    period_start = db.Column(db.Date, nullable=False)         # 해당 일/월의 시작일
+    count = db.Column(db.Integer, nullable=False, default=0)  # 기간 내 API 사용 횟수 (모든 프로세스 합계)
+    updated_at = db.Column(db.DateTime)
+    __table_args__ = (
+        db.UniqueConstraint('subject_type', 'subject_id', 'period', 'period_start', name='uq_quota_counters_subject_period'),
+    )
+
+    def __repr__(self) -> str:
+        return f"<QuotaCounter({self.subject_type}:{self.subject_id} {self.period}={self.count})>"
+
 # ----------- 예측 결과 기본 모델 (PredictionResult) -----------
 class PredictionResult(db.Model):
     __tablename__ = "prediction_results"
@@ -350,6 +396,11 @@ class PredictionResult(db.Model):
     user = db.relationship("User", back_populates="prediction_results")
     api_key = db.relationship("APIKey", back_populates="prediction_results")
     service = db.relationship('Service', back_populates='prediction_results')
+    # 결과 목록 조회 (user_id, is_deleted 필터 + created_at 정렬), 관리자 전체 목록
+    __table_args__ = (
+        db.Index('ix_prediction_results_user_id_is_deleted_created_at', 'user_id', 'is_deleted', 'created_at'),
+        db.Index('ix_prediction_results_is_deleted_created_at', 'is_deleted', 'created_at'),
+    )
 
     def __repr__(self) -> str:
         return f"<PredictionResult(user_id={self.user_id}, service_id={self.service_id}, predicted_class='{self.predicted_class}')>"
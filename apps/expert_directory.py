@@ -0,0 +1,216 @@
+# apps/expert_directory.py
+# 활성 전문가 디렉터리 캐시: 이름/이메일 접두어 인덱스(자동완성) + 전문가별 진행 중(IN_PROGRESS) 매칭 수
+import bisect, threading, time
+from collections import Counter, namedtuple
+from sqlalchemy import event, func, inspect as sa_inspect, select
+from apps.invalidation import SignalFile
+
+ExpertEntry = namedtuple('ExpertEntry', ['id', 'username', 'email', 'expertise_field', 'career_years'])
+
+# 디렉터리 항목에 영향을 주는 User 컬럼 (변경 시 디렉터리를 다시 읽음)
+DIRECTORY_USER_COLUMNS = ('username', 'email', 'user_type', 'is_active', 'is_deleted')
+
+class ExpertDirectory:
+    """활성 전문가 목록과 전문가별 진행 중 매칭 수(load)를 프로세스 메모리에 보관합니다.
+
+    - 전문가 목록은 처음 사용할 때 한 번 읽어 사용자명 순으로 정렬하고, 소문자 사용자명/이메일의 정렬 목록을
+      접두어 인덱스로 둡니다. search()는 bisect로 접두어 범위만 훑으므로 전문가 수와 무관하게 limit건만 봅니다.
+    - load는 GROUP BY 한 번으로 채운 뒤 세션 커밋 시 Match의 insert/삭제/상태·전문가 변경에 맞춰 증감합니다.
+      bulk update()/insert처럼 ORM 이벤트를 거치지 않는 변경은 커밋 전에 record_bulk_loads()로 증감을 알려야 합니다
+      (커밋되면 반영, 롤백되면 버림).
+    - 전문가의 User(이름/이메일/역할/활성/삭제)나 ExpertProfile이 바뀌면 목록을 다시 읽습니다.
+      bulk update(User) 후에는 invalidate()를 호출합니다.
+    - 변경 시 instance/expert_directory.signal의 mtime을 갱신하며 다른 워커 프로세스는 이를 비교해 캐시를 비웁니다.
+      EXPERT_DIRECTORY_TTL초가 지나면 목록과 load를 다시 읽습니다 (보정용)."""
+
+    def __init__(self, app=None):
+        self.ttl = 300
+        self.signal = SignalFile('expert_directory')
+        self._entries = None     # expert_id -> ExpertEntry (사용자명 순)
+        self._keys = []          # 정렬된 (소문자 사용자명/이메일, expert_id)
+        self._loads = None       # expert_id -> IN_PROGRESS 매칭 수
+        self._expires_at = 0
+        self._lock = threading.Lock()
+        self._generation = 0     # flush/변경/무효화마다 증가: DB 조회 중 변경된 결과는 보관하지 않음
+        self._inflight = 0       # 변경을 기록했지만 아직 끝나지 않은 트랜잭션 수 (DB 커밋 ~ after_commit 사이 포함)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        from apps.extensions import db
+        self.ttl = app.config.get('EXPERT_DIRECTORY_TTL', 300)
+        self.signal.init_app(app)
+        self.clear()
+        if not event.contains(db.session, 'after_flush', self._after_flush):
+            event.listen(db.session, 'after_flush', self._after_flush)
+            event.listen(db.session, 'after_commit', self._after_commit)
+            event.listen(db.session, 'after_soft_rollback', self._after_rollback)
+            event.listen(db.session, 'after_transaction_end', self._after_transaction_end)
+        app.extensions['expert_directory'] = self
+
+    # ---------- 조회 ----------
+    def _snapshot(self):
+        """(entries, keys, loads) - 비어 있거나 만료되었으면 DB에서 다시 읽음.
+        다른 세션의 DB 커밋 후 after_commit 증감 전에 읽은 load가 이중 반영되지 않도록, 조회 중 세대가 바뀌었거나
+        변경을 기록한 트랜잭션이 진행 중이면 결과를 보관하지 않습니다."""
+        if self.signal.changed():
+            self.clear()
+        with self._lock:
+            if self._entries is not None and self._loads is not None and self._expires_at > time.monotonic():
+                return self._entries, self._keys, self._loads
+            generation = self._generation
+        entries, keys, loads = self._load()
+        with self._lock:
+            if generation == self._generation and not self._inflight:
+                self._entries, self._keys, self._loads = entries, keys, loads
+                self._expires_at = time.monotonic() + self.ttl
+        return entries, keys, loads
+
+    @staticmethod
+    def _load():
+        from apps.extensions import db
+        from apps.dbmodels import ExpertProfile, Match, MatchStatus, User, UserType
+        rows = db.session.execute(
+            select(User.id, User.username, User.email, ExpertProfile.expertise_field, ExpertProfile.career_years)
+            .outerjoin(ExpertProfile, ExpertProfile.user_id == User.id)
+            .where(User.user_type == UserType.EXPERT, User.is_active == True, User.is_deleted == False)
+            .order_by(User.username, User.id)
+        ).all()
+        entries = {row.id: ExpertEntry(*row) for row in rows}
+        keys = sorted([((entry.username or '').casefold(), entry.id) for entry in entries.values()]
+                      + [(entry.email.casefold(), entry.id) for entry in entries.values()])
+        # 전문가별 진행 중 매칭 수 (ix_matches_expert_id_status)
+        loads = Counter(dict(db.session.execute(
+            select(Match.expert_id, func.count()).where(Match.status == MatchStatus.IN_PROGRESS)
+            .group_by(Match.expert_id)
+        ).all()))
+        return entries, keys, loads
+
+    def experts(self, expertise_field=None):
+        """활성 전문가 목록 (사용자명 순). expertise_field를 주면 그 분야 전문가만 반환합니다."""
+        entries = self._snapshot()[0]
+        return [entry for entry in entries.values()
+                if not expertise_field or entry.expertise_field == expertise_field]
+
+    def get(self, expert_id):
+        """활성 전문가이면 ExpertEntry, 아니면 None"""
+        return self._snapshot()[0].get(expert_id)
+
+    def load(self, expert_id):
+        """전문가의 진행 중(IN_PROGRESS) 매칭 수"""
+        return self._snapshot()[2][expert_id]
+
+    def loads(self):
+        """{expert_id: 진행 중 매칭 수} 사본"""
+        return dict(self._snapshot()[2])
+
+    def expertise_fields(self):
+        """활성 전문가에 등록된 전문 분야 목록"""
+        return sorted({entry.expertise_field for entry in self._snapshot()[0].values() if entry.expertise_field})
+
+    def search(self, query='', limit=20):
+        """사용자명/이메일 접두어(대소문자 무시) 또는 ID가 일치하는 전문가 최대 limit명"""
+        entries, keys, _ = self._snapshot()
+        prefix = (query or '').strip().casefold()
+        if not prefix:
+            return list(entries.values())[:limit]
+        found = {}
+        if prefix.isdigit() and int(prefix) in entries:
+            found[int(prefix)] = entries[int(prefix)]
+        index = bisect.bisect_left(keys, (prefix,))
+        while index < len(keys) and len(found) < limit and keys[index][0].startswith(prefix):
+            expert_id = keys[index][1]
+            found.setdefault(expert_id, entries[expert_id])
+            index += 1
+        return list(found.values())
+
+    # ---------- 변경 반영 ----------
+    def record_bulk_loads(self, deltas):
+        """현재 트랜잭션의 bulk 변경으로 생긴 {expert_id: load 증감}을 기록합니다 (커밋 시 반영)."""
+        from apps.extensions import db
+        changes = db.session.info.setdefault('expert_directory_changes', {'loads': Counter(), 'stale': False})
+        changes['loads'].update(deltas)
+        self._mark_inflight(db.session)
+
+    def _mark_inflight(self, session):
+        """변경을 기록한 트랜잭션을 끝날 때까지 진행 중으로 표시합니다 (그동안 DB에서 읽은 결과는 보관하지 않음)."""
+        if not session.info.get('expert_directory_inflight'):
+            session.info['expert_directory_inflight'] = True
+            with self._lock:
+                self._generation += 1
+                self._inflight += 1
+
+    def adjust_loads(self, deltas):
+        """{expert_id: 증감}을 load에 더합니다."""
+        deltas = {expert_id: delta for expert_id, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        with self._lock:
+            self._generation += 1
+            if self._loads is not None:
+                self._loads.update(deltas)
+        self.signal.touch()
+
+    def invalidate(self):
+        """전문가 목록과 load를 다시 읽도록 비웁니다."""
+        self.clear()
+        self.signal.touch()
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries, self._keys, self._loads = None, [], None
+
+    def _after_flush(self, session, flush_context):
+        from apps.dbmodels import ExpertProfile, Match, MatchStatus, User, UserType
+        changes = session.info.setdefault('expert_directory_changes', {'loads': Counter(), 'stale': False})
+        for obj in session.new:
+            if isinstance(obj, Match) and obj.status == MatchStatus.IN_PROGRESS:
+                changes['loads'][obj.expert_id] += 1
+            elif (isinstance(obj, User) and obj.user_type == UserType.EXPERT) or isinstance(obj, ExpertProfile):
+                changes['stale'] = True
+        for obj in session.deleted:
+            if isinstance(obj, Match):
+                expert_id, status = self._previous(obj, 'expert_id'), self._previous(obj, 'status')
+                if status == MatchStatus.IN_PROGRESS:
+                    changes['loads'][expert_id] -= 1
+            elif isinstance(obj, (User, ExpertProfile)):
+                changes['stale'] = True
+        for obj in session.dirty:
+            if isinstance(obj, Match) and session.is_modified(obj):
+                if self._previous(obj, 'status') == MatchStatus.IN_PROGRESS:
+                    changes['loads'][self._previous(obj, 'expert_id')] -= 1
+                if obj.status == MatchStatus.IN_PROGRESS:
+                    changes['loads'][obj.expert_id] += 1
+            elif isinstance(obj, User) and any(sa_inspect(obj).attrs[key].history.has_changes()
+                                               for key in DIRECTORY_USER_COLUMNS):
+                changes['stale'] = True
+            elif isinstance(obj, ExpertProfile) and session.is_modified(obj):
+                changes['stale'] = True
+        if changes['stale'] or changes['loads']:
+            self._mark_inflight(session)
+
+    @staticmethod
+    def _previous(obj, key):
+        history = sa_inspect(obj).attrs[key].history
+        return history.deleted[0] if history.deleted else getattr(obj, key)
+
+    def _after_commit(self, session):
+        changes = session.info.pop('expert_directory_changes', None)
+        if not changes:
+            return
+        if changes['stale']:
+            self.invalidate()
+        else:
+            self.adjust_loads(changes['loads'])
+
+    def _after_rollback(self, session, previous_transaction):
+        session.info.pop('expert_directory_changes', None)
+
+    def _after_transaction_end(self, session, transaction):
+        if transaction.parent is None and session.info.pop('expert_directory_inflight', None):
+            with self._lock:
+                self._generation += 1
+                self._inflight -= 1
+
+expert_directory = ExpertDirectory()   # create_app()에서 init_app
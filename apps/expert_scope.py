@@ -0,0 +1,128 @@
+# apps/expert_scope.py
+# 전문가 조회 범위 (전문가 -> 진행 중 매칭 사용자): 목록은 서브쿼리 필터, 단건 권한 확인은 캐시된 집합
+import threading, time
+from collections import OrderedDict
+from sqlalchemy import or_, select
+from apps.invalidation import SignalFile
+
+class ExpertScope:
+    """전문가가 볼 수 있는 사용자(본인 + IN_PROGRESS 매칭 사용자) 범위를 제공합니다.
+
+    - user_filter(): Match 행을 파이썬으로 읽어 IN (...) 목록을 만드는 대신
+      user_id IN (SELECT user_id FROM matches WHERE expert_id=? AND status='IN_PROGRESS') 조건을 반환합니다.
+    - can_access(): 전문가별 매칭 사용자 집합을 EXPERT_SCOPE_CACHE_TTL초 동안 보관하여 단건 권한 확인에 사용합니다.
+    - 매칭 생성/취소/전문가 변경 후에는 커밋 다음에 invalidate_expert()/invalidate_user()를 호출합니다.
+      무효화 시 instance/expert_scope.signal의 mtime을 갱신하며 다른 워커 프로세스는 이를 비교해 캐시를 비웁니다."""
+
+    def __init__(self, app=None):
+        self.ttl = 60
+        self.maxsize = 10000
+        self.signal = SignalFile('expert_scope')
+        self._entries = OrderedDict()   # expert_id -> (만료시각, frozenset(user_id))
+        self._experts_by_user = {}      # user_id -> {expert_id}
+        self._lock = threading.Lock()
+        self._generation = 0            # 무효화마다 증가: DB 조회 중 무효화된 결과는 캐시하지 않음
+        self.hits = 0
+        self.misses = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.ttl = app.config.get('EXPERT_SCOPE_CACHE_TTL', 60)
+        self.maxsize = app.config.get('EXPERT_SCOPE_CACHE_SIZE', 10000)
+        self.signal.init_app(app)
+        app.extensions['expert_scope'] = self
+
+    # ---------- 목록 필터 ----------
+    @staticmethod
+    def matched_users_subquery(expert_id):
+        from apps.dbmodels import Match, MatchStatus
+        return select(Match.user_id).where(Match.expert_id == expert_id, Match.status == MatchStatus.IN_PROGRESS)
+
+    def user_filter(self, user_id_column, expert_id):
+        """user_id_column이 전문가 본인이거나 진행 중 매칭 사용자인 행을 고르는 조건"""
+        return or_(user_id_column == expert_id, user_id_column.in_(self.matched_users_subquery(expert_id)))
+
+    # ---------- 단건 권한 확인 ----------
+    def can_access(self, expert_id, user_id):
+        """전문가 본인 또는 진행 중 매칭 사용자이면 True"""
+        if user_id == expert_id:
+            return True
+        return int(user_id) in self.matched_users(expert_id)
+
+    def matched_users(self, expert_id):
+        if self.signal.changed():
+            self.clear()
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(expert_id)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(expert_id)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            generation = self._generation
+        from apps.extensions import db
+        user_ids = frozenset(db.session.execute(self.matched_users_subquery(expert_id)).scalars())
+        self._put(expert_id, user_ids, now + self.ttl, generation)
+        return user_ids
+
+    def _put(self, expert_id, user_ids, expires_at, generation):
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._discard(expert_id)
+            self._entries[expert_id] = (expires_at, user_ids)
+            for user_id in user_ids:
+                self._experts_by_user.setdefault(user_id, set()).add(expert_id)
+            while len(self._entries) > self.maxsize:
+                self._discard(next(iter(self._entries)))
+
+    def _discard(self, expert_id):
+        entry = self._entries.pop(expert_id, None)
+        if entry is None:
+            return
+        for user_id in entry[1]:
+            experts = self._experts_by_user.get(user_id)
+            if experts is not None:
+                experts.discard(expert_id)
+                if not experts:
+                    del self._experts_by_user[user_id]
+
+    # ---------- 무효화 ----------
+    def invalidate_expert(self, *expert_ids):
+        with self._lock:
+            self._generation += 1
+            for expert_id in expert_ids:
+                self._discard(expert_id)
+        self.signal.touch()
+
+    def invalidate_user(self, *user_ids):
+        """user_id가 전문가이면 그 집합을, 매칭 사용자이면 그 사용자를 포함한 전문가 집합을 비웁니다."""
+        with self._lock:
+            self._generation += 1
+            for user_id in user_ids:
+                self._discard(user_id)
+                for expert_id in list(self._experts_by_user.get(user_id, ())):
+                    self._discard(expert_id)
+        self.signal.touch()
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._experts_by_user.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / total, 4) if total else 0.0,
+            }
+
+expert_scope = ExpertScope()   # create_app()에서 init_app
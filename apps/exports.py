@@ -0,0 +1,136 @@
+# apps/exports.py
+# 결과/로그 다운로드 공통 스트리밍 내보내기 (CSV, Parquet/Arrow IPC)
+import codecs, csv, io
+from datetime import datetime
+from io import StringIO
+from flask import Response, stream_with_context
+
+def stream_csv(query, headers, row_fn, filename_prefix, chunk_size=1000):
+    """query를 yield_per(chunk_size)로 나누어 읽으면서 CSV를 chunk_size행 단위로 인코딩해 스트리밍합니다.
+
+    - 전체 결과를 .all()/StringIO/encode로 메모리에 올리지 않으므로 행 수와 무관하게 메모리 사용량이 일정합니다.
+    - 엑셀 한글 호환을 위해 UTF-8 BOM은 응답 맨 앞에 한 번만 보냅니다 (기존 utf-8-sig 파일과 동일).
+    - row_fn(item)은 한 행의 값 리스트를 반환합니다."""
+    def generate():
+        buffer = StringIO()
+        writer = csv.writer(buffer)
+
+        def drain():
+            data = buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate(0)
+            return data
+
+        writer.writerow(headers)
+        yield codecs.BOM_UTF8 + drain()
+        for index, item in enumerate(query.yield_per(chunk_size), 1):
+            writer.writerow(row_fn(item))
+            if index % chunk_size == 0:
+                yield drain()
+        remaining = drain()
+        if remaining:
+            yield remaining
+
+    response = Response(stream_with_context(generate()), content_type='text/csv; charset=utf-8-sig')
+    response.headers['Content-Disposition'] = f'attachment; filename={filename_prefix}_{datetime.now().strftime("%Y%m%d%H%M%S")}.csv'
+    return response
+
+# ---------- Parquet / Arrow IPC ----------
+COLUMNAR_FORMATS = {
+    'parquet': ('parquet', 'application/vnd.apache.parquet'),
+    'arrow': ('arrow', 'application/vnd.apache.arrow.file'),   # Arrow IPC 파일 (pandas.read_feather로 읽기 가능)
+}
+
+def columnar_available():
+    """Parquet/Arrow 내보내기에 필요한 pyarrow 설치 여부"""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+class _ChunkSink(io.RawIOBase):
+    """pyarrow writer가 기록한 바이트를 모아 두었다가 drain() 시 꺼내 주는 쓰기 전용 스트림"""
+
+    def __init__(self):
+        self._parts = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        data = bytes(data)
+        self._parts.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        data = b''.join(self._parts)
+        self._parts = []
+        return data
+
+def stream_columnar(query, columns, filename_prefix, fmt='parquet', row_group_size=65536, fetch_size=8192):
+    """query를 fetch_size행씩 읽어 타입이 지정된 Parquet 또는 Arrow IPC 파일로 스트리밍합니다.
+
+    columns는 (속성명, 타입) 목록이며 타입은 'int64', 'float64', 'string', 'bool', 'timestamp',
+    'enum'(Enum.value를 문자열로 저장) 중 하나입니다. 읽은 행은 바로 Arrow 배열로 변환해 두고
+    row_group_size행이 모이면 행 그룹(Arrow는 record batch) 하나로 기록하여 응답으로 내보내므로
+    메모리 사용량은 행 수와 무관하게 행 그룹 크기에만 비례합니다."""
+    import pyarrow as pa
+    types = {'int64': pa.int64(), 'float64': pa.float64(), 'string': pa.string(), 'bool': pa.bool_(),
+             'timestamp': pa.timestamp('us'), 'enum': pa.string()}
+    schema = pa.schema([(name, types[type_name]) for name, type_name in columns])
+    extension, mimetype = COLUMNAR_FORMATS[fmt]
+    fetch_size = min(fetch_size, row_group_size)
+
+    def generate():
+        sink = _ChunkSink()
+        if fmt == 'parquet':
+            import pyarrow.parquet as pq
+            writer = pq.ParquetWriter(sink, schema)
+        else:
+            writer = pa.ipc.new_file(sink, schema)
+        values = {name: [] for name, _ in columns}
+        batches, buffered = [], 0
+
+        def to_batch():
+            batch = pa.record_batch([pa.array(values[name], type=schema.field(name).type) for name, _ in columns], schema=schema)
+            for column in values.values():
+                column.clear()
+            return batch
+
+        def write_row_group():
+            table = pa.Table.from_batches(batches, schema=schema)
+            if fmt == 'parquet':
+                writer.write_table(table, row_group_size=row_group_size)
+            else:
+                writer.write_table(table.combine_chunks())   # record batch 하나로 기록
+            batches.clear()
+
+        for index, item in enumerate(query.yield_per(fetch_size), 1):
+            for name, type_name in columns:
+                value = getattr(item, name)
+                if type_name == 'enum' and value is not None:
+                    value = value.value
+                values[name].append(value)
+            if index % fetch_size == 0:
+                batches.append(to_batch())
+                buffered += fetch_size
+                if buffered >= row_group_size:
+                    write_row_group()
+                    buffered = 0
+                    yield sink.drain()
+        if values[columns[0][0]]:
+            batches.append(to_batch())
+        if batches:
+            write_row_group()
+        writer.close()
+        yield sink.drain()
+
+    response = Response(stream_with_context(generate()), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename={filename_prefix}_{datetime.now().strftime("%Y%m%d%H%M%S")}.{extension}'
+    return response
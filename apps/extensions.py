@@ -3,6 +3,7 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_login import LoginManager
 from flask_wtf import CSRFProtect
+from sqlalchemy import event
 
 
 db = SQLAlchemy()
@@ -11,3 +12,14 @@ login_manager = LoginManager()
 csrf=CSRFProtect()
 login_manager.login_view = 'auth.login'
 login_manager.login_message = 'login should be required'
+
+def enable_sqlite_wal(engine):
+    """SQLite를 WAL 모드로 설정합니다. 스트리밍 다운로드처럼 읽기 트랜잭션이 길어져도
+    다른 요청/백그라운드 기록(UsageLog, 쿼터 체크포인트)의 쓰기가 대기하지 않습니다."""
+    if engine.dialect.name != 'sqlite':
+        return
+    @event.listens_for(engine, 'connect')
+    def set_journal_mode(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.close()
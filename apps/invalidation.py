@@ -0,0 +1,49 @@
+# apps/invalidation.py
+# 워커 프로세스 간 캐시 무효화 신호 (instance/<name>.signal 파일의 mtime)
+import os, time
+
+class SignalFile:
+    """프로세스 메모리 캐시의 무효화를 다른 워커 프로세스에 알리는 신호 파일입니다.
+
+    - 무효화한 프로세스는 touch()로 파일의 mtime을 갱신합니다.
+    - 각 프로세스는 조회 때마다 changed()로 mtime(stat 1회)을 비교하고, 바뀌었으면 자신의 캐시를 비웁니다.
+    - touch() 전에 이미 최신 신호를 본 상태였다면 새 mtime을 기억하여, 이미 반영한 자신의 변경으로
+      캐시 전체를 다시 비우지 않게 합니다 (다른 프로세스의 신호를 아직 못 본 경우에는 다음 changed()에서 비움)."""
+
+    def __init__(self, name):
+        self.name = name
+        self.path = None
+        self._mtime = None
+
+    def init_app(self, app):
+        self.path = os.path.join(app.instance_path, f'{self.name}.signal')
+        self._mtime = self._read()
+
+    def _read(self):
+        if self.path is None:
+            return None
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def changed(self):
+        """마지막 확인 이후 신호가 갱신되었으면 True (호출한 쪽에서 캐시를 비움)"""
+        mtime = self._read()
+        if mtime == self._mtime:
+            return False
+        self._mtime = mtime
+        return True
+
+    def touch(self):
+        """신호를 갱신하여 다른 프로세스가 캐시를 비우도록 합니다."""
+        if self.path is None:
+            return
+        current = self._read() == self._mtime
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, 'a'):
+            pass
+        now = time.time_ns()
+        os.utime(self.path, ns=(now, now))
+        if current:   # 이 프로세스의 캐시는 이미 반영됨 (다른 프로세스만 비우도록)
+            self._mtime = self._read()
@@ -0,0 +1,134 @@
+# apps/iris/batching.py
+# 동시 추론 요청을 짧은 시간 창(window) 단위로 모아 1회의 벡터화 predict로 처리하는 마이크로 배치 스케줄러
+import math, queue, threading, time
+from collections import deque, namedtuple
+from concurrent.futures import Future
+
+_PendingRequest = namedtuple('_PendingRequest', ['rows', 'future'])
+
+class InferenceMetrics:
+    """추론 요청의 처리량과 지연시간(p50/p99)을 모드(batched/direct)별로 기록합니다.
+    최근 max_samples건만 보관하며 처리량은 최근 window_seconds 기준으로 계산합니다."""
+
+    def __init__(self, max_samples=10000, window_seconds=60):
+        self.window_seconds = window_seconds
+        self._samples = {}   # mode -> deque[(완료시각, 지연시간(초), 행 수)]
+        self._totals = {}    # mode -> [요청 수, 행 수]
+        self._batch_sizes = deque(maxlen=max_samples)
+        self._max_samples = max_samples
+        self._lock = threading.Lock()
+
+    def record(self, mode, rows, latency):
+        with self._lock:
+            samples = self._samples.setdefault(mode, deque(maxlen=self._max_samples))
+            samples.append((time.monotonic(), latency, rows))
+            totals = self._totals.setdefault(mode, [0, 0])
+            totals[0] += 1
+            totals[1] += rows
+
+    def record_batch(self, rows):
+        with self._lock:
+            self._batch_sizes.append(rows)
+
+    @staticmethod
+    def _percentile(sorted_values, percent):
+        if not sorted_values:
+            return 0.0
+        index = max(0, math.ceil(percent / 100 * len(sorted_values)) - 1)
+        return sorted_values[index]
+
+    def snapshot(self):
+        now = time.monotonic()
+        with self._lock:
+            result = {}
+            for mode, samples in self._samples.items():
+                latencies = sorted(sample[1] for sample in samples)
+                recent = [sample for sample in samples if now - sample[0] <= self.window_seconds]
+                result[mode] = {
+                    'requests': self._totals[mode][0],
+                    'rows': self._totals[mode][1],
+                    'throughput_rps': round(len(recent) / self.window_seconds, 3),
+                    'rows_per_second': round(sum(sample[2] for sample in recent) / self.window_seconds, 3),
+                    'latency_p50_ms': round(self._percentile(latencies, 50) * 1000, 3),
+                    'latency_p99_ms': round(self._percentile(latencies, 99) * 1000, 3),
+                }
+            batch_sizes = list(self._batch_sizes)
+            result['batches'] = {
+                'count': len(batch_sizes),
+                'avg_rows': round(sum(batch_sizes) / len(batch_sizes), 3) if batch_sizes else 0.0,
+                'max_rows': max(batch_sizes) if batch_sizes else 0,
+            }
+            return result
+
+class MicroBatcher:
+    """submit()된 요청들을 window_ms 동안 또는 max_rows행이 찰 때까지 모아 predict_fn을 1회 호출하고,
+    결과를 각 요청의 Future로 나누어 돌려줍니다. 워커 스레드는 첫 요청 시 시작됩니다 (gunicorn fork 이후)."""
+
+    def __init__(self, predict_fn, window_ms=2.0, max_rows=64, metrics=None):
+        self.predict_fn = predict_fn
+        self.window = window_ms / 1000.0
+        self.max_rows = max_rows
+        self.metrics = metrics
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name='iris-micro-batcher', daemon=True)
+                    self._thread.start()
+
+    def submit(self, rows):
+        """rows(특성값 리스트의 리스트)를 대기열에 넣고 예측 결과 리스트를 받을 Future를 반환합니다."""
+        future = Future()
+        self._ensure_started()
+        self._queue.put(_PendingRequest(list(rows), future))
+        return future
+
+    def predict(self, rows, timeout=None):
+        return self.submit(rows).result(timeout=timeout)
+
+    def stop(self):
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch, total_rows, stopping = [first], len(first.rows), False
+            deadline = time.perf_counter() + self.window
+            while total_rows < self.max_rows:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+                total_rows += len(item.rows)
+            self._execute(batch, total_rows)
+            if stopping:
+                return
+
+    def _execute(self, batch, total_rows):
+        try:
+            predictions = self.predict_fn([row for item in batch for row in item.rows])
+        except Exception as e:
+            for item in batch:
+                item.future.set_exception(e)
+            return
+        if self.metrics is not None:
+            self.metrics.record_batch(total_rows)
+        offset = 0
+        for item in batch:
+            item.future.set_result(list(predictions[offset:offset + len(item.rows)]))
+            offset += len(item.rows)
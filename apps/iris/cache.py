@@ -0,0 +1,82 @@
+# apps/iris/cache.py
+# 중복 추론 확인용 프로세스 내 LRU 캐시
+import threading
+from collections import OrderedDict, namedtuple
+from apps.invalidation import SignalFile
+
+# 캐시에 보관하는 IrisResult 요약 (views에서 IrisResult와 같은 속성명으로 사용)
+CachedResult = namedtuple('CachedResult', ['id', 'predicted_class', 'confirmed_class', 'created_at'])
+
+class PredictionLookupCache:
+    """(user_id, 특성값 튜플) -> CachedResult 를 보관하는 크기 제한 LRU 캐시.
+    soft-delete, 확인/수정 시 invalidate_result()로 해당 결과의 항목을 제거해야 합니다.
+    캐시는 프로세스(워커)별로 유지되며, 무효화 시 instance/prediction_cache.signal의 mtime을 갱신하여
+    다른 워커 프로세스가 조회 때 자신의 캐시를 비우도록 합니다 (init_app 이후)."""
+
+    def __init__(self, maxsize=10000):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()   # key -> CachedResult
+        self._keys_by_result = {}       # result_id -> key (무효화용 역색인)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.signal = SignalFile('prediction_cache')
+
+    def init_app(self, app):
+        self.signal.init_app(app)
+        app.extensions['prediction_cache'] = self
+
+    @staticmethod
+    def make_key(user_id, features):
+        return (user_id, tuple(float(value) for value in features))
+
+    def get(self, user_id, features):
+        if self.signal.changed():
+            self.clear()
+        key = self.make_key(user_id, features)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, user_id, features, result):
+        """IrisResult 또는 CachedResult를 캐시에 저장합니다."""
+        key = self.make_key(user_id, features)
+        entry = CachedResult(result.id, result.predicted_class, result.confirmed_class, result.created_at)
+        with self._lock:
+            if key in self._entries:
+                self._keys_by_result.pop(self._entries[key].id, None)
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self._keys_by_result[entry.id] = key
+            while len(self._entries) > self.maxsize:
+                _, evicted = self._entries.popitem(last=False)
+                self._keys_by_result.pop(evicted.id, None)
+        return entry
+
+    def invalidate_result(self, result_id):
+        with self._lock:
+            key = self._keys_by_result.pop(result_id, None)
+            if key is not None:
+                self._entries.pop(key, None)
+        self.signal.touch()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_result.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / total, 4) if total else 0.0,
+            }
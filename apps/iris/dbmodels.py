@@ -1,7 +1,18 @@
 # apps/iris/dbmodels.py
 # apps/iris/dbmodels.py
 from apps.dbmodels import db, PredictionResult, UsageType, func
-import enum
+from sqlalchemy import event
+import enum, hashlib, struct
+
+# 중복 확인용 특성값 해시: 특성값을 소수점 6자리로 양자화한 뒤 user_id와 함께 64비트로 해싱
+FEATURE_HASH_SCALE = 10 ** 6
+
+def compute_feature_hash(user_id, features):
+    """(user_id, 특성값 4개)의 64비트 해시를 SQLite INTEGER 범위의 부호 있는 정수로 반환합니다.
+    해시 충돌 가능성이 있으므로 조회 시 원래 특성값 비교를 함께 사용해야 합니다."""
+    quantized = [int(round(float(value) * FEATURE_HASH_SCALE)) for value in features]
+    digest = hashlib.blake2b(struct.pack('<5q', int(user_id), *quantized), digest_size=8).digest()
+    return struct.unpack('<q', digest)[0]
 
 # 로그 상태를 정의하는 Enum 추가
 class LogStatusType(enum.Enum):
@@ -32,11 +43,21 @@ class IrisResult(PredictionResult):
     petal_length = db.Column(db.Float, nullable=False)
     petal_width = db.Column(db.Float, nullable=False)
     redundancy = db.Column(db.Boolean, default=False)
+    feature_hash = db.Column(db.BigInteger, index=True)   # compute_feature_hash(user_id, 특성값), 중복 확인용
     
     __mapper_args__ = {
         'polymorphic_identity': 'iris'
     }
 
+    @property
+    def features(self):
+        return (self.sepal_length, self.sepal_width, self.petal_length, self.petal_width)
+
     def __repr__(self) -> str:
         return (f"<IrisResult(sepal_length={self.sepal_length}, sepal_width={self.sepal_width}, "
-                f"petal_length={self.petal_length}, petal_width={self.petal_width}, predicted_class='{self.predicted_class}')>")
\ No newline at end of file
+                f"petal_length={self.petal_length}, petal_width={self.petal_width}, predicted_class='{self.predicted_class}')>")
+
+@event.listens_for(IrisResult, 'before_insert')
+def _set_feature_hash(mapper, connection, target):
+    if target.feature_hash is None and target.user_id is not None:
+        target.feature_hash = compute_feature_hash(target.user_id, target.features)
@@ -0,0 +1,85 @@
+# apps/iris/inference.py
+# sklearn LogisticRegression을 NumPy 행렬 연산만으로 추론하는 엔진
+import numpy as np
+
+class LinearModelInference:
+    """학습된 LogisticRegression의 coef_/intercept_를 로드 시 1회 추출하여
+    predict/predict_proba를 행렬곱 + argmax/softmax로 계산합니다.
+    sklearn의 입력 검증/디스패치 비용 없이 동일한 결과를 반환합니다 (tests/test_inference.py, flask verify-model로 확인)."""
+
+    def __init__(self, coef, intercept, classes, multinomial=True):
+        self.coef_ = np.ascontiguousarray(coef, dtype=np.float64)
+        self.intercept_ = np.ascontiguousarray(intercept, dtype=np.float64)
+        self.classes_ = np.asarray(classes)
+        self.n_features_in_ = self.coef_.shape[1]
+        # sklearn과 동일하게 X @ coef_.T 형태로 계산 (합산 순서를 맞춰 결과를 일치시킴)
+        self._coef_T = self.coef_.T
+        self.multinomial = multinomial and len(self.classes_) > 2
+
+    @classmethod
+    def from_estimator(cls, estimator):
+        """학습된 sklearn LogisticRegression에서 가중치를 추출합니다.
+        추출한 엔진의 predict/predict_proba가 estimator와 다르면 ValueError를 발생시킵니다
+        (예: 설치된 sklearn 버전이 multi_class를 다르게 해석하는 경우)."""
+        engine = cls(estimator.coef_, estimator.intercept_, estimator.classes_,
+                     multinomial=cls.is_multinomial(estimator))
+        engine.check(estimator)
+        return engine
+
+    @staticmethod
+    def is_multinomial(estimator):
+        """sklearn과 같은 방식으로 multi_class를 해석합니다.
+        'auto'(1.5 이후 'deprecated')는 liblinear이면 OvR(liblinear는 multinomial 미지원), 그 외에는 multinomial
+        ('warn'은 0.22 이전의 기본값으로 OvR). 이진 분류는 생성자에서 항상 OvR로 처리합니다."""
+        multi_class = getattr(estimator, 'multi_class', 'auto')
+        if multi_class in ('auto', 'deprecated'):
+            return getattr(estimator, 'solver', 'lbfgs') != 'liblinear'
+        return multi_class == 'multinomial'
+
+    def check(self, estimator, samples=64):
+        """고정 시드의 무작위 입력으로 estimator와 predict/predict_proba 결과를 비교합니다 (로드 시 1회)."""
+        X = np.random.default_rng(0).uniform(0.0, 10.0, size=(samples, self.n_features_in_))
+        if not (np.array_equal(self.predict(X), estimator.predict(X))
+                and np.allclose(self.predict_proba(X), estimator.predict_proba(X), rtol=0, atol=1e-12)):
+            raise ValueError("NumPy inference does not match the estimator's predict/predict_proba")
+
+    def _as_features(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features_in_:
+            raise ValueError(f"X has {X.shape[1]} features, but the model expects {self.n_features_in_} features")
+        return np.ascontiguousarray(X)
+
+    def decision_function(self, X):
+        scores = self._as_features(X) @ self._coef_T + self.intercept_
+        return scores.ravel() if scores.shape[1] == 1 else scores
+
+    def predict(self, X):
+        scores = self.decision_function(X)
+        if scores.ndim == 1:
+            indices = (scores > 0).astype(int)
+        else:
+            indices = scores.argmax(axis=1)
+        return self.classes_[indices]
+
+    def predict_proba(self, X):
+        scores = self.decision_function(X)
+        if self.multinomial:
+            # softmax (sklearn.utils.extmath.softmax와 동일한 연산 순서)
+            scores = scores - scores.max(axis=1).reshape(-1, 1)
+            np.exp(scores, out=scores)
+            scores /= scores.sum(axis=1).reshape(-1, 1)
+            return scores
+        # OvR: 로지스틱 함수 후 정규화 (이진 분류는 [1-p, p]), sklearn과 같은 scipy expit 사용
+        from scipy.special import expit
+        prob = expit(scores)
+        if prob.ndim == 1:
+            return np.vstack([1 - prob, prob]).T
+        prob_sum = prob.sum(axis=1)
+        all_zero = prob_sum == 0
+        if np.any(all_zero):
+            prob[all_zero, :] = 1
+            prob_sum[all_zero] = prob.shape[1]
+        prob /= prob_sum.reshape(prob.shape[0], -1)
+        return prob
@@ -1,15 +1,22 @@
 # apps/iris/views.py
-import csv
-from io import StringIO
-from flask import Flask, Response, flash, redirect, request, render_template, jsonify, abort, current_app, url_for, g
-import pickle, os
+from flask import Flask, flash, redirect, request, render_template, jsonify, abort, current_app, url_for, g
+import os, threading
+from time import perf_counter
 import logging, functools
-from sqlalchemy import String, cast, desc, func, or_
+from sqlalchemy import String, cast, func, or_
 from sqlalchemy.orm import joinedload
 from apps.extensions import csrf
-from apps.dbmodels import PredictionResult, db, APIKey, UsageLog, UsageType, Service, Match, UserType, MatchStatus
-from apps.iris.dbmodels import IrisResult
-import numpy as np
+from apps.exports import COLUMNAR_FORMATS, columnar_available, stream_columnar, stream_csv
+from apps.pagination import KeysetPagination, keyset_paginate
+from apps.usage_writer import usage_writer
+from apps.api_key_cache import api_key_cache
+from apps.count_cache import count_cache
+from apps.expert_scope import expert_scope
+from apps.quota import quota_manager
+from apps.dbmodels import PredictionResult, db, UsageLog, UsageType, Service, UserType
+from apps.iris.dbmodels import IrisResult, compute_feature_hash
+from apps.iris.cache import PredictionLookupCache
+from apps.iris.batching import InferenceMetrics, MicroBatcher
 from flask_login import current_user, login_required
 from apps.iris.forms import EmptyForm, IrisLogSearchForm, IrisUserForm
 from . import iris
@@ -19,12 +26,101 @@ from apps.decorators import admin_required, expert_required
 
 
 MODEL_PATH = os.path.join(os.path.dirname(__file__), 'model.pkl')
-with open(MODEL_PATH, 'rb') as f:
-    model = pickle.load(f)
+_model = None
+_model_lock = threading.Lock()
+
+def get_model():
+    """최초 사용 시 model.pkl을 로드하여 반환합니다 (웹/API 공통, 스레드 안전).
+    sklearn/numpy import 비용이 create_app()이 아닌 첫 추론 요청에서 발생하도록 import를 지연합니다.
+    로드에 실패하면 None을 반환하고 다음 요청에서 다시 시도합니다."""
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                try:
+                    import pickle
+                    from apps.iris.inference import LinearModelInference
+                    with open(MODEL_PATH, 'rb') as f:
+                        estimator = pickle.load(f)
+                    try:
+                        # sklearn 추정기에서 가중치만 추출하여 NumPy 행렬 연산으로 추론
+                        _model = LinearModelInference.from_estimator(estimator)
+                    except ValueError as e:
+                        # 결과가 sklearn과 다르면 sklearn 추정기로 그대로 추론
+                        logging.warning(f"NumPy inference disabled for {MODEL_PATH}, using the sklearn estimator: {e}")
+                        _model = estimator
+                except Exception as e:
+                    logging.error(f"Failed to load model from {MODEL_PATH}: {e}", exc_info=True)
+                    return None
+    return _model
 
 TARGET_NAMES = ['setosa', 'versicolor', 'virginica']
+FEATURE_FIELDS = ['sepal_length', 'sepal_width', 'petal_length', 'petal_width']
 from apps.config import Config
 
+# 중복 추론 확인용 LRU 캐시 (user_id, 특성값) -> IrisResult id/품종
+prediction_cache = PredictionLookupCache(maxsize=Config.IRIS_RESULT_CACHE_SIZE)
+
+def find_existing_result(user_id, features):
+    """사용자의 동일 입력 추론 결과를 캐시에서 먼저 찾고, 없으면 DB에서 조회해 캐시에 저장합니다."""
+    cached = prediction_cache.get(user_id, features)
+    if cached is not None:
+        return cached
+    sepal_length, sepal_width, petal_length, petal_width = features
+    # feature_hash 인덱스로 1회 조회하고, 해시 충돌에 대비해 원래 특성값도 함께 비교
+    existing_result = IrisResult.query.filter_by(
+        feature_hash=compute_feature_hash(user_id, features),
+        sepal_length=sepal_length,
+        sepal_width=sepal_width,
+        petal_length=petal_length,
+        petal_width=petal_width,
+        is_deleted=False, # Soft delete된 데이터는 제외
+        user_id=user_id # 전체 DB에서 중복확인시, 라인 삭제
+    ).first()
+    if existing_result is None:
+        return None
+    return prediction_cache.put(user_id, features, existing_result)
+
+# 동시 추론 요청 마이크로 배치 스케줄러와 처리량/지연시간 지표
+inference_metrics = InferenceMetrics()
+micro_batcher = MicroBatcher(
+    lambda rows: get_model().predict(rows),
+    window_ms=Config.IRIS_MICROBATCH_WINDOW_MS,
+    max_rows=Config.IRIS_MICROBATCH_MAX_ROWS,
+    metrics=inference_metrics
+)
+
+def run_inference(model, rows):
+    """특성값 행 목록의 예측 클래스 인덱스 리스트를 반환합니다.
+    IRIS_MICROBATCH_ENABLED이면 다른 요청 스레드의 추론과 묶어 1회의 predict로 처리합니다."""
+    started_at = perf_counter()
+    if current_app.config.get('IRIS_MICROBATCH_ENABLED'):
+        predictions = micro_batcher.predict(rows, timeout=10)
+        mode = 'batched'
+    else:
+        predictions = list(model.predict(rows))
+        mode = 'direct'
+    inference_metrics.record(mode, len(rows), perf_counter() - started_at)
+    return predictions
+
+@iris.route('/inference_metrics')
+@admin_required
+def inference_metrics_view():
+    """추론 처리량과 p50/p99 지연시간을 batched/direct 모드별로 반환합니다."""
+    return jsonify({
+        'microbatch_enabled': current_app.config.get('IRIS_MICROBATCH_ENABLED'),
+        'window_ms': micro_batcher.window * 1000,
+        'max_rows': micro_batcher.max_rows,
+        'metrics': inference_metrics.snapshot(),
+    })
+
+@iris.route('/cache_stats')
+@admin_required
+def cache_stats():
+    """중복 추론 캐시, API Key 인증 캐시, 전문가 범위 캐시의 hit/miss 통계와 목록 건수 캐시 상태를 반환합니다."""
+    return jsonify({**prediction_cache.stats(), 'api_key_cache': api_key_cache.stats(),
+                    'count_cache': count_cache.stats(), 'expert_scope': expert_scope.stats()})
+
 @iris.route('/services')
 @login_required
 def services():
@@ -43,16 +139,9 @@ def iris_predict():
         petal_length = form.petal_length.data
         petal_width = form.petal_width.data
         
-        features = np.array([[sepal_length, sepal_width, petal_length, petal_width]])
+        features = [[sepal_length, sepal_width, petal_length, petal_width]]
 
-        existing_result = IrisResult.query.filter_by(
-            sepal_length=sepal_length,
-            sepal_width=sepal_width,
-            petal_length=petal_length,
-            petal_width=petal_width,
-            is_deleted=False, # Soft delete된 데이터는 제외
-            user_id=current_user.id # 전체 DB에서 중복확인시, 라인 삭제
-        ).first()
+        existing_result = find_existing_result(current_user.id, (sepal_length, sepal_width, petal_length, petal_width))
 
         can_confirm = current_user.is_expert() or current_user.is_admin()
         
@@ -71,7 +160,7 @@ def iris_predict():
             confirmed_class_display = existing_result.confirmed_class if existing_result.confirmed_class else "not available"
 
             # log 추가
-            redundancy_log = UsageLog(
+            usage_writer.submit(
                 user_id=current_user.id,
                 service_id=iris_service_id,
                 usage_type=UsageType.WEB_UI,
@@ -83,8 +172,6 @@ def iris_predict():
                 log_status='중복',
                 prediction_result_id=existing_result.id
             )
-            db.session.add(redundancy_log)
-            db.session.commit()
 
             return render_template('iris/predict.html',
                                    result=existing_result.predicted_class,
@@ -100,7 +187,11 @@ def iris_predict():
                                    existing_result_found=existing_result_found)
         else:
             # 새로운 입력값인 경우
-            pred = model.predict(features)[0]
+            model = get_model()
+            if model is None:
+                flash('추론 모델을 불러올 수 없습니다. 잠시 후 다시 시도해주세요.', 'danger')
+                return render_template('iris/predict.html', form=form, existing_result_found=False, confirmed_class="not available")
+            pred = run_inference(model, features)[0]
 
             new_iris_result = IrisResult(
                 user_id=current_user.id,
@@ -114,8 +205,8 @@ def iris_predict():
                 confirm=False  
             )
             db.session.add(new_iris_result)
-            db.session.flush()
-            new_usage_log = UsageLog(
+            db.session.commit()
+            usage_writer.submit(
                 user_id=current_user.id,
                 usage_type=UsageType.WEB_UI,
                 endpoint=request.path,
@@ -126,8 +217,7 @@ def iris_predict():
                 request_data_summary=str(input_data)[:200],
                 prediction_result_id=new_iris_result.id
             )
-            db.session.add(new_usage_log)
-            db.session.commit()
+            prediction_cache.put(current_user.id, (sepal_length, sepal_width, petal_length, petal_width), new_iris_result)
             iris_result_id = new_iris_result.id
             
             return render_template('iris/predict.html',
@@ -142,6 +232,22 @@ def iris_predict():
     return render_template('iris/predict.html', form=form, existing_result_found=False, confirmed_class="not available")
 
 
+def _submit_result_log(result, log_status):
+    """결과 확인/수정/삭제 UsageLog 기록. 서비스/API 키/추론 시각은 결과 행에서 가져옵니다
+    (해당 결과의 추론 UsageLog는 아직 비동기 기록 대기 중일 수 있으므로 조회하지 않음)."""
+    usage_writer.submit(
+        user_id=current_user.id,
+        service_id=result.service_id,
+        api_key_id=result.api_key_id,
+        endpoint=request.path,
+        usage_type=UsageType.WEB_UI,
+        log_status=log_status,
+        inference_timestamp=result.created_at,
+        remote_addr=request.remote_addr,
+        response_status_code=200,
+        prediction_result_id=result.id
+    )
+
 @iris.route('/save_iris_data', methods=['POST'])
 @login_required
 def save_iris_data():
@@ -175,24 +281,10 @@ def save_iris_data():
         result.confirmed_class = confirmed_class
         result.confirm = True
         result.confirmed_at = datetime.now()
-        recent_log = UsageLog.query.filter_by(prediction_result_id=result.id).order_by(desc(UsageLog.timestamp)).first()
-        
-        new_usage_log = UsageLog(
-            user_id=current_user.id,
-            service_id=recent_log.service_id if recent_log else None,
-            api_key_id=recent_log.api_key_id if recent_log else None,
-            endpoint=request.path,
-            usage_type=UsageType.WEB_UI,
-            log_status='추론확인',
-            inference_timestamp=recent_log.inference_timestamp if recent_log else None,
-            remote_addr=request.remote_addr,
-            response_status_code=200,
-            prediction_result_id=result.id
-        )
-        db.session.add(new_usage_log)
 
         db.session.commit()
-
+        prediction_cache.invalidate_result(result.id)
+        _submit_result_log(result, '추론확인')
         flash('추론 확인 및 관련 로그가 성공적으로 처리되었습니다.', 'success')
         return redirect(url_for('iris.iris_predict'))
 
@@ -210,7 +302,6 @@ def results():
     date_filter_type = request.args.get('date_filter_type', '', type=str)
     start_date_str = request.args.get('start_date', '', type=str)
     end_date_str = request.args.get('end_date', '', type=str)
-    page = request.args.get('page', 1, type=int)
     per_page = 10
     
     # 쿼리 기본 설정
@@ -220,11 +311,8 @@ def results():
     if current_user.is_admin():
         pass # 관리자는 모든 결과를 볼 수 있음
     elif current_user.is_expert():
-        # 전문가와 매칭된 사용자 ID 목록 가져오기
-        matched_user_ids = [m.user_id for m in Match.query.filter_by(expert_id=current_user.id, status=MatchStatus.IN_PROGRESS).all()]
-        query = query.filter(
-            (IrisResult.user_id.in_(matched_user_ids)) | (IrisResult.user_id == current_user.id)
-        )
+        # 본인 + 진행 중 매칭 사용자 (matches 서브쿼리)
+        query = query.filter(expert_scope.user_filter(IrisResult.user_id, current_user.id))
     else: # 일반 사용자
         query = query.filter_by(user_id=current_user.id)
 
@@ -262,7 +350,7 @@ def results():
 
     if has_date_filter_error:
         # 오류가 발생한 경우 빈 결과를 반환
-        pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+        pagination = KeysetPagination([], per_page)
         return render_template(
             'iris/user_results.html',
             title='추론결과',
@@ -292,9 +380,10 @@ def results():
     # Soft-deleted 항목은 제외하고 조회
     query = query.filter(IrisResult.is_deleted == False)
 
-    query = query.order_by(IrisResult.created_at.desc())
-
-    pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+    # (created_at, id) 키셋 페이지네이션: after/before 커서로 다음/이전 페이지 조회
+    pagination = keyset_paginate(query, IrisResult.created_at, IrisResult.id,
+                                 after=request.args.get('after'), before=request.args.get('before'),
+                                 per_page=per_page)
     user_results = pagination.items
     form = EmptyForm() 
     # _macros.html을 이용한 pagination을 위한 filtered_args 추가
@@ -319,59 +408,33 @@ def results():
         end_date=end_date_str,
     )
 
+def _can_access_result(result):
+    """결과 확인/수정/삭제 권한: 관리자는 전체, 전문가는 본인 + 진행 중 매칭 사용자, 일반 사용자는 본인 결과"""
+    if current_user.is_admin():
+        return True
+    if current_user.is_expert():
+        return expert_scope.can_access(current_user.id, result.user_id)
+    return result.user_id == current_user.id
+
 # 수정된 confirm_result() 함수
 @iris.route('/confirm_result/<int:result_id>', methods=['POST'])
 @login_required
 def confirm_result(result_id):
     result = IrisResult.query.get_or_404(result_id)
     # 권한 확인
-    if current_user.is_expert():
-        matched_user_ids = [m.user_id for m in Match.query.filter_by(expert_id=current_user.id).all()]
-        if result.user_id not in matched_user_ids:
-            flash('다른 사용자의 결과를 확인 할 수 없습니다.', 'danger')
-            abort(403)
-    elif not current_user.is_admin() and result.user_id != current_user.id:
+    if not _can_access_result(result):
         flash('다른 사용자의 결과를 확인 할 수 없습니다.', 'danger')
         abort(403)
 
     confirmed_class = request.form.get('confirmed_class')
-    print(f"confirmed class",confirmed_class)
     if confirmed_class in ['setosa', 'versicolor', 'virginica']:
-        result.confirmed_class = confirmed_class
-        result.confirm = True
-        print(f"result.confirm",result.confirm)
-        result.confirmed_at = datetime.now()
-        db.session.flush()                       
         try:
-            recent_log = (
-                UsageLog.query
-                .filter_by(prediction_result_id=result.id)  
-                .order_by(desc(UsageLog.timestamp))      
-                .first()                                 
-            )
-            print(f"recent_log: {recent_log}")
-        
-            if recent_log:
-                print(f"Recent log found: {recent_log.timestamp}")
-            else:
-                print("No logs found for this prediction_result_id.")
-            
-            print(f"추론확인 starts")
-            new_usage_log = UsageLog(
-                #user_id=recent_log.user_id,    
-                user_id=current_user.id,      
-                service_id=recent_log.service_id,
-                api_key_id=recent_log.api_key_id,
-                endpoint=request.path,            
-                usage_type=UsageType.WEB_UI,
-                log_status='추론확인',              
-                inference_timestamp=recent_log.inference_timestamp,
-                remote_addr=request.remote_addr,    
-                response_status_code = 200,
-                prediction_result_id=recent_log.prediction_result_id
-            )
-            db.session.add(new_usage_log)
+            result.confirmed_class = confirmed_class
+            result.confirm = True
+            result.confirmed_at = datetime.now()
             db.session.commit()
+            prediction_cache.invalidate_result(result.id)
+            _submit_result_log(result, '추론확인')
             flash('추론 확인 및 관련 로그가 성공적으로 처리되었습니다.', 'success')
         except Exception as e:
             db.session.rollback()
@@ -386,12 +449,7 @@ def confirm_result(result_id):
 def edit_confirmed_class(result_id):
     # 권한 확인
     result = IrisResult.query.get_or_404(result_id)
-    if current_user.is_expert():
-        matched_user_ids = [m.user_id for m in Match.query.filter_by(expert_id=current_user.id).all()]
-        if result.user_id not in matched_user_ids and result.user_id != current_user.id:
-            flash('다른 사용자의 결과를 수정 할 수 없습니다.', 'danger')
-            abort(403)
-    elif not current_user.is_admin() and result.user_id != current_user.id:
+    if not _can_access_result(result):
         flash('다른 사용자의 결과를 수정 할 수 없습니다.', 'danger')
         abort(403)
         
@@ -403,23 +461,8 @@ def edit_confirmed_class(result_id):
                 result.confirmed_class = confirmed_class
                 result.confirmed_at = datetime.now()
                 db.session.commit()
-                recent_log = UsageLog.query.filter_by(prediction_result_id=result.id).order_by(desc(UsageLog.timestamp)).first()
-                if recent_log:
-                    new_usage_log = UsageLog(
-                        user_id=current_user.id,      
-                        service_id=recent_log.service_id,
-                        api_key_id=recent_log.api_key_id,
-                        endpoint=request.path,
-                        usage_type=UsageType.WEB_UI,
-                        log_status='추론수정',       # 
-                        inference_timestamp=recent_log.inference_timestamp,
-                        remote_addr=request.remote_addr,
-                        response_status_code=200,
-                        prediction_result_id=result.id
-                    )
-                    db.session.add(new_usage_log)
-                    db.session.commit()
-                
+                prediction_cache.invalidate_result(result.id)
+                _submit_result_log(result, '추론수정')
                 flash('확인 품종이 성공적으로 수정되었습니다.', 'success')
             except Exception as e:
                 db.session.rollback()
@@ -435,12 +478,7 @@ def delete_result(result_id):
     result = IrisResult.query.get_or_404(result_id)
     
     # 권한 확인 (기존 로직 유지)
-    if current_user.is_expert():
-        matched_user_ids = [m.user_id for m in Match.query.filter_by(expert_id=current_user.id).all()]
-        if result.user_id not in matched_user_ids and result.user_id != current_user.id:
-            flash('다른 사용자의 결과를 삭제할 수 없습니다.', 'danger')
-            abort(403)
-    elif not current_user.is_admin() and result.user_id != current_user.id:
+    if not _can_access_result(result):
         flash('다른 사용자의 결과를 삭제할 수 없습니다.', 'danger')
         abort(403)
 
@@ -448,42 +486,24 @@ def delete_result(result_id):
         # soft-delete 적용: is_deleted 필드를 True로 변경
         result.is_deleted = True
         db.session.commit()
+        prediction_cache.invalidate_result(result.id)
 
         # 삭제 로그만 새로 생성 (기존 로그는 변경하지 않음)
-        # 삭제 로그에 필요한 이전 정보 가져오기
-        recent_log = UsageLog.query.filter_by(prediction_result_id=result.id).order_by(desc(UsageLog.timestamp)).first()
-        if recent_log:
-            new_usage_log = UsageLog(
-                user_id=current_user.id,
-                service_id=recent_log.service_id,
-                api_key_id=recent_log.api_key_id,
-                endpoint=request.path,
-                usage_type=UsageType.WEB_UI,
-                log_status='삭제',  
-                inference_timestamp=recent_log.inference_timestamp,
-                remote_addr=request.remote_addr,
-                response_status_code=200,
-                prediction_result_id=result.id
-            )
-            db.session.add(new_usage_log)
-            db.session.commit()
-        
+        _submit_result_log(result, '삭제')
         flash('추론 결과가 성공적으로 삭제 처리되었습니다.', 'success')
     except Exception as e:
         db.session.rollback()
         flash(f'결과 삭제 중 오류가 발생했습니다: {e}', 'danger')
     return redirect(url_for('iris.results'))
 
-@iris.route('/results/download_csv')
-@login_required
-def results_download_csv():
-    """필터링된 추론 결과를 CSV 파일로 다운로드합니다."""
-    
+def _results_download_query():
+    """결과 다운로드(CSV/Parquet/Arrow) 공통: 권한 범위와 검색/확인/날짜 필터를 적용한 쿼리.
+    권한이 없거나 날짜 필터가 잘못되면 flash 후 None을 반환합니다."""
     # 1. 사용자 권한 확인
     # logs_download_csv와 동일하게 권한이 없을 경우 early return
     if not (current_user.is_admin() or current_user.is_expert() or current_user.is_user()):
         flash("이 기능에 접근할 권한이 없습니다.", "danger")
-        return redirect(url_for('iris.results'))
+        return None
 
     # 2. 쿼리 구성 및 필터링
     # Flask-WTF form을 사용하여 request.args를 처리하는 logs_download_csv 스타일 적용
@@ -496,13 +516,7 @@ def results_download_csv():
     if current_user.is_admin():
         pass
     elif current_user.is_expert():
-        matched_user_ids = [m.user_id for m in Match.query.filter_by(expert_id=current_user.id, status=MatchStatus.IN_PROGRESS).all()]
-        query = query.filter(
-            or_(
-                IrisResult.user_id.in_(matched_user_ids),  
-                IrisResult.user_id == current_user.id
-            )
-        )
+        query = query.filter(expert_scope.user_filter(IrisResult.user_id, current_user.id))
     else:  # 일반 사용자 (is_user)
         query = query.filter_by(user_id=current_user.id)
     
@@ -537,23 +551,26 @@ def results_download_csv():
             query = query.filter(date_field.between(start_date, end_of_day))
         except (ValueError, AttributeError):
             flash("유효하지 않은 날짜 형식 또는 기준일자입니다.", "danger")
-            return redirect(url_for('iris.results'))
+            return None
 
-    results = query.order_by(IrisResult.created_at.desc()).all()
+    return query.order_by(IrisResult.created_at.desc())
 
-    # 3. CSV 생성 및 반환
-    # logs_download_csv와 동일하게 StringIO, csv.writer, Response 사용
-    output = StringIO()
-    writer = csv.writer(output)
-    
+@iris.route('/results/download_csv')
+@login_required
+def results_download_csv():
+    """필터링된 추론 결과를 CSV 파일로 다운로드합니다."""
+    query = _results_download_query()
+    if query is None:
+        return redirect(url_for('iris.results'))
+
+    # 3. CSV 스트리밍 반환 (apps/exports.py)
     headers = [
         "ID", "사용자ID", "꽃받침길이", "꽃받침너비", "꽃잎길이", "꽃잎너비",
         "예측품종", "확인품종", "추론시간", "확인시간"
     ]
-    writer.writerow(headers)
 
-    for result in results:
-        row = [
+    def row(result):
+        return [
             result.id,
             result.user_id,
             result.sepal_length,
@@ -565,17 +582,37 @@ def results_download_csv():
             result.created_at.strftime('%Y-%m-%d %H:%M:%S'),
             result.confirmed_at.strftime('%Y-%m-%d %H:%M:%S') if result.confirmed_at else '-'
         ]
-        writer.writerow(row)
 
-    output_str = output.getvalue()
-    output_bytes = output_str.encode('utf-8-sig')
-    output.close()
-    
-    response = Response(output_bytes, mimetype='text/csv; charset=utf-8-sig')
-    filename = f'iris_result_results_{datetime.now().strftime("%Y%m%d%H%M%S")}.csv'
-    response.headers['Content-Disposition'] = f'attachment; filename={filename}'
-    
-    return response
+    return stream_csv(query, headers, row, 'iris_result_results')
+
+# Parquet/Arrow 내보내기 컬럼 (속성명, 타입): 특성값은 float64, 시각은 timestamp로 타입 유지
+RESULT_EXPORT_COLUMNS = [
+    ('id', 'int64'), ('user_id', 'int64'), ('api_key_id', 'int64'), ('service_id', 'int64'),
+    ('sepal_length', 'float64'), ('sepal_width', 'float64'), ('petal_length', 'float64'), ('petal_width', 'float64'),
+    ('predicted_class', 'string'), ('confirmed_class', 'string'), ('confirm', 'bool'), ('model_version', 'string'),
+    ('created_at', 'timestamp'), ('confirmed_at', 'timestamp'),
+]
+LOG_EXPORT_COLUMNS = [
+    ('id', 'int64'), ('user_id', 'int64'), ('api_key_id', 'int64'), ('service_id', 'int64'),
+    ('prediction_result_id', 'int64'), ('usage_type', 'enum'), ('log_status', 'string'), ('endpoint', 'string'),
+    ('inference_timestamp', 'timestamp'), ('timestamp', 'timestamp'),
+    ('remote_addr', 'string'), ('response_status_code', 'int64'),
+]
+
+@iris.route('/results/download/<string:fmt>')
+@login_required
+def results_download_columnar(fmt):
+    """필터링된 추론 결과를 Parquet(fmt='parquet') 또는 Arrow IPC(fmt='arrow') 파일로 다운로드합니다."""
+    if fmt not in COLUMNAR_FORMATS:
+        abort(404)
+    if not columnar_available():
+        flash("Parquet/Arrow 다운로드에는 pyarrow 설치가 필요합니다.", "danger")
+        return redirect(url_for('iris.results'))
+    query = _results_download_query()
+    if query is None:
+        return redirect(url_for('iris.results'))
+    return stream_columnar(query, RESULT_EXPORT_COLUMNS, 'iris_result_results', fmt,
+                           row_group_size=current_app.config['EXPORT_ROW_GROUP_SIZE'])
 
 @iris.route('/logs', methods=['GET', 'POST'])
 @login_required
@@ -595,13 +632,7 @@ def logs():
         # 관리자는 모든 로그를 볼 수 있음
         pass
     elif current_user.is_expert():
-        matched_user_ids = [m.user_id for m in Match.query.filter_by(expert_id=current_user.id, status=MatchStatus.IN_PROGRESS).all()]
-        logs_query = logs_query.filter(
-            or_(
-                UsageLog.user_id.in_(matched_user_ids), 
-                UsageLog.user_id == current_user.id
-            )
-        )
+        logs_query = logs_query.filter(expert_scope.user_filter(UsageLog.user_id, current_user.id))
     else:  # 일반 사용자
         logs_query = logs_query.filter_by(user_id=current_user.id)
 
@@ -637,12 +668,9 @@ def logs():
     if request.method == 'POST':
         return redirect(url_for('iris.logs', **filtered_args))
     
-    page = request.args.get('page', 1, type=int)
-    logs_pagination = logs_query.order_by(UsageLog.timestamp.desc()).paginate(
-        page=page,
-        per_page=per_page,
-        error_out=False
-    )
+    logs_pagination = keyset_paginate(logs_query, UsageLog.timestamp, UsageLog.id,
+                                      after=request.args.get('after'), before=request.args.get('before'),
+                                      per_page=per_page)
     
     return render_template(
         'iris/user_logs.html',
@@ -654,28 +682,15 @@ def logs():
     )
 
 
-@iris.route('/logs/download-csv')
-@login_required
-def logs_download_csv():
-    """필터링된 사용 로그를 CSV 파일로 다운로드합니다."""
-    form = IrisLogSearchForm(request.args)
-    logs_query = UsageLog.query.options(
-        joinedload(UsageLog.user),
-        joinedload(UsageLog.api_key),
-        joinedload(UsageLog.service)
-    )
+def _logs_download_query(form):
+    """로그 다운로드(CSV/Parquet/Arrow) 공통: logs()와 동일한 권한 범위와 검색 필터를 적용한 쿼리"""
+    logs_query = UsageLog.query   # 내보내기 행은 관계(user/api_key/service)를 사용하지 않으므로 joinedload 불필요
 
     # 사용자 권한에 따른 로그 조회 범위 설정 (logs() 함수와 동일하게 적용)
     if current_user.is_admin():
         pass
     elif current_user.is_expert():
-        matched_user_ids = [m.user_id for m in Match.query.filter_by(expert_id=current_user.id, status=MatchStatus.IN_PROGRESS).all()]
-        logs_query = logs_query.filter(
-            or_(
-                UsageLog.user_id.in_(matched_user_ids), 
-                UsageLog.user_id == current_user.id
-            )
-        )
+        logs_query = logs_query.filter(expert_scope.user_filter(UsageLog.user_id, current_user.id))
     else:
         logs_query = logs_query.filter_by(user_id=current_user.id)
 
@@ -698,20 +713,22 @@ def logs_download_csv():
         end_of_day = datetime.combine(form.end_date.data, time.max)
         date_field = getattr(UsageLog, form.date_field.data)
         logs_query = logs_query.filter(date_field.between(start_of_day, end_of_day))
+    return logs_query.order_by(UsageLog.timestamp.desc())
+
+@iris.route('/logs/download-csv')
+@login_required
+def logs_download_csv():
+    """필터링된 사용 로그를 CSV 파일로 다운로드합니다."""
+    form = IrisLogSearchForm(request.args)
+    logs_query = _logs_download_query(form)
 
-    logs = logs_query.order_by(UsageLog.timestamp.desc()).all()
-    
-    output = StringIO()
-    writer = csv.writer(output)
-    
     headers = [
         "ID", "사용자 ID", "서비스 ID", "추론 ID", "로그 타입", "로그 상태",
         "엔드포인트", "추론 시각", "로그 시각", "원격 주소", "응답 상태 코드"
     ]
-    writer.writerow(headers)
-    
-    for log in logs:
-        row = [
+
+    def row(log):
+        return [
             log.id, log.user_id, log.service_id, log.prediction_result_id,
             log.usage_type.value, log.log_status,
             log.endpoint,
@@ -719,16 +736,35 @@ def logs_download_csv():
             log.timestamp.strftime('%Y-%m-%d %H:%M:%S'),
             log.remote_addr, log.response_status_code
         ]
-        writer.writerow(row)
-    
-    output_str = output.getvalue()
-    output_bytes = output_str.encode('utf-8-sig')
-    output.close()
-    
-    response = Response(output_bytes, mimetype='text/csv; charset=utf-8-sig')
-    response.headers['Content-Disposition'] = f'attachment; filename=iris_log_results_{datetime.now().strftime("%Y%m%d%H%M%S")}.csv'
-    return response
+
+    return stream_csv(logs_query, headers, row, 'iris_log_results')
+
+@iris.route('/logs/download/<string:fmt>')
+@login_required
+def logs_download_columnar(fmt):
+    """필터링된 사용 로그를 Parquet(fmt='parquet') 또는 Arrow IPC(fmt='arrow') 파일로 다운로드합니다."""
+    if fmt not in COLUMNAR_FORMATS:
+        abort(404)
+    if not columnar_available():
+        flash("Parquet/Arrow 다운로드에는 pyarrow 설치가 필요합니다.", "danger")
+        return redirect(url_for('iris.logs'))
+    logs_query = _logs_download_query(IrisLogSearchForm(request.args))
+    return stream_columnar(logs_query, LOG_EXPORT_COLUMNS, 'iris_log_results', fmt,
+                           row_group_size=current_app.config['EXPORT_ROW_GROUP_SIZE'])
 #
+def _quota_exceeded(decision):
+    """쿼터 초과 응답 (429 + Retry-After: 다음 일/월 시작까지 남은 초)"""
+    response = jsonify({
+        "error": "Quota exceeded",
+        "scope": decision.scope,
+        "limit": decision.limit,
+        "remaining": decision.remaining,
+        "retry_after": decision.retry_after
+    })
+    response.status_code = 429
+    response.headers['Retry-After'] = str(decision.retry_after)
+    return response
+
 @iris.route('/api/predict', methods=['POST'])
 @csrf.exempt
 def api_predict():
@@ -737,11 +773,12 @@ def api_predict():
     if not auth_header:
         return jsonify({"error": "API Key is required"}), 401
 
-    api_key_entry = APIKey.query.filter_by(key_string=auth_header, is_active=True).first()
+    api_key_entry = api_key_cache.lookup(auth_header)
 
     if not api_key_entry:
         return jsonify({"error": "Invalid or inactive API Key"}), 401
     
+    model = get_model()
     if model is None:
         logging.error("Model is not loaded. Cannot process prediction.")
         return jsonify({"error": "Service is temporarily unavailable."}), 503
@@ -763,22 +800,19 @@ def api_predict():
     except ValueError:
         return jsonify({"error": "Invalid data type for Iris features. All fields must be numbers."}), 400
 
+    decision = quota_manager.consume(api_key_entry)
+    if not decision.allowed:
+        return _quota_exceeded(decision)
+
     try:
         iris_service_id = 1
 
-        existing_result = IrisResult.query.filter_by(
-            sepal_length=sepal_length,
-            sepal_width=sepal_width,
-            petal_length=petal_length,
-            petal_width=petal_width,
-            is_deleted=False, # Soft delete된 데이터는 제외
-            user_id=api_key_entry.user_id # 전체 DB에서 중복확인시 라인 삭제
-        ).first()
+        existing_result = find_existing_result(api_key_entry.user_id, (sepal_length, sepal_width, petal_length, petal_width))
 
         if existing_result:
             confirmed_class_display = existing_result.confirmed_class if existing_result.confirmed_class else "not available"
             
-            redundancy_log = UsageLog(
+            usage_writer.submit(
                 user_id=api_key_entry.user_id,
                 service_id=iris_service_id,
                 api_key_id=api_key_entry.id,
@@ -791,8 +825,6 @@ def api_predict():
                 log_status='중복',
                 prediction_result_id=existing_result.id
             )
-            db.session.add(redundancy_log)
-            db.session.commit()
             
             return jsonify({
                 "message": "This prediction already exists in your history.",
@@ -806,8 +838,8 @@ def api_predict():
             }), 200
 
    
-        features = np.array([[sepal_length, sepal_width, petal_length, petal_width]])
-        pred_index = model.predict(features)[0]
+        features = [[sepal_length, sepal_width, petal_length, petal_width]]
+        pred_index = run_inference(model, features)[0]
         predicted_class_name = TARGET_NAMES[pred_index]
 
         new_iris_entry = IrisResult(
@@ -824,9 +856,9 @@ def api_predict():
             is_deleted=False
         )
         db.session.add(new_iris_entry)
-        db.session.flush()
+        db.session.commit()
 
-        new_usage_log = UsageLog(
+        usage_writer.submit(
             user_id=api_key_entry.user_id,
             service_id=iris_service_id,
             api_key_id=api_key_entry.id,
@@ -839,8 +871,7 @@ def api_predict():
             log_status='정상',
             prediction_result_id=new_iris_entry.id
         )
-        db.session.add(new_usage_log)
-        db.session.commit()
+        prediction_cache.put(api_key_entry.user_id, (sepal_length, sepal_width, petal_length, petal_width), new_iris_entry)
 
         return jsonify({
             "predicted_class": predicted_class_name,
@@ -857,6 +888,174 @@ def api_predict():
         return jsonify({"error": "An unexpected error occurred."}), 500
 
 
+def _parse_batch_rows(rows):
+    """일괄 추론 요청의 각 행을 (sepal_length, sepal_width, petal_length, petal_width) 튜플로 변환합니다.
+    행은 필드명 딕셔너리 또는 4개 값의 리스트 모두 허용하며, 잘못된 행이 있으면 ValueError를 발생시킵니다."""
+    parsed = []
+    for index, row in enumerate(rows):
+        if isinstance(row, dict):
+            missing = [field for field in FEATURE_FIELDS if field not in row]
+            if missing:
+                raise ValueError(f"Row {index}: missing field: {missing[0]}")
+            values = [row[field] for field in FEATURE_FIELDS]
+        elif isinstance(row, (list, tuple)) and len(row) == len(FEATURE_FIELDS):
+            values = list(row)
+        else:
+            raise ValueError(f"Row {index}: each row must be an object with {FEATURE_FIELDS} or a list of 4 numbers")
+        try:
+            parsed.append(tuple(float(value) for value in values))
+        except (TypeError, ValueError):
+            raise ValueError(f"Row {index}: all fields must be numbers")
+    return parsed
+
+@iris.route('/api/predict_batch', methods=['POST'])
+@csrf.exempt
+def api_predict_batch():
+    """N개의 붓꽃 데이터를 한 번에 추론합니다.
+    model.predict는 Nx4 배열로 1회, 중복 확인은 IrisResult에 대한 집합 조회 1회로 처리하고
+    신규 IrisResult는 단일 트랜잭션으로 일괄 저장하고 UsageLog는 usage_writer로 일괄 기록합니다. 결과는 입력 순서대로 반환합니다."""
+    current_app.logger.info("API batch predict request received.")
+    auth_header = request.headers.get('X-API-Key')
+    if not auth_header:
+        return jsonify({"error": "API Key is required"}), 401
+
+    api_key_entry = api_key_cache.lookup(auth_header)
+
+    if not api_key_entry:
+        return jsonify({"error": "Invalid or inactive API Key"}), 401
+
+    model = get_model()
+    if model is None:
+        logging.error("Model is not loaded. Cannot process prediction.")
+        return jsonify({"error": "Service is temporarily unavailable."}), 503
+
+    data = request.get_json(silent=True)
+    rows = data.get('rows') if isinstance(data, dict) else data
+    if not isinstance(rows, list) or not rows:
+        return jsonify({"error": "Invalid JSON: 'rows' must be a non-empty list"}), 400
+
+    max_rows = current_app.config.get('IRIS_BATCH_MAX_ROWS', 1000)
+    if len(rows) > max_rows:
+        return jsonify({"error": f"Too many rows: at most {max_rows} rows per request"}), 413
+
+    try:
+        features_list = _parse_batch_rows(rows)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    decision = quota_manager.consume(api_key_entry, cost=len(features_list))   # 행 단위로 차감
+    if not decision.allowed:
+        return _quota_exceeded(decision)
+
+    try:
+        iris_service_id = 1
+        user_id = api_key_entry.user_id
+        now = datetime.now()
+
+        # 1. 중복 확인: 캐시에 없는 고유 특성값 전체를 한 번의 집합 조회로 확인 (SQLite 변수 개수 제한을 고려해 분할)
+        unique_features = list(dict.fromkeys(features_list))
+        existing_by_features = {}
+        for features in unique_features:
+            cached = prediction_cache.get(user_id, features)
+            if cached is not None:
+                existing_by_features[features] = cached
+        uncached_features = set(features for features in unique_features if features not in existing_by_features)
+        uncached_hashes = list(set(compute_feature_hash(user_id, features) for features in uncached_features))
+        chunk_size = 500
+        for start in range(0, len(uncached_hashes), chunk_size):
+            chunk = uncached_hashes[start:start + chunk_size]
+            matches = IrisResult.query.filter(
+                IrisResult.feature_hash.in_(chunk),
+                IrisResult.user_id == user_id,
+                IrisResult.is_deleted == False
+            ).order_by(IrisResult.id).all()
+            for existing in matches:
+                key = existing.features
+                # 해시 충돌 대비 특성값 비교, 단건 API의 first()와 동일하게 가장 먼저 저장된 결과 사용
+                if key in uncached_features and key not in existing_by_features:
+                    existing_by_features[key] = prediction_cache.put(user_id, key, existing)
+
+        # 2. 신규 입력값만 모아 Nx4 배열로 1회 추론
+        new_features = [features for features in unique_features if features not in existing_by_features]
+        new_results = {}
+        if new_features:
+            predictions = run_inference(model, new_features)
+            for features, pred_index in zip(new_features, predictions):
+                new_results[features] = IrisResult(
+                    user_id=user_id,
+                    service_id=iris_service_id,
+                    api_key_id=api_key_entry.id,
+                    sepal_length=features[0],
+                    sepal_width=features[1],
+                    petal_length=features[2],
+                    petal_width=features[3],
+                    predicted_class=TARGET_NAMES[pred_index],
+                    model_version='1.0',
+                    confirm=False,
+                    is_deleted=False,
+                    created_at=now
+                )
+            db.session.add_all(new_results.values())
+            db.session.flush()   # 신규 IrisResult id 일괄 확보
+
+        # 3. 입력 순서대로 응답 및 UsageLog 구성 (같은 요청 안에서 반복된 값은 두 번째부터 중복으로 처리)
+        results = []
+        usage_logs = []
+        seen_new = set()
+        for index, (features, row) in enumerate(zip(features_list, rows)):
+            if features in existing_by_features:
+                result, is_duplicate = existing_by_features[features], True
+            elif features in seen_new:
+                result, is_duplicate = new_results[features], True
+            else:
+                result, is_duplicate = new_results[features], False
+                seen_new.add(features)
+
+            usage_logs.append(dict(
+                user_id=user_id,
+                service_id=iris_service_id,
+                api_key_id=api_key_entry.id,
+                usage_type=UsageType.API_KEY,
+                endpoint=request.path,
+                inference_timestamp=now,
+                remote_addr=request.remote_addr,
+                response_status_code=200,
+                request_data_summary=str(row)[:200],
+                log_status='중복' if is_duplicate else '정상',
+                prediction_result_id=result.id
+            ))
+            item = {
+                "index": index,
+                "duplicate": is_duplicate,
+                "predicted_class": result.predicted_class,
+                "confirmed_class": result.confirmed_class if result.confirmed_class else "not available",
+                "sepal_length": features[0],
+                "sepal_width": features[1],
+                "petal_length": features[2],
+                "petal_width": features[3]
+            }
+            if is_duplicate:
+                item["created_at"] = result.created_at.isoformat() if result.created_at else None
+            results.append(item)
+
+        db.session.commit()
+        usage_writer.submit_many(usage_logs)
+        for features, new_result in new_results.items():
+            prediction_cache.put(user_id, features, new_result)
+
+        return jsonify({
+            "count": len(results),
+            "new_count": len(new_results),
+            "duplicate_count": len(results) - len(new_results),
+            "results": results
+        }), 200
+
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Error processing API batch predict request: {e}", exc_info=True)
+        return jsonify({"error": "An unexpected error occurred."}), 500
+
+
 """
 윈도우 CMD
 curl -X POST "http://localhost:5000/iris/api/predict" -H "Content-Type: application/json" -H "X-API-Key: your_api_key" -d "{\"sepal_length\":6.0,\"sepal_width\":3.5,\"petal_length\":4.5,\"petal_width\":1.5}"
@@ -875,4 +1074,7 @@ $body = @{
 
 Invoke-RestMethod -Uri "http://localhost:5000/iris/api/predict" -Method Post -Headers $headers -Body $body
 
+일괄 추론 (윈도우 CMD)
+curl -X POST "http://localhost:5000/iris/api/predict_batch" -H "Content-Type: application/json" -H "X-API-Key: your_api_key" -d "{\"rows\":[{\"sepal_length\":6.0,\"sepal_width\":3.5,\"petal_length\":4.5,\"petal_width\":1.5},[5.1,3.5,1.4,0.2]]}"
+
 """
\ No newline at end of file
@@ -0,0 +1,85 @@
+# apps/log_search.py
+# 관리자 로그(logs) 키워드 검색: SQLite FTS5(trigram) 인덱스 logs_fts 사용, 없으면 ilike 검색
+import threading
+from sqlalchemy import String, cast, column, literal_column, or_, table, text
+from apps.trigram import TRIGRAM_MIN_LENGTH, fts_table_exists, match_expression
+
+logs_fts = table('logs_fts', column('rowid'))
+
+# logs_fts 컬럼 순서 (migrations/versions/*_add_logs_fts_search_index.py의 트리거와 동일)
+FTS_COLUMNS = ('log_id', 'user_id', 'target_user_id', 'endpoint', 'log_title', 'log_summary', 'username')
+
+class LogSearch:
+    """logs의 ID/사용자 ID/대상 ID/엔드포인트/제목/요약/행위자 이름 키워드 검색 조건을 만듭니다.
+
+    - logs_fts가 있으면(SQLite, 'flask db upgrade' 적용) logs_fts와 조인해 logs_fts MATCH ?로 인덱스를 조회합니다.
+      logs_fts는 logs/users 트리거로 동기화되며 trigram 토크나이저라 기존 ilike와 같은 부분 문자열(대소문자 무시) 검색입니다.
+    - 최신순 정렬은 logs_fts.rowid(= logs.id, 기록 순서) 역순입니다. FTS5가 일치 행을 rowid 역순으로 바로 내주므로
+      흔한 검색어도 전체 일치 행을 정렬하지 않고 LIMIT에서 멈춥니다 (timestamp 정렬은 일치 행 전체를 정렬해야 함).
+    - logs_fts가 없거나 검색어가 3글자 미만이면 기존 ilike('%...%') 조건과 (timestamp, id) 정렬을 사용합니다."""
+
+    def __init__(self, app=None):
+        self._available = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self._available = None
+        app.extensions['log_search'] = self
+
+    def available(self):
+        """logs_fts 테이블 존재 여부 (프로세스당 한 번 확인)"""
+        if self._available is None:
+            with self._lock:
+                if self._available is None:
+                    self._available = fts_table_exists('logs_fts')
+        return self._available
+
+    def uses_index(self, keyword):
+        return bool(keyword) and len(keyword.strip()) >= TRIGRAM_MIN_LENGTH and self.available()
+
+    def filter(self, query, keyword):
+        """query(Log 기준)에 keyword 검색 조건을 적용합니다."""
+        from apps.dbmodels import Log, User
+        if self.uses_index(keyword):
+            return query.join(logs_fts, logs_fts.c.rowid == Log.id).filter(
+                literal_column('logs_fts').op('MATCH')(match_expression(keyword)))
+        pattern = f"%{keyword.strip()}%"
+        return query.join(User, Log.user_id == User.id, isouter=True).filter(
+            or_(
+                cast(Log.id, String).ilike(pattern),
+                cast(Log.user_id, String).ilike(pattern),
+                cast(Log.target_user_id, String).ilike(pattern),
+                Log.endpoint.ilike(pattern),
+                Log.log_title.ilike(pattern),
+                Log.log_summary.ilike(pattern),
+                User.username.ilike(pattern)
+            )
+        )
+
+    def keyset_options(self, keyword):
+        """keyset_paginate()에 넘길 최신순 정렬 인자 (filter()와 같은 keyword로 호출)"""
+        from apps.dbmodels import Log
+        if self.uses_index(keyword):
+            return {'sort_column': logs_fts.c.rowid, 'id_column': logs_fts.c.rowid,
+                    'cursor_values': lambda log: (log.id, log.id)}
+        return {'sort_column': Log.timestamp, 'id_column': Log.id}
+
+    def order_by(self, keyword):
+        """다운로드 등 전체 조회용 최신순 ORDER BY 절"""
+        options = self.keyset_options(keyword)
+        if options['sort_column'] is options['id_column']:
+            return [options['sort_column'].desc()]
+        return [options['sort_column'].desc(), options['id_column'].desc()]
+
+    def rebuild(self, connection):
+        """logs_fts 내용을 logs/users에서 다시 채웁니다. 삽입한 행 수를 반환합니다."""
+        connection.execute(text("DELETE FROM logs_fts"))
+        result = connection.execute(text(
+            f"INSERT INTO logs_fts(rowid, {', '.join(FTS_COLUMNS)}) "
+            "SELECT logs.id, logs.id, logs.user_id, logs.target_user_id, logs.endpoint, logs.log_title, "
+            "logs.log_summary, users.username FROM logs LEFT JOIN users ON users.id = logs.user_id"))
+        return result.rowcount
+
+log_search = LogSearch()   # create_app()에서 init_app
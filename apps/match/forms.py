@@ -1,9 +1,15 @@
 # apps/match/forms.py
 from flask import request
 from flask_wtf import FlaskForm
-from wtforms import SelectMultipleField, StringField, SubmitField, SelectField, widgets, DateField, FileField, ValidationError
-from wtforms.validators import DataRequired, Optional
+from wtforms import SelectMultipleField, StringField, SubmitField, SelectField, widgets, DateField, FileField, IntegerField, HiddenField, ValidationError
+from wtforms.validators import DataRequired, NumberRange, Optional
 from apps.dbmodels import User, UserType, MatchStatus, MatchLogType
+from apps.expert_directory import expert_directory
+
+def validate_active_expert(form, field):
+    """전문가 자동완성(match.expert_search)으로 고른 ID가 활성 전문가인지 확인"""
+    if field.data and expert_directory.get(field.data) is None:
+        raise ValidationError("선택 가능한 전문가가 아닙니다.")
 
 class MultiCheckboxField(SelectMultipleField):
     """체크박스를 여러 개 선택할 수 있는 필드"""
@@ -15,9 +21,19 @@ class NewMatchForm(FlaskForm):
     start_date = DateField("시작일", format='%Y-%m-%d', render_kw={"placeholder": "YYYY-MM-DD"}, validators=[Optional()])
     end_date = DateField("종료일", format='%Y-%m-%d', render_kw={"placeholder": "YYYY-MM-DD"}, validators=[Optional()])
     search_submit = SubmitField("검색")
-    expert_id = SelectField("전문가 선택", coerce=int, validators=[DataRequired()])
+    expert_id = IntegerField("전문가 선택", widget=widgets.HiddenInput(),
+                             validators=[DataRequired(message="전문가를 선택해야 합니다."), validate_active_expert])
     assign_submit = SubmitField("매칭 생성")
 
+class AutoMatchForm(FlaskForm):
+    """자동 매칭 미리보기(GET)/실행(POST) 폼"""
+    expertise_field = SelectField("전문 분야", choices=[], validators=[Optional()])   # 동적으로 할당됨
+    capacity = IntegerField("전문가별 최대 진행 매칭 수", validators=[Optional(), NumberRange(min=1, message="1 이상이어야 합니다.")])
+    limit = IntegerField("최대 배정 인원", validators=[Optional(), NumberRange(min=1, message="1 이상이어야 합니다.")])
+    plan_fingerprint = HiddenField()   # 미리보기한 배정 계획의 해시 (실행 시 계획이 바뀌었는지 확인)
+    preview_submit = SubmitField("미리보기")
+    apply_submit = SubmitField("자동 매칭 실행")
+
 
 # 수정된 MatchSearchForm 클래스
 class MatchSearchForm(FlaskForm):
@@ -32,7 +48,8 @@ class MatchSearchForm(FlaskForm):
     end_date = DateField("종료일", format='%Y-%m-%d', render_kw={"placeholder": "YYYY-MM-DD"}, validators=[Optional()])
     search_submit = SubmitField("검색")
     match_ids = MultiCheckboxField("매칭 선택", coerce=int, choices=[])
-    batch_expert_id = SelectField("전문가 할당", coerce=int, choices=[])
+    batch_expert_id = IntegerField("전문가 할당", widget=widgets.HiddenInput(), default=0,
+                                   validators=[validate_active_expert])
     batch_assign_submit = SubmitField("일괄 할당")
     batch_cancel_submit = SubmitField("일괄 취소")
 
@@ -1,18 +1,24 @@
 # apps/match/views.py
-import csv
-from io import StringIO
+from collections import Counter
 from datetime import datetime, time, timedelta
-from flask import render_template, request, redirect, url_for, flash, Response
+from flask import render_template, request, redirect, url_for, flash, jsonify
 from flask_login import login_required, current_user
-from sqlalchemy import or_, cast, String
+from sqlalchemy import String, cast, insert, or_, select, update
 from sqlalchemy.sql import func
-from sqlalchemy.orm import aliased  # Import aliased function
 from sqlalchemy.orm import joinedload
 
 # apps.extensions에서 db를 가져옵니다.
 from apps.extensions import db
-
-from apps.match.forms import LogSearchForm, MatchSearchForm, NewMatchForm, AdminLogSearchForm
+from apps.auto_match import MatchConflict, auto_matcher
+from apps.count_cache import count_cache
+from apps.exports import stream_csv
+from apps.expert_directory import expert_directory
+from apps.expert_scope import expert_scope
+from apps.match_counts import invalidate_match_counts
+from apps.pagination import keyset_paginate
+from apps.user_search import user_search
+
+from apps.match.forms import AutoMatchForm, LogSearchForm, MatchSearchForm, NewMatchForm, AdminLogSearchForm
 from ..dbmodels import MatchLog, MatchLogType, User, Match, MatchStatus, UserType
 from apps.decorators import admin_required  # 데코레이터
 
@@ -42,6 +48,33 @@ def log_action(title, summary, target_user_id=None, status_code=200):
         print(f"로깅 실패: {e}")
 """
 
+# 일괄 처리 결과 중 건너뛴 매칭 사유
+BATCH_SKIP_REASONS = {
+    'not_found': '존재하지 않는 매칭',
+    'not_in_progress': '진행 중이 아닌 매칭',
+    'already_cancelled': '이미 취소된 매칭',
+    'user_unavailable': '이미 매칭 상태이거나 존재하지 않는 사용자',
+}
+BATCH_SKIP_SHOWN_IDS = 20   # 사유별로 메시지에 표시할 최대 ID 수
+
+class BatchConflict(Exception):
+    """일괄 UPDATE 대상 행 수가 조회 결과와 다름 (조회 이후 다른 요청이 변경)"""
+
+def _load_batch_matches(match_ids, *extra_user_ids):
+    """매칭과 그 사용자/전문가(+extra_user_ids)를 IN 조회 두 번으로 읽어 (id -> Match, id -> User)를 반환합니다."""
+    matches = {m.id: m for m in Match.query.filter(Match.id.in_(match_ids))}
+    user_ids = {m.user_id for m in matches.values()} | {m.expert_id for m in matches.values()} | set(extra_user_ids)
+    users = {u.id: u for u in User.query.filter(User.id.in_(user_ids))} if user_ids else {}
+    return matches, users
+
+def _flash_batch_skips(outcomes):
+    """outcomes(match_id 또는 user_id -> 결과)에서 건너뛴 ID를 사유별로 알립니다."""
+    for reason, label in BATCH_SKIP_REASONS.items():
+        skipped = [str(match_id) for match_id, outcome in outcomes.items() if outcome == reason]
+        if skipped:
+            shown = ', '.join(skipped[:BATCH_SKIP_SHOWN_IDS]) + (' ...' if len(skipped) > BATCH_SKIP_SHOWN_IDS else '')
+            flash(f"{label} {len(skipped)}건은 건너뛰었습니다 (ID: {shown}).", "warning")
+
 @match.route('/', methods=['GET', 'POST'], strict_slashes=False)
 @admin_required
 def match_manager():
@@ -51,14 +84,7 @@ def match_manager():
 
     new_match_form = NewMatchForm()
     match_search_form = MatchSearchForm()
-
-    experts = User.query.filter_by(user_type=UserType.EXPERT, is_active=True, is_deleted=False).order_by(User.username).all()
-    expert_choices = [(expert.id, expert.username) for expert in experts]
-    if not expert_choices:
-        expert_choices = [(0, '--- 선택 가능한 전문가가 없습니다 ---')]
-    expert_choices.insert(0, (0, '--- 전문가 선택 ---'))
-    new_match_form.expert_id.choices = expert_choices
-    match_search_form.batch_expert_id.choices = expert_choices
+    # 전문가 선택은 자동완성(match.expert_search)으로 필요한 만큼만 조회
 
     # 탭 별 검색 로직 분리
     search_type = request.args.get('search_type', 'new', type=str)
@@ -77,20 +103,18 @@ def match_manager():
     )
     if search_type == 'new':
         if keyword_query_new:
-            new_match_query = new_match_query.filter(
-                or_(
-                    cast(User.id, String).ilike(f'%{keyword_query_new}%'),
-                    User.username.ilike(f'%{keyword_query_new}%'),
-                    User.email.ilike(f'%{keyword_query_new}%')
-                )
-            )
+            # ID/이름/이메일: users_fts 인덱스, 없으면 ilike (apps/user_search.py)
+            new_match_query = new_match_query.filter(user_search.user_filter(keyword_query_new))
         if start_date_query_new:
             new_match_query = new_match_query.filter(User.created_at >= datetime.strptime(start_date_query_new, '%Y-%m-%d'))
         if end_date_query_new:
             new_match_query = new_match_query.filter(User.created_at <= datetime.strptime(end_date_query_new, '%Y-%m-%d') + timedelta(days=1))
     
-    new_match_pagination = new_match_query.order_by(User.created_at.desc()).paginate(
-        page=new_page, per_page=10, error_out=False
+    new_match_filters = {'keyword': keyword_query_new, 'start_date': start_date_query_new,
+                         'end_date': end_date_query_new} if search_type == 'new' else {}
+    new_match_pagination = count_cache.paginate(
+        new_match_query.order_by(User.created_at.desc()), 'unassigned_users', new_match_filters,
+        approximate=bool(new_match_filters.get('keyword')), page=new_page, per_page=10
     )
     users_to_match = new_match_pagination.items
     
@@ -111,23 +135,17 @@ def match_manager():
     start_date_query = request.args.get('start_date', type=str)
     end_date_query = request.args.get('end_date', type=str)
     
-    expert_alias = aliased(User)
-    matches_query = db.session.query(Match).join(User, Match.user_id == User.id).outerjoin(expert_alias, Match.expert_id == expert_alias.id)
+    matches_query = db.session.query(Match)
 
     filtered_args = {'search_type': 'manage'}
     if search_type == 'manage':
         if keyword_query:
-            matches_query = matches_query.filter(
-                or_(
-                    cast(Match.id, String).ilike(f'%{keyword_query}%'),
-                    cast(User.id, String).ilike(f'%{keyword_query}%'),
-                    cast(expert_alias.id, String).ilike(f'%{keyword_query}%'),
-                    User.username.ilike(f'%{keyword_query}%'),
-                    expert_alias.username.ilike(f'%{keyword_query}%'),
-                    User.email.ilike(f'%{keyword_query}%'),
-                    expert_alias.email.ilike(f'%{keyword_query}%')
-                )
-            )
+            # 사용자/전문가의 ID/이름/이메일은 users_fts 인덱스로 일치 ID를 찾아 matches 인덱스로 조회
+            keyword_filter = or_(user_search.id_filter(Match.user_id, keyword_query),
+                                 user_search.id_filter(Match.expert_id, keyword_query))
+            if keyword_query.strip().isdigit():   # 매칭 ID는 숫자 검색어일 때만 일치 가능
+                keyword_filter = or_(keyword_filter, cast(Match.id, String).ilike(f'%{keyword_query.strip()}%'))
+            matches_query = matches_query.filter(keyword_filter)
             filtered_args['keyword'] = keyword_query
 
         if status_query != 'all':
@@ -143,18 +161,17 @@ def match_manager():
             matches_query = matches_query.filter(Match.created_at <= end_date_val + timedelta(days=1))
             filtered_args['end_date'] = end_date_val.isoformat()
     
-    pagination = matches_query.order_by(Match.created_at.desc()).paginate(page=page, per_page=10, error_out=False)
+    matches_filters = {'keyword': keyword_query, 'start_date': start_date_query,
+                       'end_date': end_date_query} if search_type == 'manage' else {}
+    pagination = count_cache.paginate(
+        matches_query.order_by(Match.created_at.desc()),
+        f"matches:{status_query if search_type == 'manage' else 'all'}", matches_filters,
+        approximate=bool(matches_filters.get('keyword')), page=page, per_page=10
+    )
     matches_history = pagination.items
 
-    unassigned_matches_count = User.query.filter(
-        User.user_type == UserType.USER,
-        User.match_status == MatchStatus.UNASSIGNED,
-        User.is_active == True,
-        User.is_deleted == False
-    ).count()
-    in_progress_matches_count = Match.query.filter(
-        Match.status.in_([MatchStatus.IN_PROGRESS])
-    ).count()
+    unassigned_matches_count = count_cache.total('unassigned_users')
+    in_progress_matches_count = count_cache.total('matches:IN_PROGRESS')
 
     new_match_form.process(request.args)
     match_search_form.process(request.args)
@@ -182,86 +199,109 @@ def match_manager():
 @login_required
 @admin_required
 def create_new_match():
-    new_match_form = NewMatchForm()
-
-    # 전문가 목록 채우기
-    experts = User.query.filter_by(user_type=UserType.EXPERT, is_active=True, is_deleted=False).order_by(User.username).all()
-    expert_choices = [(expert.id, expert.username) for expert in experts]
-
-    if not expert_choices:
-        expert_choices = [(0, '--- 선택 가능한 전문가가 없습니다 ---')]
-
-    expert_choices.insert(0, (0, '--- 전문가 선택 ---'))
-    new_match_form.expert_id.choices = expert_choices
+    new_match_form = NewMatchForm()   # expert_id는 활성 전문가인지 expert_directory로 검증
 
     if new_match_form.validate_on_submit():
-        user_ids = request.form.getlist('user_ids')     # 
+        user_ids = list(dict.fromkeys(int(id_str) for id_str in request.form.getlist('user_ids') if id_str.isdigit()))
         expert_id = new_match_form.expert_id.data
 
         if not user_ids or expert_id == 0:
             flash("사용자 또는 전문가를 선택해야 합니다.", "danger")
         else:
-            new_matches_created = []
             try:
-                # 전문가 객체를 미리 조회합니다.
-                expert_to_match = User.query.get(expert_id)
-                expert_username = expert_to_match.username if expert_to_match else "알 수 없는 전문가"
-
-                for user_id in user_ids:
-                    user_to_match = User.query.get(user_id)
-                    if user_to_match and user_to_match.match_status == MatchStatus.UNASSIGNED:
-                        new_match = Match(user_id=user_id, expert_id=expert_id, status=MatchStatus.IN_PROGRESS)  # IN_PROGRESS
-                        db.session.add(new_match)
-                        
-                        db.session.flush()
-
-                        user_to_match.match_status = MatchStatus.IN_PROGRESS
-                        print(f'("user_id",user_id)')
-                        user_username = user_to_match.username
-                        log_summary = f"신규 매칭 생성: 사용자({user_username})({user_id}) - 전문가({expert_username})({expert_id})"
-                        
-                        match_log = MatchLog(
-                            admin_id=current_user.id,
-                            user_id=user_id,
-                            expert_id=expert_id,
-                            match_id=new_match.id,
-                            match_status=MatchStatus.IN_PROGRESS,
-                            log_title=MatchLogType.MATCH_CREATE.value,
-                            log_summary=log_summary
-                        )
-                        db.session.add(match_log)
-                        new_matches_created.append(user_id)
-                    else:
-                        flash(f"사용자 ID {user_id}는 이미 매칭 상태이거나 존재하지 않습니다.", "warning")
+                # 선택한 사용자들의 매칭 상태를 한 번에 확인
+                candidates = set(db.session.execute(
+                    select(User.id).where(User.id.in_(user_ids), User.match_status == MatchStatus.UNASSIGNED)
+                ).scalars())
+                outcomes = {user_id: 'created' if user_id in candidates else 'user_unavailable' for user_id in user_ids}
+                targets = [user_id for user_id in user_ids if user_id in candidates]
+
+                if targets:
+                    # 상태 UPDATE 1회 + Match/MatchLog 일괄 insert (apps/auto_match.py)
+                    auto_matcher.create_matches([(user_id, expert_id) for user_id in targets], current_user.id)
 
-            
                 db.session.commit()
-                flash(f"총 {len(new_matches_created)}건의 새로운 매칭이 생성되었습니다.", "success")
+                invalidate_match_counts()
+                expert_scope.invalidate_expert(expert_id)
+                flash(f"총 {len(targets)}건의 새로운 매칭이 생성되었습니다.", "success")
+                _flash_batch_skips(outcomes)
+            except MatchConflict:
+                db.session.rollback()
+                flash("처리 중 다른 작업이 일부 사용자를 먼저 매칭했습니다. 다시 시도해 주세요.", "warning")
             except Exception as e:
                 db.session.rollback()
                 flash(f"매칭 생성 중 오류가 발생했습니다: {str(e)}", "danger")
+    else:
+        for field, errors in new_match_form.errors.items():
+            for error in errors:
+                flash(f"{new_match_form[field].label.text}: {error}", "danger")
 
     return redirect(url_for('match.match_manager'))
 
 
+@match.route('/experts')
+@login_required
+@admin_required
+def expert_search():
+    """전문가 선택 자동완성: 사용자명/이메일 접두어 또는 ID로 찾은 활성 전문가와 진행 중 매칭 수 (JSON)"""
+    limit = min(request.args.get('limit', 20, type=int), 50)
+    loads = expert_directory.loads()
+    return jsonify({'results': [
+        {'id': expert.id, 'username': expert.username, 'email': expert.email,
+         'expertise_field': expert.expertise_field, 'career_years': expert.career_years,
+         'active_matches': loads.get(expert.id, 0)}
+        for expert in expert_directory.search(request.args.get('q', '', type=str), limit=limit)
+    ]})
+
+@match.route('/auto', methods=['GET', 'POST'])
+@login_required
+@admin_required
+def auto_match():
+    """자동 매칭: GET은 배정 계획 미리보기(dry-run), POST(apply_submit)는 미리보기한 계획대로 매칭 생성
+    (미리보기 이후 계획이 바뀌었으면 실행하지 않고 새 계획을 다시 보여줌)"""
+    auto_match_form = AutoMatchForm()
+    auto_match_form.expertise_field.choices = [('', '전체 분야')] + [(field, field) for field in auto_matcher.expertise_fields()]
+    if request.method == 'GET':
+        auto_match_form.process(request.args)
+
+    if request.method == 'POST':
+        if auto_match_form.validate_on_submit():
+            plan = auto_matcher.plan(auto_match_form.expertise_field.data or None,
+                                     auto_match_form.capacity.data, auto_match_form.limit.data)
+            if plan.fingerprint != auto_match_form.plan_fingerprint.data:
+                flash("미리보기 이후 대기 사용자 또는 전문가의 진행 중 매칭이 바뀌었습니다. 변경된 계획을 확인한 뒤 다시 실행해 주세요.", "warning")
+                return render_template('match/auto_match.html', auto_match_form=auto_match_form, plan=plan)
+            try:
+                created = auto_matcher.apply(plan, current_user.id)
+                flash(f"자동 매칭으로 총 {created}건의 새로운 매칭이 생성되었습니다.", "success")
+                if plan.waiting:
+                    flash(f"전문가별 최대 진행 매칭 수({plan.capacity}건)에 도달하여 {plan.waiting}명은 배정하지 못했습니다.", "warning")
+                return redirect(url_for('match.match_manager'))
+            except MatchConflict:
+                flash("처리 중 다른 작업이 일부 사용자를 먼저 매칭했거나 전문가의 진행 중 매칭 수가 상한을 넘게 됩니다. "
+                      "변경된 계획을 확인한 뒤 다시 실행해 주세요.", "warning")
+            except Exception as e:
+                flash(f"자동 매칭 중 오류가 발생했습니다: {str(e)}", "danger")
+        else:
+            for field, errors in auto_match_form.errors.items():
+                for error in errors:
+                    flash(f"{auto_match_form[field].label.text}: {error}", "danger")
+
+    plan = auto_matcher.plan(auto_match_form.expertise_field.data or None,
+                             auto_match_form.capacity.data, auto_match_form.limit.data)
+    return render_template('match/auto_match.html', auto_match_form=auto_match_form, plan=plan)
+
+
 # 수정된 batch_update_matches 함수
 @match.route('/batch_update', methods=['POST'])
 @login_required
 @admin_required
 def batch_update_matches():
-    # 전문가 목록 받아오기 및 choices 준비
-    experts = User.query.filter_by(user_type=UserType.EXPERT, is_active=True, is_deleted=False).order_by(User.username).all()
-    expert_choices = [(expert.id, expert.username) for expert in experts]
-    if not expert_choices:
-        expert_choices = [(0, '--- 선택 가능한 전문가가 없습니다 ---')]
-    batch_expert_choices = [(0, '--- 전문가 선택 ---')] + expert_choices
-
-    # 폼 인스턴스를 request.form으로 생성
+    # 폼 인스턴스를 request.form으로 생성 (batch_expert_id는 expert_directory로 검증)
     match_search_form = MatchSearchForm(request.form)
 
     # 반드시 동적으로 status와 기타 SelectField의 choices 할당!
     match_search_form.status.choices = [('all', '모두')] + [(s.name, s.value) for s in MatchStatus]
-    match_search_form.batch_expert_id.choices = batch_expert_choices
 
     # 폼에서 status가 빠져 있으면 기본값 할당   (핵심!)
     if 'status' not in request.form:
@@ -269,7 +309,7 @@ def batch_update_matches():
         
     # 매칭 선택(match_ids) 필드 값을 기반으로 choices 동적 세팅
     match_ids_str = request.form.getlist('match_ids')
-    match_ids = [int(id_str) for id_str in match_ids_str if id_str.isdigit()]
+    match_ids = list(dict.fromkeys(int(id_str) for id_str in match_ids_str if id_str.isdigit()))   # 중복 제거, 순서 유지
     match_search_form.match_ids.choices = [(int(id), id) for id in match_ids_str]
 
     # ------ 일괄 할당 처리 ------
@@ -290,37 +330,62 @@ def batch_update_matches():
 
         try:
             new_expert_id = match_search_form.batch_expert_id.data
-            updated_count = 0
- 
-            # Fetch the new expert's username
-            new_expert_user = User.query.get(new_expert_id)
+            # 대상 매칭 + 사용자/전문가를 IN 조회 두 번으로 읽음 (매칭마다 get() 하지 않음)
+            matches, users = _load_batch_matches(match_ids, new_expert_id)
+            new_expert_user = users.get(new_expert_id)
             new_expert_username = new_expert_user.username if new_expert_user else "알 수 없는 전문가"
- 
+
+            outcomes, targets = {}, []
             for match_id in match_ids:
-                match_to_update = Match.query.get(match_id)
-                if match_to_update and match_to_update.status == MatchStatus.IN_PROGRESS:
-                    original_expert_id = match_to_update.expert_id
-                    original_expert_user = User.query.get(match_to_update.expert_id)
+                match_to_update = matches.get(match_id)
+                if match_to_update is None:
+                    outcomes[match_id] = 'not_found'
+                elif match_to_update.status != MatchStatus.IN_PROGRESS:
+                    outcomes[match_id] = 'not_in_progress'
+                else:
+                    outcomes[match_id] = 'updated'
+                    targets.append(match_to_update)
+
+            if targets:
+                # 전문가 변경은 UPDATE 한 번 (조회 이후 다른 요청이 상태를 바꿨으면 전체 취소)
+                result = db.session.execute(
+                    update(Match)
+                    .where(Match.id.in_([m.id for m in targets]), Match.status == MatchStatus.IN_PROGRESS)
+                    .values(expert_id=new_expert_id)
+                    .execution_options(synchronize_session=False)
+                )
+                if result.rowcount != len(targets):
+                    raise BatchConflict()
+                now = datetime.now()
+                match_logs = []
+                for match_to_update in targets:
+                    original_expert_user = users.get(match_to_update.expert_id)
                     original_expert_username = original_expert_user.username if original_expert_user else "알 수 없는 전문가"
-                    
-                    match_to_update.expert_id = new_expert_id
-                    
-                    # --- 수정된 부분 ---
-                    log_summary = f"매칭 전문가 변경: 기존({original_expert_username})({original_expert_id}) -> 신규({new_expert_username})({new_expert_id})"
-                    
-                    match_log = MatchLog(
+                    log_summary = f"매칭 전문가 변경: 기존({original_expert_username})({match_to_update.expert_id}) -> 신규({new_expert_username})({new_expert_id})"
+                    match_logs.append(dict(
                         admin_id=current_user.id,
                         user_id=match_to_update.user_id,
                         expert_id=new_expert_id,
-                        match_id=match_id,
+                        match_id=match_to_update.id,
                         match_status=MatchStatus.IN_PROGRESS,
                         log_title=MatchLogType.MATCH_EXPERT_CHANGE.value,
-                        log_summary=log_summary
-                    )
-                    db.session.add(match_log)
-                    updated_count += 1
+                        log_summary=log_summary,
+                        timestamp=now,
+                    ))
+                db.session.execute(insert(MatchLog), match_logs)   # executemany
+                # 전문가별 진행 중 매칭 수: 신규 +N, 기존 전문가 -1씩 (apps/expert_directory.py)
+                load_deltas = Counter({new_expert_id: len(targets)})
+                load_deltas.subtract(m.expert_id for m in targets)
+                expert_directory.record_bulk_loads(load_deltas)
+            # 전문가 범위 캐시 무효화 대상: 신규 전문가 + 기존 전문가들 (커밋 후에는 객체가 만료되므로 미리 수집)
+            affected_expert_ids = {new_expert_id} | {m.expert_id for m in targets}
             db.session.commit()
-            flash(f"총 {updated_count}건의 매칭에 전문가를 재할당했습니다.", "success")
+            expert_scope.invalidate_expert(*affected_expert_ids)
+            flash(f"총 {len(targets)}건의 매칭에 전문가를 재할당했습니다.", "success")
+            _flash_batch_skips(outcomes)
+        except BatchConflict:
+            db.session.rollback()
+            flash("처리 중 다른 작업이 일부 매칭을 변경했습니다. 다시 시도해 주세요.", "warning")
         except Exception as e:
             db.session.rollback()
             flash(f"작업 처리 중 오류가 발생했습니다: {str(e)}", "danger")
@@ -332,43 +397,68 @@ def batch_update_matches():
             return redirect(url_for('match.match_manager'))
 
         try:
-            cancelled_count = 0
+            # 대상 매칭 + 사용자/전문가를 IN 조회 두 번으로 읽음 (매칭마다 get() 하지 않음)
+            matches, users = _load_batch_matches(match_ids)
+            outcomes, targets = {}, []
             for match_id in match_ids:
-                match_to_cancel = Match.query.get(match_id)
-                if match_to_cancel and match_to_cancel.status != MatchStatus.CANCELLED:
-                    match_to_cancel.status = MatchStatus.CANCELLED
-                    match_to_cancel.closed_at = datetime.now()
-
-                    user = User.query.get(match_to_cancel.user_id)
-                    expert = User.query.get(match_to_cancel.expert_id)
-
-                    # 사용자 정보 가져오기
+                match_to_cancel = matches.get(match_id)
+                if match_to_cancel is None:
+                    outcomes[match_id] = 'not_found'
+                elif match_to_cancel.status == MatchStatus.CANCELLED:
+                    outcomes[match_id] = 'already_cancelled'
+                else:
+                    outcomes[match_id] = 'cancelled'
+                    targets.append(match_to_cancel)
+
+            if targets:
+                now = datetime.now()
+                # 매칭 취소 + 사용자 상태 복구를 UPDATE 두 번으로 처리 (조회 이후 다른 요청이 취소했으면 전체 취소)
+                result = db.session.execute(
+                    update(Match)
+                    .where(Match.id.in_([m.id for m in targets]), Match.status != MatchStatus.CANCELLED)
+                    .values(status=MatchStatus.CANCELLED, closed_at=now)
+                    .execution_options(synchronize_session=False)
+                )
+                if result.rowcount != len(targets):
+                    raise BatchConflict()
+                db.session.execute(
+                    update(User)
+                    .where(User.id.in_({m.user_id for m in targets if m.user_id in users}))
+                    .values(match_status=MatchStatus.UNASSIGNED)
+                    .execution_options(synchronize_session=False)
+                )
+                match_logs = []
+                for match_to_cancel in targets:
+                    user = users.get(match_to_cancel.user_id)
+                    expert = users.get(match_to_cancel.expert_id)
                     user_username = user.username if user else "알 수 없는 사용자"
                     user_id = user.id if user else "알 수 없음"
-
-                    # 전문가 정보 가져오기
                     expert_username = expert.username if expert else "알 수 없는 전문가"
                     expert_id = expert.id if expert else "알 수 없음"
-
-                    if user:
-                        user.match_status = MatchStatus.UNASSIGNED
-
-                    # --- 수정된 부분: log_summary에 사용자 및 전문가 정보 모두 포함 ---
                     log_summary = f"매치 취소 처리: 사용자({user_username}, ID: {user_id}), 전문가({expert_username}, ID: {expert_id})"
-
-                    match_log = MatchLog(
+                    match_logs.append(dict(
                         admin_id=current_user.id,
-                        match_id=match_id,
+                        match_id=match_to_cancel.id,
                         user_id=match_to_cancel.user_id,
                         expert_id=match_to_cancel.expert_id,
                         match_status=MatchStatus.CANCELLED,
                         log_title=MatchLogType.MATCH_ERASE.value,
                         log_summary=log_summary,
-                    )
-                    db.session.add(match_log)
-                    cancelled_count += 1
+                        timestamp=now,
+                    ))
+                db.session.execute(insert(MatchLog), match_logs)   # executemany
+                load_deltas = Counter()   # 진행 중이던 매칭만 전문가별 진행 중 매칭 수에서 뺌
+                load_deltas.subtract(m.expert_id for m in targets if m.status == MatchStatus.IN_PROGRESS)
+                expert_directory.record_bulk_loads(load_deltas)
+            affected_expert_ids = {m.expert_id for m in targets}   # 커밋 후에는 객체가 만료되므로 미리 수집
             db.session.commit()
-            flash(f"총 {cancelled_count}건의 매칭이 취소되었습니다.", "success")
+            invalidate_match_counts()
+            expert_scope.invalidate_expert(*affected_expert_ids)
+            flash(f"총 {len(targets)}건의 매칭이 취소되었습니다.", "success")
+            _flash_batch_skips(outcomes)
+        except BatchConflict:
+            db.session.rollback()
+            flash("처리 중 다른 작업이 일부 매칭을 변경했습니다. 다시 시도해 주세요.", "warning")
         except Exception as e:
             db.session.rollback()
             flash(f"작업 처리 중 오류가 발생했습니다: {str(e)}", "danger")
@@ -443,12 +533,9 @@ def log_list():
         end_of_day = datetime.combine(form.end_date.data, time.max)
         logs_query = logs_query.filter(MatchLog.timestamp <= end_of_day)
 
-    page = request.args.get('page', 1, type=int)
-    logs_pagination = logs_query.order_by(MatchLog.timestamp.desc()).paginate(
-        page=page,
-        per_page=PER_PAGE,
-        error_out=False
-    )
+    logs_pagination = keyset_paginate(logs_query, MatchLog.timestamp, MatchLog.id,
+                                      after=request.args.get('after'), before=request.args.get('before'),
+                                      per_page=PER_PAGE)
     
     # GET 요청으로 들어올 때 form.data는 None이므로, 쿼리스트링에서 form을 다시 바인딩해야 합니다.
     # 이 부분은 이미 위에서 처리하고 있으므로, render_template에 올바른 form 객체만 넘기면 됩니다.
@@ -468,11 +555,7 @@ def logs_download_csv():
     # GET 요청의 쿼리 파라미터로 필터링 조건을 가져옴
     form = AdminLogSearchForm(request.args)
     
-    logs_query = MatchLog.query.options(
-        joinedload(MatchLog.admin),
-        joinedload(MatchLog.user),
-        joinedload(MatchLog.expert)
-    )
+    logs_query = MatchLog.query   # CSV 행은 관계(admin/user/expert)를 사용하지 않으므로 joinedload 불필요
 
     if form.keyword.data:
         keyword = f"%{form.keyword.data}%"
@@ -496,21 +579,15 @@ def logs_download_csv():
         end_of_day = datetime.combine(form.end_date.data, time.max)
         logs_query = logs_query.filter(MatchLog.timestamp <= end_of_day)
     
-    logs = logs_query.order_by(MatchLog.timestamp.desc()).all()
-    
-    output = StringIO()
-    writer = csv.writer(output)
-    
-    # CSV 헤더 작성
+    # CSV 헤더
     headers = [
         "ID", "행위자(Admin ID)", "대상 사용자(User ID)", "대상 전문가(Expert ID)",
         "매치 ID", "로그 제목", "내용 요약", "타임스탬프"
     ]
-    writer.writerow(headers)
     
-    # 로그 데이터 작성
-    for log in logs:
-        row = [
+    # 로그 데이터 행
+    def row(log):
+        return [
             log.id,
             log.admin_id,
             log.user_id,
@@ -520,13 +597,6 @@ def logs_download_csv():
             log.log_summary,
             log.timestamp.strftime('%Y-%m-%d %H:%M:%S')
         ]
-        writer.writerow(row)
     
-    # StringIO의 내용을 가져와서 utf-8-sig로 인코딩합니다.
-    output_str = output.getvalue()
-    output_bytes = output_str.encode('utf-8-sig')
-    output.close()
-    # csv 파일을 응답으로 반환
-    response = Response(output_bytes, mimetype='text/csv; charset=utf-8-sig')
-    response.headers['Content-Disposition'] = f'attachment; filename=matchlog_results_{datetime.now().strftime("%Y%m%d%H%M%S")}.csv'
-    return response
\ No newline at end of file
+    # csv 파일을 스트리밍 응답으로 반환
+    return stream_csv(logs_query.order_by(MatchLog.timestamp.desc()), headers, row, 'matchlog_results')
\ No newline at end of file
@@ -0,0 +1,18 @@
+# apps/match_counts.py
+# 매칭 관리 화면 건수 (count_cache 등록/무효화): 매칭·관리자 화면과 자동 매칭이 함께 사용
+from apps.count_cache import count_cache
+from apps.dbmodels import Match, MatchStatus, User, UserType
+
+# 조건 없는 전체 건수는 커밋 시 증감으로 정확하게 유지 (apps/count_cache.py)
+count_cache.register_total('unassigned_users', User, user_type=UserType.USER, match_status=MatchStatus.UNASSIGNED,
+                           is_active=True, is_deleted=False)
+count_cache.register_total('matches:all', Match)
+for _status in MatchStatus:
+    count_cache.register_total(f'matches:{_status.name}', Match, status=_status)
+
+def invalidate_match_counts():
+    """bulk update()/insert는 ORM 이벤트를 거치지 않으므로 커밋 후 매칭/미배정 사용자 건수를 다시 계산하도록 비웁니다."""
+    count_cache.invalidate('unassigned_users')
+    count_cache.invalidate('matches:all')
+    for status in MatchStatus:
+        count_cache.invalidate(f'matches:{status.name}')
@@ -1,37 +1,46 @@
 from flask import render_template, redirect, url_for, flash, request
 from flask_login import login_required, current_user
 from datetime import datetime, timedelta
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload
 from . import mypage
 from apps.mypage.forms import ApiKeyForm, ChangePasswordForm
 from apps import db
-from apps.dbmodels import APIKey, User
+from apps.dbmodels import APIKey, Subscription, UsageLog, UsageType, User
+from apps.api_key_cache import api_key_cache
+from apps.usage_rollup import usage_rollup
+
+RECENT_USAGE_LOGS = 5   # 대시보드 최근 사용 로그 개수
+
 @mypage.route('/dashboard')
 @login_required
 def dashboard():
     total_api_keys = APIKey.query.filter_by(user_id=current_user.id).count()
-    approved_subscriptions = 2 #Subscription.query.filter_by(user_id=current_user.id, status='approved').count()
-    pending_subscriptions = 1 #Subscription.query.filter_by(user_id=current_user.id, status='pending').count() 
-    # 최근 사용 로그 5개
-    recent_usage_logs = None
-    # UsageLog.query.filter_by(user_id=current_user.id)\
-    #                                .order_by(UsageLog.timestamp.desc())\
-    #                                .limit(5).all()
-    # 이번 달 총 사용량
-    current_month = datetime.now().month
-    current_year = datetime.now().year
-    monthly_usage = 0
-    #db.session.query(func.sum(UsageLog.usage_count))\
-    #                    .filter(UsageLog.user_id == current_user.id)\
-    #                    .filter(extract('month', UsageLog.timestamp) == current_month)\
-    #                    .filter(extract('year', UsageLog.timestamp) == current_year)\
-    #                    .scalar() or 0
+    # 구독 상태별 건수 (한 번의 GROUP BY)
+    subscription_counts = dict(db.session.query(Subscription.status, func.count(Subscription.id))
+                               .filter(Subscription.user_id == current_user.id)
+                               .group_by(Subscription.status).all())
+    approved_subscriptions = subscription_counts.get('approved', 0)
+    pending_subscriptions = subscription_counts.get('pending', 0)
+    # 최근 사용 로그: (user_id, timestamp) 인덱스에서 최신 RECENT_USAGE_LOGS건만 읽음
+    recent_usage_logs = UsageLog.query.options(joinedload(UsageLog.service))\
+                                      .filter_by(user_id=current_user.id)\
+                                      .order_by(UsageLog.timestamp.desc())\
+                                      .limit(RECENT_USAGE_LOGS).all()
+    # 이번 달 총 사용량: usage_logs 대신 사용자별 일별 집계(usage_rollups)에서 합산
+    month_start = datetime.now().date().replace(day=1)
+    monthly_usage_by_type = {usage_type: 0 for usage_type in UsageType}
+    for row in usage_rollup.summary(start=month_start, group_by=('usage_type',), user_id=current_user.id):
+        monthly_usage_by_type[row.usage_type] = row.usage_count
+    monthly_usage = sum(monthly_usage_by_type.values())
     return render_template('mypage/dashboard.html',
                            title='마이페이지 대시보드',
                            total_api_keys=total_api_keys,
                            approved_subscriptions=approved_subscriptions,
                            pending_subscriptions=pending_subscriptions,
                            recent_usage_logs=recent_usage_logs,
-                           monthly_usage=monthly_usage) 
+                           monthly_usage=monthly_usage,
+                           monthly_usage_by_type=monthly_usage_by_type)
 # change_password 엔드포인트
 @mypage.route("/change_password", methods=["GET", "POST"])
 @login_required  # 로그인한 사용자만 접근 가능
@@ -96,6 +105,7 @@ def toggle_api_key_active(key_id):
 
     api_key.is_active = not api_key.is_active # 상태 토글
     db.session.commit()
+    api_key_cache.invalidate_key(api_key.id)
     flash(f"API 키 {'활성화' if api_key.is_active else '비활성화'} 완료.", 'success')
     return redirect(url_for('mypage.api_keys'))
 @mypage.route('/delete-api-key/<int:key_id>', methods=['POST'])
@@ -107,8 +117,10 @@ def delete_api_key(key_id):
         flash('권한이 없습니다.', 'danger')
         return redirect(url_for('mypage.api_keys'))
     try:
+        api_key_id = api_key.id
         db.session.delete(api_key) # API 키 삭제
         db.session.commit()
+        api_key_cache.invalidate_key(api_key_id)
         flash('API 키가 성공적으로 삭제되었습니다.', 'success')
     except Exception as e:
         db.session.rollback() # 오류 발생 시 롤백
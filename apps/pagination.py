@@ -0,0 +1,109 @@
+# apps/pagination.py
+# 목록 화면 공통 키셋(seek) 페이지네이션 (OFFSET/COUNT(*) 없이 (정렬 시각, id) 기준으로 다음/이전 페이지 조회)
+import base64, json
+from datetime import datetime
+from sqlalchemy import String, or_, type_coerce
+
+class KeysetPagination:
+    """keyset_paginate() 결과. 템플릿에서는 _macros.html의 render_keyset_pagination으로 링크를 그립니다."""
+
+    def __init__(self, items, per_page, has_next=False, has_prev=False, next_cursor=None, prev_cursor=None):
+        self.items = items
+        self.per_page = per_page
+        self.has_next = has_next
+        self.has_prev = has_prev
+        self.next_cursor = next_cursor   # 다음 페이지 요청 시 after=
+        self.prev_cursor = prev_cursor   # 이전 페이지 요청 시 before=
+
+def encode_cursor(sort_value, row_id):
+    """(정렬 시각, id)를 URL에 넣을 수 있는 불투명 문자열로 인코딩합니다.
+    정렬 값은 datetime, 정수 또는 SQLite에 저장된 시각 문자열 그대로입니다."""
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    payload = json.dumps([sort_value, row_id], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(payload).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor):
+    """encode_cursor()의 역변환. 형식이 잘못된 커서는 None(첫 페이지)으로 처리합니다."""
+    if not cursor:
+        return None
+    try:
+        payload = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        sort_value, row_id = json.loads(payload)
+        if not isinstance(sort_value, int):
+            datetime.fromisoformat(sort_value)   # 형식 확인 (비교 시 저장 형식 그대로 사용하도록 문자열 유지)
+        return sort_value, int(row_id)
+    except (ValueError, TypeError):
+        return None
+
+def keyset_paginate(query, sort_column, id_column, after=None, before=None, per_page=10, cursor_values=None):
+    """query를 (sort_column DESC, id_column DESC) 순으로 per_page개씩 잘라 KeysetPagination을 반환합니다.
+
+    - after 커서가 있으면 그 행 다음(더 오래된) 페이지, before 커서가 있으면 그 행 이전(더 최신) 페이지를 조회합니다.
+    - WHERE 정렬 시각 <= 커서 AND (정렬 시각 < 커서 OR id < 커서 id) + LIMIT per_page+1 한 번으로 끝나므로
+      정렬 컬럼 인덱스 범위 탐색이 가능하고 몇 번째 페이지든 비용이 첫 페이지와 같습니다.
+    - query의 기존 ORDER BY는 무시합니다. sort_column은 NULL이 없는 컬럼이어야 합니다.
+    - sort_column과 id_column이 같은 컬럼이면(고유 정수 키) 그 컬럼 하나로만 비교합니다.
+    - 정렬 컬럼이 항목의 속성이 아니면 cursor_values(item) -> (정렬 값, id)를 전달합니다.
+    - SQLite는 시각을 TEXT로 저장하고 ORDER BY/비교도 문자열로 하므로, 커서에 저장된 문자열을 그대로 담아 비교합니다.
+      (예전 행의 '2025-09-12 14:57:37'과 바인딩된 datetime의 '2025-09-12 14:57:37.000000'은 문자열로는
+      서로 다른 값이라, datetime으로 비교하면 같은 초의 행이 다음 페이지에 반복되거나 이전 페이지에서 빠짐)"""
+    from apps.extensions import db
+    query = first_page_query = query.order_by(None)
+    before_key = decode_cursor(before)
+    after_key = None if before_key else decode_cursor(after)
+    # SQLite: 정렬 컬럼을 저장된 문자열 그대로 조회/비교 (SQL은 같으므로 인덱스 사용에는 영향 없음)
+    stored_text = sort_column is not id_column and cursor_values is None and db.engine.dialect.name == 'sqlite'
+    compare_column = type_coerce(sort_column, String) if stored_text else sort_column
+    if stored_text:
+        query = query.add_columns(compare_column)
+
+    def bound(sort_value):
+        if isinstance(sort_value, int):
+            return sort_value
+        if not stored_text:
+            return datetime.fromisoformat(sort_value)
+        if 'T' in sort_value:   # 이전 형식(isoformat) 커서: SQLite 저장 형식으로 변환
+            return str(datetime.fromisoformat(sort_value))
+        return sort_value
+
+    def order_by(asc):
+        columns = [sort_column] if sort_column is id_column else [sort_column, id_column]
+        return [column.asc() if asc else column.desc() for column in columns]
+
+    if before_key is not None:
+        sort_value, row_id = bound(before_key[0]), before_key[1]
+        if sort_column is id_column:
+            query = query.filter(sort_column > sort_value)
+        else:
+            query = query.filter(compare_column >= sort_value, or_(compare_column > sort_value, id_column > row_id))
+        rows = query.order_by(*order_by(asc=True)).limit(per_page + 1).all()
+        if len(rows) <= per_page:
+            # 맨 앞에 도달: 첫 페이지를 그대로 보여 줌 (그 사이 삭제된 행이 있어도 per_page개 유지)
+            return keyset_paginate(first_page_query, sort_column, id_column, per_page=per_page,
+                                   cursor_values=cursor_values)
+        page = rows[:per_page][::-1]
+        has_next, has_prev = True, True
+    else:
+        if after_key is not None:
+            sort_value, row_id = bound(after_key[0]), after_key[1]
+            if sort_column is id_column:
+                query = query.filter(sort_column < sort_value)
+            else:
+                query = query.filter(compare_column <= sort_value, or_(compare_column < sort_value, id_column < row_id))
+        rows = query.order_by(*order_by(asc=False)).limit(per_page + 1).all()
+        page = rows[:per_page]
+        has_next, has_prev = len(rows) > per_page, after_key is not None
+
+    def cursor(row):
+        if stored_text:   # (항목, 저장된 정렬 문자열)
+            return encode_cursor(row[1], getattr(row[0], id_column.key))
+        if cursor_values is not None:
+            return encode_cursor(*cursor_values(row))
+        return encode_cursor(getattr(row, sort_column.key), getattr(row, id_column.key))
+
+    return KeysetPagination(
+        [row[0] for row in page] if stored_text else page, per_page, has_next=has_next, has_prev=has_prev,
+        next_cursor=cursor(page[-1]) if has_next and page else None,
+        prev_cursor=cursor(page[0]) if has_prev and page else None,
+    )
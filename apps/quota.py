@@ -0,0 +1,198 @@
+# apps/quota.py
+# API 일/월 사용량 쿼터 (요청마다 usage_logs COUNT(*) 없이 메모리 카운터로 O(1) 확인)
+import atexit, logging, math, threading
+from collections import namedtuple
+from datetime import datetime, timedelta, time as dtime
+from sqlalchemy import and_, select, update
+from sqlalchemy.exc import IntegrityError
+
+logger = logging.getLogger(__name__)
+
+QuotaDecision = namedtuple('QuotaDecision', ['allowed', 'scope', 'limit', 'remaining', 'retry_after'])
+
+class _Counter:
+    __slots__ = ('period_start', 'base', 'delta')
+
+    def __init__(self, period_start, base):
+        self.period_start = period_start
+        self.base = base    # 마지막 체크포인트 시점의 DB 합계 (다른 프로세스 사용량 포함)
+        self.delta = 0      # 이 프로세스에서 체크포인트 이후 사용한 양
+
+class QuotaManager:
+    """API Key별/사용자별 일·월 사용량을 메모리 카운터로 관리합니다.
+
+    - 카운터는 (대상, 기간)별 최초 요청 시 quota_counters 체크포인트에서, 없으면 usage_rollups 일별 집계에서 1회 계산합니다.
+    - consume()은 메모리에서만 확인/증가하며 한도 초과 시 다음 기간 시작까지의 retry_after(초)를 반환합니다.
+    - 백그라운드 스레드가 QUOTA_CHECKPOINT_SECONDS마다 증가분을 quota_counters에 더하고(count = count + delta)
+      DB 합계를 다시 읽어 다른 워커 프로세스의 사용량을 반영합니다. 종료 시(atexit)에도 체크포인트합니다."""
+
+    def __init__(self, app=None):
+        self.app = None
+        self.enabled = True
+        self.checkpoint_interval = 30
+        self._counters = {}   # (subject_type, subject_id, period) -> _Counter
+        self._retired = []    # 기간이 바뀌어 교체된 카운터 중 아직 체크포인트하지 않은 것
+        self._lock = threading.Lock()
+        self._checkpoint_lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.enabled = app.config.get('QUOTA_ENABLED', True)
+        self.checkpoint_interval = app.config.get('QUOTA_CHECKPOINT_SECONDS', 30)
+        app.extensions['quota_manager'] = self
+        atexit.register(self.stop)
+
+    # ---------- 확인/차감 ----------
+    def consume(self, identity, cost=1, now=None):
+        """identity(APIKeyIdentity)의 키/사용자 일·월 한도를 확인하고 허용되면 cost만큼 차감합니다."""
+        if not self.enabled:
+            return QuotaDecision(True, None, None, None, 0)
+        now = now or datetime.now()
+        starts = {'day': now.date(), 'month': now.date().replace(day=1)}
+        checks = [(subject_type, subject_id, period, limit) for subject_type, subject_id, period, limit in (
+            ('api_key', identity.id, 'day', identity.daily_limit),
+            ('api_key', identity.id, 'month', identity.monthly_limit),
+            ('user', identity.user_id, 'day', identity.user_daily_limit),
+            ('user', identity.user_id, 'month', identity.user_monthly_limit),
+        ) if limit is not None]
+        counters = [self._get_counter(subject_type, subject_id, period, starts[period])
+                    for subject_type, subject_id, period, _ in checks]
+        with self._lock:
+            remaining = None
+            for (subject_type, _, period, limit), counter in zip(checks, counters):
+                used = counter.base + counter.delta
+                if used + cost > limit:
+                    return QuotaDecision(False, f'{subject_type}_{period}', limit, max(0, limit - used),
+                                         self._retry_after(period, now))
+                remaining = limit - used - cost if remaining is None else min(remaining, limit - used - cost)
+            for counter in counters:
+                counter.delta += cost
+        self._ensure_started()
+        return QuotaDecision(True, None, None, remaining, 0)
+
+    @staticmethod
+    def _retry_after(period, now):
+        next_day = datetime.combine(now.date() + timedelta(days=1), dtime.min)
+        if period == 'day':
+            reset_at = next_day
+        else:
+            first = now.date().replace(day=1)
+            reset_at = datetime.combine((first + timedelta(days=32)).replace(day=1), dtime.min)
+        return max(1, math.ceil((reset_at - now).total_seconds()))
+
+    def _get_counter(self, subject_type, subject_id, period, period_start):
+        key = (subject_type, subject_id, period)
+        counter = self._counters.get(key)
+        if counter is not None and counter.period_start == period_start:
+            return counter
+        base = self._seed(subject_type, subject_id, period, period_start)
+        with self._lock:
+            counter = self._counters.get(key)   # 다른 스레드가 먼저 설치했으면 그 카운터 사용
+            if counter is None or counter.period_start != period_start:
+                if counter is not None and counter.delta:
+                    self._retired.append((key, counter))
+                counter = self._counters[key] = _Counter(period_start, base)
+            return counter
+
+    @staticmethod
+    def _seed(subject_type, subject_id, period, period_start):
+        from apps.extensions import db
+        from apps.dbmodels import QuotaCounter, UsageType
+        from apps.usage_rollup import usage_rollup
+        count = db.session.execute(
+            select(QuotaCounter.count).filter_by(subject_type=subject_type, subject_id=subject_id,
+                                                 period=period, period_start=period_start)
+        ).scalar()
+        if count is not None:
+            return count
+        # 체크포인트가 없으면 사용량 일별 집계(usage_rollups)에서 기간 합계 계산
+        subject = {'api_key_id' if subject_type == 'api_key' else 'user_id': subject_id}
+        return usage_rollup.log_count(start=period_start, usage_type=UsageType.API_KEY, **subject)
+
+    # ---------- 체크포인트 ----------
+    def _ensure_started(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._stop.clear()
+                    self._thread = threading.Thread(target=self._run, name='quota-checkpoint', daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.checkpoint_interval):
+            try:
+                self.checkpoint()
+            except Exception as e:
+                logger.error("Quota checkpoint failed: %s", e, exc_info=True)
+
+    def checkpoint(self):
+        """증가분을 quota_counters에 더하고, DB 합계로 각 카운터의 base를 갱신합니다."""
+        with self._checkpoint_lock:
+            return self._checkpoint()
+
+    def _checkpoint(self):
+        from apps.extensions import db
+        from apps.dbmodels import QuotaCounter
+        with self._lock:
+            pending = [(key, counter, counter.delta) for key, counter in self._counters.items() if counter.delta]
+            retired, self._retired = self._retired, []
+            pending += [(key, counter, counter.delta) for key, counter in retired]
+            current = list(self._counters.items())
+        if not current and not pending:
+            return 0
+        try:
+            totals = self._write_checkpoint(db, QuotaCounter.__table__, pending, current)
+        except Exception:
+            with self._lock:
+                self._retired.extend(retired)   # 다음 체크포인트에서 다시 시도
+            raise
+        with self._lock:
+            for _, counter, delta in pending:
+                counter.delta -= delta
+            for key, counter in current:
+                total = totals.get(key + (counter.period_start,))
+                if total is not None:
+                    counter.base = total
+        return len(pending)
+
+    def _write_checkpoint(self, db, table, pending, current):
+        now = datetime.now()
+        with self.app.app_context(), db.engine.begin() as connection:
+            for (subject_type, subject_id, period), counter, delta in pending:
+                where = and_(table.c.subject_type == subject_type, table.c.subject_id == subject_id,
+                             table.c.period == period, table.c.period_start == counter.period_start)
+                values = {'count': table.c.count + delta, 'updated_at': now}
+                if connection.execute(update(table).where(where).values(**values)).rowcount:
+                    continue
+                try:
+                    with connection.begin_nested():
+                        connection.execute(table.insert().values(
+                            subject_type=subject_type, subject_id=subject_id, period=period,
+                            period_start=counter.period_start, count=counter.base + delta, updated_at=now))
+                except IntegrityError:   # 다른 프로세스가 먼저 행을 생성
+                    connection.execute(update(table).where(where).values(**values))
+            # 현재 기간의 전체 합계 (다른 프로세스 사용량 포함)
+            period_starts = {counter.period_start for _, counter in current}
+            rows = connection.execute(
+                select(table.c.subject_type, table.c.subject_id, table.c.period, table.c.period_start, table.c.count)
+                .where(table.c.period_start.in_(period_starts))
+            ).fetchall() if period_starts else []
+        return {(row.subject_type, row.subject_id, row.period, row.period_start): row.count for row in rows}
+
+    def stop(self):
+        """체크포인트 스레드를 종료하고 남은 증가분을 기록합니다."""
+        if self._thread is not None and self._thread.is_alive():
+            self._stop.set()
+            self._thread.join()
+        self._thread = None
+        if self.app is not None:
+            try:
+                self.checkpoint()
+            except Exception as e:
+                logger.error("Quota checkpoint at exit failed: %s", e, exc_info=True)
+
+quota_manager = QuotaManager()   # create_app()에서 init_app
@@ -0,0 +1,16 @@
+# apps/trigram.py
+# SQLite FTS5(trigram) 검색 공통 도우미 (apps/log_search.py, apps/user_search.py)
+from sqlalchemy import text
+
+TRIGRAM_MIN_LENGTH = 3   # trigram 토크나이저는 3글자 미만 검색어를 찾지 못함
+
+def match_expression(keyword):
+    """검색어 전체를 하나의 구문(phrase)으로 찾는 FTS5 MATCH 식"""
+    return '"' + keyword.strip().replace('"', '""') + '"'
+
+def fts_table_exists(name):
+    """SQLite에 FTS 테이블 name이 있으면 True ('flask db upgrade'로 생성, 그 외 DB는 항상 False)"""
+    from apps.extensions import db
+    return db.engine.dialect.name == 'sqlite' and db.session.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {'name': name}
+    ).scalar() is not None
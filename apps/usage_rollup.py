@@ -0,0 +1,109 @@
+# apps/usage_rollup.py
+# 사용량 일별 집계(usage_rollups): UsageLog 기록 시 증분 갱신, 통계/쿼터/과금 조회는 usage_logs 대신 집계 행을 읽음
+from datetime import datetime, time as dtime
+from sqlalchemy import Date, DateTime, and_, cast, delete, func, insert, literal, select, update
+from sqlalchemy.exc import IntegrityError
+
+ROLLUP_KEYS = ('day', 'user_id', 'service_id', 'api_key_id', 'usage_type', 'log_status')
+
+class UsageRollupManager:
+    """usage_rollups를 (일, 사용자, 서비스, API Key, 사용 유형, 로그 상태)별 log_count/usage_count 합계로 유지합니다.
+
+    - usage_writer의 flush 리스너로 등록되어 UsageLog insert와 같은 트랜잭션에서 증가분을 더합니다
+      (count = count + n, 행이 없으면 insert). 따라서 usage_logs와 집계는 함께 커밋되거나 함께 롤백됩니다.
+    - 사용자/API Key가 없는 로그는 0으로 집계합니다 (NULL은 고유 키 비교가 되지 않으므로).
+    - usage_logs 행이 삭제되어도 집계는 줄지 않습니다 (사용 이력 보존). 다시 맞추려면 rebuild()를 사용합니다."""
+
+    def __init__(self, app=None):
+        self.app = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        from apps.usage_writer import usage_writer
+        self.app = app
+        usage_writer.add_flush_listener(self.apply)
+        app.extensions['usage_rollup'] = self
+
+    # ---------- 증분 갱신 ----------
+    @staticmethod
+    def _key(record):
+        return (record['timestamp'].date(), record.get('user_id') or 0, record['service_id'],
+                record.get('api_key_id') or 0, record['usage_type'], record.get('log_status') or '추론')
+
+    def apply(self, connection, records):
+        """UsageLog 레코드(dict)들을 집계 키별로 합산하여 usage_rollups에 더합니다."""
+        from apps.dbmodels import UsageRollup
+        table = UsageRollup.__table__
+        totals = {}
+        for record in records:
+            key = self._key(record)
+            log_count, usage_count = totals.get(key, (0, 0))
+            totals[key] = (log_count + 1, usage_count + (record.get('usage_count') or 1))
+        now = datetime.now()
+        for key, (log_count, usage_count) in totals.items():
+            where = and_(*(table.c[name] == value for name, value in zip(ROLLUP_KEYS, key)))
+            values = {'log_count': table.c.log_count + log_count, 'usage_count': table.c.usage_count + usage_count,
+                      'updated_at': now}
+            if connection.execute(update(table).where(where).values(**values)).rowcount:
+                continue
+            try:
+                with connection.begin_nested():
+                    connection.execute(insert(table).values(**dict(zip(ROLLUP_KEYS, key)), log_count=log_count,
+                                                            usage_count=usage_count, updated_at=now))
+            except IntegrityError:   # 다른 프로세스가 먼저 행을 생성
+                connection.execute(update(table).where(where).values(**values))
+
+    # ---------- 조회 ----------
+    @staticmethod
+    def _filtered(query, start, end, filters):
+        from apps.dbmodels import UsageRollup
+        query = query.where(*(getattr(UsageRollup, name) == value for name, value in filters.items()))
+        if start is not None:
+            query = query.where(UsageRollup.day >= start)
+        if end is not None:
+            query = query.where(UsageRollup.day <= end)
+        return query
+
+    def summary(self, start=None, end=None, group_by=('day',), **filters):
+        """[start, end] 기간(일 단위, 양끝 포함)의 group_by 컬럼별 log_count/usage_count 합계 행 목록
+
+        filters는 집계 키 컬럼 == 값 조건입니다 (예: user_id=1, usage_type=UsageType.API_KEY)."""
+        from apps.extensions import db
+        from apps.dbmodels import UsageRollup
+        columns = [getattr(UsageRollup, name) for name in group_by]
+        query = select(*columns, func.sum(UsageRollup.log_count).label('log_count'),
+                       func.sum(UsageRollup.usage_count).label('usage_count')).select_from(UsageRollup)
+        query = self._filtered(query, start, end, filters).group_by(*columns).order_by(*columns)
+        return db.session.execute(query).all()
+
+    def log_count(self, start=None, end=None, **filters):
+        """[start, end] 기간의 usage_logs 행 수 합계"""
+        from apps.extensions import db
+        from apps.dbmodels import UsageRollup
+        query = self._filtered(select(func.sum(UsageRollup.log_count)), start, end, filters)
+        return db.session.execute(query).scalar() or 0
+
+    # ---------- 재집계 ----------
+    def rebuild(self, connection, since=None):
+        """usage_logs에서 since(date) 이후 일자(없으면 전체)를 다시 집계합니다. 생성한 집계 행 수를 반환합니다."""
+        from apps.dbmodels import UsageLog, UsageRollup
+        logs, table = UsageLog.__table__, UsageRollup.__table__
+        # SQLite의 CAST(... AS DATE)는 숫자로 변환되므로 date() 사용
+        day = func.date(logs.c.timestamp) if connection.dialect.name == 'sqlite' else cast(logs.c.timestamp, Date)
+        keys = [day, func.coalesce(logs.c.user_id, 0), logs.c.service_id, func.coalesce(logs.c.api_key_id, 0),
+                logs.c.usage_type, logs.c.log_status]
+        query = select(*keys, func.count(), func.sum(logs.c.usage_count), literal(datetime.now(), DateTime)) \
+            .where(logs.c.timestamp.isnot(None)).group_by(*keys)
+        if since is not None:
+            if isinstance(since, datetime):
+                since = since.date()
+            query = query.where(logs.c.timestamp >= datetime.combine(since, dtime.min))
+            connection.execute(delete(table).where(table.c.day >= since))
+        else:
+            connection.execute(delete(table))
+        result = connection.execute(insert(table).from_select(
+            list(ROLLUP_KEYS) + ['log_count', 'usage_count', 'updated_at'], query))
+        return result.rowcount
+
+usage_rollup = UsageRollupManager()   # create_app()에서 init_app
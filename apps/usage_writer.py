@@ -0,0 +1,345 @@
+# apps/usage_writer.py
+# UsageLog 비동기 일괄 기록기 (요청 처리 중 UsageLog 커밋/fsync 제거)
+import atexit, enum, glob, json, logging, os, queue, threading, time, uuid
+from collections import deque
+from datetime import datetime
+from sqlalchemy import DateTime, Enum, insert
+from sqlalchemy.exc import DataError, IntegrityError
+from apps.dbmodels import UsageLog
+
+try:   # 저널 파일 잠금 (Windows에는 fcntl이 없으므로 잠금 없이 동작)
+    import fcntl
+except ImportError:
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+_STOP = object()
+
+class UsageLogWriter:
+    """UsageLog 레코드를 제한된 크기의 큐로 받아 백그라운드 스레드에서
+    USAGE_LOG_FLUSH_ROWS건 또는 USAGE_LOG_FLUSH_MS 밀리초마다 bulk insert로 기록합니다.
+
+    - 호출자는 참조하는 PredictionResult를 커밋한 뒤 submit()합니다 (UsageLog는 별도 트랜잭션으로 기록).
+    - USAGE_LOG_ASYNC=False이면 요청 스레드에서 즉시 insert합니다 (테스트/단일 프로세스 디버깅용).
+    - USAGE_LOG_JOURNAL_DIR을 지정하면 큐에 넣기 전에 프로세스별 저널 파일에 기록하고,
+      flush 시 저널을 교체(rotate)한 뒤 커밋이 끝나면 삭제합니다. 비정상 종료로 남은 저널은
+      다음 기동 시 다시 기록되며, 재기록에 실패하면 파일을 남겨 두고 재시도 간격마다 다시 시도합니다.
+    - 기록에 실패한 묶음(예: database is locked)은 버리지 않고 메모리에 보관한 채 지수 백오프
+      (USAGE_LOG_FLUSH_MS부터 USAGE_LOG_RETRY_MAX_MS까지)로 순서대로 다시 기록합니다.
+      보관 건수가 USAGE_LOG_RETRY_ROWS를 넘으면 가장 오래된 묶음부터 오류 로그를 남기고 버립니다
+      (저널을 쓰는 경우 저널 파일은 남아 다음 기동 시 재기록).
+    - 프로세스 종료 시(atexit) 남은 레코드를 모두 기록한 뒤 종료합니다."""
+
+    def __init__(self, app=None):
+        self.app = None
+        self._queue = None
+        self._thread = None
+        self._lock = threading.Lock()          # 큐 적재 + 저널 기록을 원자적으로 처리
+        self._journal = None
+        self._journal_path = None
+        self._journal_seq = 0
+        self._flush_listeners = []
+        self._write_lock = threading.Lock()    # 실패 묶음 보관/재시도 (백그라운드 스레드와 flush() 호출 간)
+        self._batches = deque()                # 기록 대기 묶음 [(records, flushing_journal)] (실패 시 보관)
+        self._batch_rows = 0
+        self._retry_at = 0.0
+        self._retry_delay = 0.0
+        self._replay_at = None                 # 남은 저널 재기록을 다시 시도할 시각 (실패 시)
+        self._replay_delay = 0.0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.async_enabled = app.config.get('USAGE_LOG_ASYNC', True)
+        self.flush_rows = app.config.get('USAGE_LOG_FLUSH_ROWS', 100)
+        self.flush_interval = app.config.get('USAGE_LOG_FLUSH_MS', 200) / 1000.0
+        self.journal_dir = app.config.get('USAGE_LOG_JOURNAL_DIR')
+        self._queue = queue.Queue(maxsize=app.config.get('USAGE_LOG_QUEUE_SIZE', 10000))
+        self.retry_max = app.config.get('USAGE_LOG_RETRY_MAX_MS', 30000) / 1000.0
+        self.retry_rows = app.config.get('USAGE_LOG_RETRY_ROWS', self._queue.maxsize)
+        app.extensions['usage_writer'] = self
+        atexit.register(self.stop)
+
+    def add_flush_listener(self, listener):
+        """listener(connection, records)는 UsageLog insert와 같은 트랜잭션 안에서 호출됩니다."""
+        if listener not in self._flush_listeners:   # create_app()이 여러 번 호출되어도 한 번만 등록
+            self._flush_listeners.append(listener)
+
+    # ---------- 기록 요청 ----------
+    def submit(self, **fields):
+        """UsageLog 한 건을 기록합니다. 필드는 UsageLog 생성자와 동일합니다."""
+        self.submit_many([fields])
+
+    def submit_many(self, records):
+        records = [self._prepare(dict(fields)) for fields in records]
+        if not self.async_enabled:
+            self._insert(records)
+            return
+        self._ensure_started()
+        overflow = []
+        with self._lock:
+            for fields in records:
+                try:
+                    self._queue.put_nowait(fields)
+                except queue.Full:
+                    overflow.append(fields)
+                    continue
+                self._append_journal(fields)
+        if overflow:
+            # 큐가 가득 찬 경우 요청 스레드에서 직접 기록 (역압)
+            logger.warning("UsageLog queue is full; writing %d record(s) synchronously.", len(overflow))
+            self._insert(overflow)
+
+    @staticmethod
+    def _prepare(fields):
+        now = datetime.now()
+        fields.setdefault('timestamp', now)    # 모델 default(datetime.now())는 import 시각으로 고정되므로 명시
+        fields.setdefault('last_used', now)
+        fields.setdefault('usage_count', 1)
+        fields.setdefault('log_status', '추론')
+        return fields
+
+    # ---------- 백그라운드 기록 ----------
+    def _ensure_started(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._open_journal()
+                    self._thread = threading.Thread(target=self._run, name='usage-log-writer', daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        with self.app.app_context():
+            self._replay()
+            pending, first_at = [], None
+            while True:
+                timeout = self.flush_interval if first_at is None else max(0.0, first_at + self.flush_interval - time.monotonic())
+                if self._batches:   # 실패한 묶음의 재시도 시각
+                    timeout = min(timeout, max(0.0, self._retry_at - time.monotonic()))
+                if self._replay_at is not None:
+                    timeout = min(timeout, max(0.0, self._replay_at - time.monotonic()))
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    item = None
+                if item is _STOP:
+                    self._flush(pending, force=True)
+                    self._drop_batches(keep_rows=0)
+                    return
+                if item is not None:
+                    pending.append(item)
+                    first_at = first_at or time.monotonic()
+                if pending and (len(pending) >= self.flush_rows or time.monotonic() - first_at >= self.flush_interval):
+                    self._flush(pending)
+                    pending, first_at = [], None
+                elif self._batches and time.monotonic() >= self._retry_at:
+                    self._flush([])
+                if self._replay_at is not None and time.monotonic() >= self._replay_at:
+                    self._replay()
+
+    def _replay(self):
+        """replay_journals()를 실행하고, 실패하면 스레드를 멈추지 않고 지수 백오프로 재시도 시각을 정합니다."""
+        try:
+            self.replay_journals()
+        except Exception as e:
+            self._replay_delay = min(self.retry_max, max(self.flush_interval, self._replay_delay * 2))
+            self._replay_at = time.monotonic() + self._replay_delay
+            logger.error("Failed to replay UsageLog journals; retrying in %.1fs: %s", self._replay_delay, e, exc_info=True)
+        else:
+            self._replay_at, self._replay_delay = None, 0.0
+
+    def _flush(self, pending, force=False):
+        # 큐에 남은 레코드까지 모두 가져오고 저널을 교체: 교체된 저널 = 이번에 기록할 레코드
+        with self._lock:
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not _STOP:
+                    pending.append(item)
+            flushing_journal = self._rotate_journal() if pending else None
+        with self._write_lock:
+            if pending:
+                self._batches.append((pending, flushing_journal))
+                self._batch_rows += len(pending)
+            if self._batches and (force or time.monotonic() >= self._retry_at):
+                self._write_batches()
+            self._drop_batches(keep_rows=self.retry_rows)
+
+    def _write_batches(self):
+        """보관 중인 묶음을 순서대로 기록합니다. 실패하면 그 묶음부터 남겨 두고 다음 재시도 시각을 정합니다."""
+        while self._batches:
+            records, flushing_journal = self._batches[0]
+            size = len(records)
+            try:
+                self._write_records(records)
+            except Exception as e:
+                self._batch_rows -= size - len(records)   # 한 건씩 기록하다 중단된 경우 이미 처리한 레코드
+                self._retry_delay = min(self.retry_max, max(self.flush_interval, self._retry_delay * 2))
+                self._retry_at = time.monotonic() + self._retry_delay
+                logger.error("Failed to write %d UsageLog record(s); retrying in %.1fs (%d record(s) pending): %s",
+                             len(records), self._retry_delay, self._batch_rows, e, exc_info=True)
+                return
+            self._batches.popleft()
+            self._batch_rows -= size
+            if flushing_journal:
+                path, handle = flushing_journal
+                os.remove(path)
+                handle.close()
+        self._retry_delay, self._retry_at = 0.0, 0.0
+
+    def _write_records(self, records):
+        """records를 한 번에 기록하고, 제약 조건/값 오류가 나면 한 건씩 기록합니다.
+        그 밖의 오류는 그대로 전달하며, 이때 records에는 아직 기록하지 않은 레코드만 남습니다."""
+        try:
+            self._insert(records)
+        except (IntegrityError, DataError):
+            self._insert_each(records)   # 재시도해도 기록할 수 없는 레코드가 섞인 묶음
+
+    def _insert_each(self, records):
+        """한 건씩 기록하고 제약 조건/값 오류로 기록할 수 없는 레코드만 버립니다.
+        그 밖의 오류로 중단되면 아직 기록하지 않은 레코드만 records에 남깁니다 (재시도 대상)."""
+        while records:
+            try:
+                self._insert(records[:1])
+            except (IntegrityError, DataError) as e:
+                logger.error("Dropped invalid UsageLog record %r: %s", records[0], e)
+            del records[0]
+
+    def _drop_batches(self, keep_rows):
+        """보관 건수가 keep_rows 이하가 될 때까지 가장 오래된 묶음을 버립니다 (보관 한도 초과, 종료 시 기록 실패)."""
+        while self._batches and self._batch_rows > keep_rows:
+            records, flushing_journal = self._batches.popleft()
+            self._batch_rows -= len(records)
+            if flushing_journal:
+                flushing_journal[1].close()   # 저널은 남겨 두고 다음 기동 시 재기록
+                logger.error("Gave up writing %d UsageLog record(s); kept in journal %s for replay.",
+                             len(records), flushing_journal[0])
+            else:
+                logger.error("Dropped %d UsageLog record(s) after repeated write failures.", len(records))
+
+    def _insert(self, records):
+        from apps.extensions import db
+        with db.engine.begin() as connection:
+            connection.execute(insert(UsageLog), records)
+            for listener in self._flush_listeners:
+                listener(connection, records)
+
+    def flush(self):
+        """대기 중인 레코드를 즉시 기록합니다 (백그라운드 스레드가 없는 경우 포함)."""
+        if self._queue is None:
+            return
+        with self.app.app_context():
+            self._flush([], force=True)
+
+    def stop(self):
+        """남은 레코드를 모두 기록하고 백그라운드 스레드를 종료합니다."""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+        self._thread = None
+        if self._journal is not None:
+            self._journal.close()
+            if os.path.exists(self._journal_path) and os.path.getsize(self._journal_path) == 0:
+                os.remove(self._journal_path)
+            self._journal = None
+
+    # ---------- 저널 ----------
+    def _open_journal(self):
+        if not self.journal_dir or self._journal is not None:
+            return
+        os.makedirs(self.journal_dir, exist_ok=True)
+        # PID는 재시작한 프로세스가 다시 받을 수 있으므로(컨테이너 등) 기동마다 고유한 이름을 사용:
+        # 같은 PID의 이전 프로세스가 남긴 저널에 이어 쓰지 않고 replay_journals()가 재기록하도록 함
+        self._journal_path = os.path.join(self.journal_dir, f'usage_logs.{os.getpid()}-{uuid.uuid4().hex}.journal')
+        self._journal = self._lock_file(open(self._journal_path, 'a', encoding='utf-8'))
+
+    @staticmethod
+    def _lock_file(handle):
+        if fcntl is not None:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return handle
+
+    def _append_journal(self, fields):
+        if self._journal is None:
+            return
+        self._journal.write(json.dumps(self._serialize(fields), ensure_ascii=False) + '\n')
+        self._journal.flush()
+
+    def _rotate_journal(self):
+        if self._journal is None:
+            return None
+        self._journal_seq += 1
+        flushing_path = f'{self._journal_path}.{self._journal_seq}.flushing'
+        os.rename(self._journal_path, flushing_path)   # 열린 파일의 잠금은 rename 후에도 유지
+        handle = self._journal
+        self._journal = self._lock_file(open(self._journal_path, 'a', encoding='utf-8'))
+        return flushing_path, handle
+
+    def replay_journals(self):
+        """다른(종료된) 프로세스가 남긴 저널을 다시 기록하고 삭제합니다. 사용 중인 저널은 잠금으로 건너뜁니다.
+        기록할 수 없는 레코드는 버리고, 그 밖의 오류(예: database is locked)로 중단되면 아직 기록하지 않은
+        레코드만 저널에 다시 써서 남겨 둔 뒤 예외를 전달합니다."""
+        if not self.journal_dir or not os.path.isdir(self.journal_dir):
+            return 0
+        replayed = 0
+        for path in sorted(glob.glob(os.path.join(self.journal_dir, 'usage_logs.*.journal*'))):
+            if path == self._journal_path:
+                continue
+            handle = open(path, 'r+', encoding='utf-8')
+            try:
+                self._lock_file(handle)
+            except OSError:
+                handle.close()
+                continue   # 실행 중인 다른 프로세스의 저널
+            with handle:
+                records = []
+                for line in handle:
+                    try:
+                        records.append(self._deserialize(json.loads(line)))
+                    except ValueError:
+                        continue   # 기록 도중 종료되어 잘린 마지막 줄
+                size = len(records)
+                try:
+                    self._write_records(records)
+                except Exception:
+                    if len(records) < size:   # 일부만 기록된 경우 중복 기록을 막기 위해 남은 레코드로 교체
+                        handle.seek(0)
+                        handle.truncate()
+                        handle.writelines(json.dumps(self._serialize(fields), ensure_ascii=False) + '\n'
+                                          for fields in records)
+                        handle.flush()
+                    raise
+                os.remove(path)
+            replayed += size
+        if replayed:
+            logger.warning("Replayed %d UsageLog record(s) from journal.", replayed)
+        return replayed
+
+    @staticmethod
+    def _serialize(fields):
+        serialized = {}
+        for key, value in fields.items():
+            if isinstance(value, datetime):
+                value = value.isoformat()
+            elif isinstance(value, enum.Enum):
+                value = value.name
+            serialized[key] = value
+        return serialized
+
+    @staticmethod
+    def _deserialize(data):
+        columns = UsageLog.__table__.columns
+        for key, value in data.items():
+            if value is None or key not in columns:
+                continue
+            column_type = columns[key].type
+            if isinstance(column_type, DateTime):
+                data[key] = datetime.fromisoformat(value)
+            elif isinstance(column_type, Enum) and column_type.enum_class is not None:
+                data[key] = column_type.enum_class[value]
+        return data
+
+usage_writer = UsageLogWriter()   # create_app()에서 init_app
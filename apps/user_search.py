@@ -0,0 +1,84 @@
+# apps/user_search.py
+# 사용자 ID/이름/이메일 부분 문자열 검색: SQLite FTS5(trigram) 인덱스 users_fts 사용, 없으면 ilike 검색
+import threading
+from sqlalchemy import String, cast, column, literal_column, or_, select, table, text
+from apps.trigram import TRIGRAM_MIN_LENGTH, fts_table_exists, match_expression
+
+users_fts = table('users_fts', column('rowid'))
+
+# users_fts 컬럼 (migrations/versions/*_add_users_fts_search_index.py의 트리거와 동일)
+FTS_COLUMNS = ('user_id', 'username', 'email')
+
+class UserSearch:
+    """사용자 식별 필드(ID/이름/이메일) 키워드 검색 조건을 만듭니다. 관리자 사용자 목록과 매칭 관리 화면이 함께 사용합니다.
+
+    - id_filter(id_column, keyword)는 id_column IN (키워드와 일치하는 users.id) 조건을 반환하므로
+      users 테이블뿐 아니라 matches.user_id/expert_id처럼 사용자를 가리키는 어떤 컬럼에도 걸 수 있습니다.
+    - users_fts가 있으면(SQLite, 'flask db upgrade' 적용) users_fts MATCH ?로 일치 ID를 인덱스에서 찾습니다.
+      users 트리거로 동기화되며 trigram 토크나이저라 기존 ilike와 같은 부분 문자열(대소문자 무시) 검색입니다.
+    - users_fts가 없거나 검색어가 3글자 미만이면 SELECT id FROM users WHERE ... ilike('%...%') 서브쿼리를 사용합니다.
+    - user_filter()는 users 목록용 조건입니다. 일치 ID가 USER_SEARCH_BROAD_LIMIT개 이하이면 그 ID 목록으로 조회하고,
+      더 많은 흔한 검색어는 정렬 순서대로 훑다가 LIMIT에서 바로 멈추는 ilike 조건이 더 빠르므로 ilike를 사용합니다."""
+
+    def __init__(self, app=None):
+        self.broad_limit = 1000
+        self._available = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.broad_limit = app.config.get('USER_SEARCH_BROAD_LIMIT', 1000)
+        self._available = None
+        app.extensions['user_search'] = self
+
+    def available(self):
+        """users_fts 테이블 존재 여부 (프로세스당 한 번 확인)"""
+        if self._available is None:
+            with self._lock:
+                if self._available is None:
+                    self._available = fts_table_exists('users_fts')
+        return self._available
+
+    def uses_index(self, keyword):
+        return bool(keyword) and len(keyword.strip()) >= TRIGRAM_MIN_LENGTH and self.available()
+
+    def matching_ids(self, keyword, fields=FTS_COLUMNS):
+        """keyword가 fields(user_id/username/email 중) 어디에든 포함된 users.id SELECT"""
+        from apps.dbmodels import User
+        if self.uses_index(keyword):
+            expression = match_expression(keyword)
+            if tuple(fields) != FTS_COLUMNS:
+                expression = '{' + ' '.join(fields) + '} : ' + expression   # FTS5 컬럼 필터
+            return select(users_fts.c.rowid).where(literal_column('users_fts').op('MATCH')(expression))
+        return select(User.id).where(self._ilike(keyword, fields))
+
+    @staticmethod
+    def _ilike(keyword, fields):
+        from apps.dbmodels import User
+        pattern = f"%{keyword.strip()}%"
+        columns = {'user_id': cast(User.id, String), 'username': User.username, 'email': User.email}
+        return or_(*(columns[field].ilike(pattern) for field in fields))
+
+    def id_filter(self, id_column, keyword, fields=FTS_COLUMNS):
+        """id_column이 keyword와 일치하는 사용자를 가리키는 행을 고르는 조건 (matches.user_id 등)"""
+        return id_column.in_(self.matching_ids(keyword, fields))
+
+    def user_filter(self, keyword, fields=FTS_COLUMNS):
+        """User 목록 쿼리용 keyword 조건"""
+        from apps.dbmodels import User
+        from apps.extensions import db
+        if self.uses_index(keyword):
+            user_ids = db.session.execute(self.matching_ids(keyword, fields).limit(self.broad_limit + 1)).scalars().all()
+            if len(user_ids) <= self.broad_limit:
+                return User.id.in_(user_ids)
+        return self._ilike(keyword, fields)
+
+    def rebuild(self, connection):
+        """users_fts 내용을 users에서 다시 채웁니다. 삽입한 행 수를 반환합니다."""
+        connection.execute(text("DELETE FROM users_fts"))
+        result = connection.execute(text(
+            f"INSERT INTO users_fts(rowid, {', '.join(FTS_COLUMNS)}) SELECT id, id, username, email FROM users"))
+        return result.rowcount
+
+user_search = UserSearch()   # create_app()에서 init_app
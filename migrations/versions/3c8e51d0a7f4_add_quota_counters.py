@@ -0,0 +1,37 @@
+"""Add quota_counters table for checkpointed API quota counters
+
+Revision ID: 3c8e51d0a7f4
+Revises: 9f27b2c4312b
+Create Date: 2026-10-18 11:20:14.603518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c8e51d0a7f4'
+down_revision = '9f27b2c4312b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # create_app()의 db.create_all()이 먼저 생성했을 수 있음
+    if 'quota_counters' in sa.inspect(op.get_bind()).get_table_names():
+        return
+    op.create_table('quota_counters',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('subject_type', sa.String(length=10), nullable=False),
+    sa.Column('subject_id', sa.Integer(), nullable=False),
+    sa.Column('period', sa.String(length=10), nullable=False),
+    sa.Column('period_start', sa.Date(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('subject_type', 'subject_id', 'period', 'period_start', name='uq_quota_counters_subject_period')
+    )
+
+
+def downgrade():
+    op.drop_table('quota_counters')
@@ -0,0 +1,42 @@
+"""Add composite indexes for result/log lists, latest-log lookup and expert matches
+
+Revision ID: 9f27b2c4312b
+Revises: f6bd1096be09
+Create Date: 2026-10-18 10:41:07.532910
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9f27b2c4312b'
+down_revision = 'f6bd1096be09'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('prediction_results', schema=None) as batch_op:
+        batch_op.create_index('ix_prediction_results_user_id_is_deleted_created_at', ['user_id', 'is_deleted', 'created_at'], unique=False)
+        batch_op.create_index('ix_prediction_results_is_deleted_created_at', ['is_deleted', 'created_at'], unique=False)
+
+    with op.batch_alter_table('usage_logs', schema=None) as batch_op:
+        batch_op.create_index('ix_usage_logs_prediction_result_id_timestamp', ['prediction_result_id', 'timestamp'], unique=False)
+        batch_op.create_index('ix_usage_logs_user_id_timestamp', ['user_id', 'timestamp'], unique=False)
+
+    with op.batch_alter_table('matches', schema=None) as batch_op:
+        batch_op.create_index('ix_matches_expert_id_status', ['expert_id', 'status'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('matches', schema=None) as batch_op:
+        batch_op.drop_index('ix_matches_expert_id_status')
+
+    with op.batch_alter_table('usage_logs', schema=None) as batch_op:
+        batch_op.drop_index('ix_usage_logs_user_id_timestamp')
+        batch_op.drop_index('ix_usage_logs_prediction_result_id_timestamp')
+
+    with op.batch_alter_table('prediction_results', schema=None) as batch_op:
+        batch_op.drop_index('ix_prediction_results_is_deleted_created_at')
+        batch_op.drop_index('ix_prediction_results_user_id_is_deleted_created_at')
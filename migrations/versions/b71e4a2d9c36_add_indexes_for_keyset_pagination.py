@@ -0,0 +1,32 @@
+"""Add indexes on users.created_at and match_logs.timestamp for keyset pagination
+
+Revision ID: b71e4a2d9c36
+Revises: 3c8e51d0a7f4
+Create Date: 2026-10-18 12:05:31.284117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b71e4a2d9c36'
+down_revision = '3c8e51d0a7f4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_users_created_at'), ['created_at'], unique=False)
+
+    with op.batch_alter_table('match_logs', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_match_logs_timestamp'), ['timestamp'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('match_logs', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_match_logs_timestamp'))
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_users_created_at'))
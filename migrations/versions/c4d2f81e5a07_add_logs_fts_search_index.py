@@ -0,0 +1,64 @@
+"""Add logs_fts FTS5 (trigram) search index over admin logs, kept in sync by triggers
+
+Revision ID: c4d2f81e5a07
+Revises: b71e4a2d9c36
+Create Date: 2026-10-18 12:40:52.117604
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4d2f81e5a07'
+down_revision = 'b71e4a2d9c36'
+branch_labels = None
+depends_on = None
+
+FTS_INSERT = """
+    INSERT INTO logs_fts(rowid, log_id, user_id, target_user_id, endpoint, log_title, log_summary, username)
+    VALUES (new.id, new.id, new.user_id, new.target_user_id, new.endpoint, new.log_title, new.log_summary,
+            (SELECT username FROM users WHERE id = new.user_id));
+"""
+
+
+def upgrade():
+    # FTS5는 SQLite 전용: 다른 DB에서는 apps/log_search.py가 ilike 검색을 사용
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    op.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS logs_fts USING fts5(
+            log_id, user_id, target_user_id, endpoint, log_title, log_summary, username,
+            tokenize = 'trigram'
+        )
+    """)
+    op.execute("DELETE FROM logs_fts")
+    op.execute("""
+        INSERT INTO logs_fts(rowid, log_id, user_id, target_user_id, endpoint, log_title, log_summary, username)
+        SELECT logs.id, logs.id, logs.user_id, logs.target_user_id, logs.endpoint, logs.log_title, logs.log_summary,
+               users.username
+        FROM logs LEFT JOIN users ON users.id = logs.user_id
+    """)
+    op.execute("CREATE TRIGGER IF NOT EXISTS logs_fts_ai AFTER INSERT ON logs BEGIN" + FTS_INSERT + "END")
+    op.execute("""
+        CREATE TRIGGER IF NOT EXISTS logs_fts_ad AFTER DELETE ON logs BEGIN
+            DELETE FROM logs_fts WHERE rowid = old.id;
+        END
+    """)
+    op.execute("CREATE TRIGGER IF NOT EXISTS logs_fts_au AFTER UPDATE ON logs BEGIN"
+               " DELETE FROM logs_fts WHERE rowid = old.id;" + FTS_INSERT + "END")
+    op.execute("""
+        CREATE TRIGGER IF NOT EXISTS logs_fts_users_au AFTER UPDATE OF username ON users BEGIN
+            UPDATE logs_fts SET username = new.username WHERE rowid IN (SELECT id FROM logs WHERE user_id = new.id);
+        END
+    """)
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    op.execute("DROP TRIGGER IF EXISTS logs_fts_users_au")
+    op.execute("DROP TRIGGER IF EXISTS logs_fts_au")
+    op.execute("DROP TRIGGER IF EXISTS logs_fts_ad")
+    op.execute("DROP TRIGGER IF EXISTS logs_fts_ai")
+    op.execute("DROP TABLE IF EXISTS logs_fts")
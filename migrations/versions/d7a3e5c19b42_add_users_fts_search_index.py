@@ -0,0 +1,57 @@
+"""Add users_fts FTS5 (trigram) search index over user id/username/email, kept in sync by triggers
+
+Revision ID: d7a3e5c19b42
+Revises: c4d2f81e5a07
+Create Date: 2026-10-18 14:05:31.402718
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd7a3e5c19b42'
+down_revision = 'c4d2f81e5a07'
+branch_labels = None
+depends_on = None
+
+FTS_INSERT = """
+    INSERT INTO users_fts(rowid, user_id, username, email) VALUES (new.id, new.id, new.username, new.email);
+"""
+
+
+def upgrade():
+    # 매칭 검색: matches.user_id IN (...) OR matches.expert_id IN (...)를 인덱스로 조회
+    with op.batch_alter_table('matches', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_matches_user_id'), ['user_id'], unique=False)
+
+    # FTS5는 SQLite 전용: 다른 DB에서는 apps/user_search.py가 ilike 검색을 사용
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    op.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS users_fts USING fts5(
+            user_id, username, email,
+            tokenize = 'trigram'
+        )
+    """)
+    op.execute("DELETE FROM users_fts")
+    op.execute("INSERT INTO users_fts(rowid, user_id, username, email) SELECT id, id, username, email FROM users")
+    op.execute("CREATE TRIGGER IF NOT EXISTS users_fts_ai AFTER INSERT ON users BEGIN" + FTS_INSERT + "END")
+    op.execute("""
+        CREATE TRIGGER IF NOT EXISTS users_fts_ad AFTER DELETE ON users BEGIN
+            DELETE FROM users_fts WHERE rowid = old.id;
+        END
+    """)
+    op.execute("CREATE TRIGGER IF NOT EXISTS users_fts_au AFTER UPDATE OF id, username, email ON users BEGIN"
+               " DELETE FROM users_fts WHERE rowid = old.id;" + FTS_INSERT + "END")
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute("DROP TRIGGER IF EXISTS users_fts_au")
+        op.execute("DROP TRIGGER IF EXISTS users_fts_ad")
+        op.execute("DROP TRIGGER IF EXISTS users_fts_ai")
+        op.execute("DROP TABLE IF EXISTS users_fts")
+
+    with op.batch_alter_table('matches', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_matches_user_id'))
@@ -0,0 +1,59 @@
+"""Add usage_rollups daily usage aggregates and backfill them from usage_logs
+
+Revision ID: e2b8c6f4d913
+Revises: d7a3e5c19b42
+Create Date: 2026-10-18 15:10:47.885120
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2b8c6f4d913'
+down_revision = 'd7a3e5c19b42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # create_app()의 db.create_all()이 먼저 (빈 테이블로) 생성했을 수 있음
+    if 'usage_rollups' not in sa.inspect(op.get_bind()).get_table_names():
+        op.create_table('usage_rollups',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('service_id', sa.Integer(), nullable=False),
+        sa.Column('api_key_id', sa.Integer(), nullable=False),
+        sa.Column('usage_type', sa.Enum('API_KEY', 'WEB_UI', name='usagetype'), nullable=False),
+        sa.Column('log_status', sa.String(length=10), nullable=False),
+        sa.Column('log_count', sa.Integer(), nullable=False),
+        sa.Column('usage_count', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('day', 'user_id', 'service_id', 'api_key_id', 'usage_type', 'log_status', name='uq_usage_rollups_key')
+        )
+        with op.batch_alter_table('usage_rollups', schema=None) as batch_op:
+            batch_op.create_index('ix_usage_rollups_user_id_day', ['user_id', 'day'], unique=False)
+            batch_op.create_index('ix_usage_rollups_api_key_id_day', ['api_key_id', 'day'], unique=False)
+
+    # 기존 usage_logs 백필 (flask rebuild-usage-rollups와 동일한 집계)
+    day = 'date(timestamp)' if op.get_bind().dialect.name == 'sqlite' else 'CAST(timestamp AS DATE)'
+    op.execute("DELETE FROM usage_rollups")
+    op.execute(f"""
+        INSERT INTO usage_rollups (day, user_id, service_id, api_key_id, usage_type, log_status,
+                                   log_count, usage_count, updated_at)
+        SELECT {day}, COALESCE(user_id, 0), service_id, COALESCE(api_key_id, 0), usage_type, log_status,
+               COUNT(*), SUM(usage_count), CURRENT_TIMESTAMP
+        FROM usage_logs
+        WHERE timestamp IS NOT NULL
+        GROUP BY {day}, COALESCE(user_id, 0), service_id, COALESCE(api_key_id, 0), usage_type, log_status
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('usage_rollups', schema=None) as batch_op:
+        batch_op.drop_index('ix_usage_rollups_api_key_id_day')
+        batch_op.drop_index('ix_usage_rollups_user_id_day')
+
+    op.drop_table('usage_rollups')
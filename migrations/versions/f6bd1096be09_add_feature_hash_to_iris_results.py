@@ -0,0 +1,51 @@
+"""Add indexed feature_hash to iris_results and backfill existing rows
+
+Revision ID: f6bd1096be09
+Revises: e66d26d72641
+Create Date: 2026-10-18 10:12:40.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import hashlib, struct
+
+
+# revision identifiers, used by Alembic.
+revision = 'f6bd1096be09'
+down_revision = 'e66d26d72641'
+branch_labels = None
+depends_on = None
+
+# apps/iris/dbmodels.py compute_feature_hash()와 동일한 규칙 (마이그레이션 시점 기준으로 고정)
+FEATURE_HASH_SCALE = 10 ** 6
+
+
+def _feature_hash(user_id, features):
+    quantized = [int(round(float(value) * FEATURE_HASH_SCALE)) for value in features]
+    digest = hashlib.blake2b(struct.pack('<5q', int(user_id), *quantized), digest_size=8).digest()
+    return struct.unpack('<q', digest)[0]
+
+
+def upgrade():
+    with op.batch_alter_table('iris_results', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('feature_hash', sa.BigInteger(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_iris_results_feature_hash'), ['feature_hash'], unique=False)
+
+    # 기존 행 backfill
+    conn = op.get_bind()
+    rows = conn.execute(sa.text(
+        "SELECT i.id, p.user_id, i.sepal_length, i.sepal_width, i.petal_length, i.petal_width "
+        "FROM iris_results i JOIN prediction_results p ON p.id = i.id"
+    )).fetchall()
+    updates = [
+        {'id': row[0], 'feature_hash': _feature_hash(row[1], row[2:6])}
+        for row in rows if row[1] is not None
+    ]
+    if updates:
+        conn.execute(sa.text("UPDATE iris_results SET feature_hash = :feature_hash WHERE id = :id"), updates)
+
+
+def downgrade():
+    with op.batch_alter_table('iris_results', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_iris_results_feature_hash'))
+        batch_op.drop_column('feature_hash')
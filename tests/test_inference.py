@@ -0,0 +1,57 @@
+# tests/test_inference.py
+# NumPy 추론 엔진(LinearModelInference)이 sklearn LogisticRegression과 같은 결과를 내는지 확인
+import pickle
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from sklearn.datasets import load_iris
+from sklearn.linear_model import LogisticRegression
+
+from apps.iris.inference import LinearModelInference
+from apps.iris.views import MODEL_PATH
+
+@pytest.fixture(scope='module')
+def inputs():
+    """iris 학습 데이터 + 특성 범위를 넓힌 무작위 입력"""
+    rng = np.random.default_rng(0)
+    return np.vstack([load_iris().data, rng.uniform(0.0, 10.0, size=(2000, 4))])
+
+def load_shipped_model():
+    with open(MODEL_PATH, 'rb') as f:
+        return pickle.load(f)
+
+def binary_model():
+    X, y = load_iris(return_X_y=True)
+    return LogisticRegression(max_iter=200).fit(X[y < 2], y[y < 2])
+
+@pytest.mark.parametrize('make_estimator', [load_shipped_model, binary_model], ids=['model.pkl', 'binary'])
+def test_matches_sklearn(make_estimator, inputs):
+    estimator = make_estimator()
+    engine = LinearModelInference.from_estimator(estimator)
+    assert np.array_equal(engine.predict(inputs), estimator.predict(inputs))
+    assert np.array_equal(engine.predict_proba(inputs), estimator.predict_proba(inputs))
+    # 요청 처리와 같은 1행 단위 호출
+    for row in inputs[:200]:
+        row = row.reshape(1, -1)
+        assert np.array_equal(engine.predict(row), estimator.predict(row))
+        assert np.array_equal(engine.predict_proba(row), estimator.predict_proba(row))
+
+@pytest.mark.parametrize('params, multinomial', [
+    ({'multi_class': 'auto', 'solver': 'lbfgs'}, True),
+    ({'multi_class': 'auto', 'solver': 'liblinear'}, False),        # sklearn은 liblinear를 OvR로 해석
+    ({'multi_class': 'deprecated', 'solver': 'liblinear'}, False),
+    ({'multi_class': 'ovr', 'solver': 'lbfgs'}, False),
+    ({'multi_class': 'warn', 'solver': 'lbfgs'}, False),
+    ({'multi_class': 'multinomial', 'solver': 'saga'}, True),
+    ({'solver': 'lbfgs'}, True),                                    # multi_class가 제거된 sklearn 버전
+])
+def test_is_multinomial(params, multinomial):
+    assert LinearModelInference.is_multinomial(SimpleNamespace(**params)) is multinomial
+
+def test_rejects_estimator_with_different_outputs():
+    # 설치된 sklearn은 softmax로 추론하지만 multi_class='ovr'로 표시된 추정기 (다른 버전에서 만든 pickle 등)
+    estimator = load_shipped_model()
+    estimator.multi_class = 'ovr'
+    with pytest.raises(ValueError):
+        LinearModelInference.from_estimator(estimator)
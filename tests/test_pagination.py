@@ -0,0 +1,61 @@
+# tests/test_pagination.py
+# 키셋 페이지네이션이 배포된 데이터(instance/mydb.sqlite3)에서 모든 행을 정확히 한 번씩 보여 주는지 확인
+import os, shutil
+
+import pytest
+from flask import Flask
+
+from apps.dbmodels import Log, MatchLog, PredictionResult, UsageLog, User
+from apps.extensions import db
+from apps.pagination import encode_cursor, keyset_paginate
+
+SHIPPED_DB = os.path.join(os.path.dirname(__file__), '..', 'instance', 'mydb.sqlite3')
+
+@pytest.fixture(scope='module')
+def app(tmp_path_factory):
+    """배포된 DB의 복사본에 연결한 최소 앱 (모델/페이지네이션만 사용)"""
+    path = tmp_path_factory.mktemp('db') / 'mydb.sqlite3'
+    shutil.copy(SHIPPED_DB, path)
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{path}'
+    db.init_app(app)
+    with app.app_context():
+        yield app
+
+def walk(model, sort_column, per_page):
+    """첫 페이지부터 다음 페이지 끝까지, 다시 이전 페이지로 처음까지 이동하며 페이지별 id 목록을 반환합니다."""
+    query = model.query
+    pagination = keyset_paginate(query, sort_column, model.id, per_page=per_page)
+    forward = [[item.id for item in pagination.items]]
+    while pagination.has_next:
+        pagination = keyset_paginate(query, sort_column, model.id, after=pagination.next_cursor, per_page=per_page)
+        forward.append([item.id for item in pagination.items])
+        assert len(forward) <= query.count(), "다음 페이지가 끝나지 않음"
+    backward = [[item.id for item in pagination.items]]
+    while pagination.has_prev:
+        pagination = keyset_paginate(query, sort_column, model.id, before=pagination.prev_cursor, per_page=per_page)
+        backward.append([item.id for item in pagination.items])
+        assert len(backward) <= len(forward), "이전 페이지가 끝나지 않음"
+    return forward, backward[::-1]
+
+@pytest.mark.parametrize('per_page', [2, 3, 4])
+@pytest.mark.parametrize('model, column', [
+    (User, 'created_at'), (Log, 'timestamp'), (UsageLog, 'timestamp'),
+    (MatchLog, 'timestamp'), (PredictionResult, 'created_at'),
+])
+def test_walks_every_row_once(app, model, column, per_page):
+    sort_column = getattr(model, column)
+    expected = [row.id for row in model.query.order_by(sort_column.desc(), model.id.desc())]
+    assert len(expected) > per_page   # 여러 페이지에 걸친 데이터
+    forward, backward = walk(model, sort_column, per_page)
+    assert [row_id for page in forward for row_id in page] == expected
+    assert backward == forward
+
+def test_isoformat_cursor(app):
+    # 저장 문자열을 담기 전의 커서(datetime.isoformat())도 같은 페이지를 반환
+    first = User.query.order_by(User.created_at.desc(), User.id.desc()).first()
+    legacy = keyset_paginate(User.query, User.created_at, User.id, per_page=3,
+                             after=encode_cursor(first.created_at, first.id))
+    current = keyset_paginate(User.query, User.created_at, User.id, per_page=3,
+                              after=keyset_paginate(User.query, User.created_at, User.id, per_page=1).next_cursor)
+    assert [user.id for user in legacy.items] == [user.id for user in current.items]